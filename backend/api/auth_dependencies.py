@@ -1,11 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from database.db_setup import SessionLocal
-from database import crud
+from database.db_setup import get_db, get_async_db  # noqa: F401 (zentrale Session Dependencies)
+from database import crud, crud_async
 from database.models import Teacher
-from services.auth_service import auth_service
+from services import auth_cache
+from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,35 +15,25 @@ logger = logging.getLogger(__name__)
 # Bearer Token Schema
 security = HTTPBearer()
 
-def get_db():
-    """Database session dependency."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-async def get_current_teacher(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Teacher:
+async def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
     """
-    Dependency die den aktuellen authentifizierten Teacher zurückgibt.
+    Dependency die den verifizierten Token Payload zurückgibt (gecacht bis exp).
     
     Raises:
-        HTTPException: 401 wenn Token ungültig oder Teacher nicht gefunden
+        HTTPException: 401 wenn Token ungültig
     """
-    token = credentials.credentials
-    
-    # Verifiziere Token
-    payload = auth_service.verify_token(token)
+    payload = auth_cache.verify_token(credentials.credentials)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token ist ungültig oder abgelaufen",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+    return payload
+
+def _teacher_from_payload(db: Session, payload: dict) -> Teacher:
     # Extrahiere Teacher ID
     teacher_id = payload.get("sub")
     if teacher_id is None:
@@ -50,15 +42,34 @@ async def get_current_teacher(
             detail="Token enthält keine gültige Teacher ID",
         )
     
-    # Hole Teacher aus DB
-    teacher = crud.get_teacher(db, int(teacher_id))
-    if teacher is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Teacher nicht gefunden",
-        )
+    # Teacher aus dem Cache, sonst aus der DB
+    snapshot = auth_cache.get_teacher(int(teacher_id))
+    if snapshot is None:
+        teacher = crud.get_teacher(db, int(teacher_id))
+        if teacher is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Teacher nicht gefunden",
+            )
+        snapshot = auth_cache.remember_teacher(teacher, expires_at=payload.get("exp"))
+    
+    # Eigenes Objekt pro Request, damit Sessions keine geteilten Instanzen verändern
+    return snapshot.to_teacher()
+
+async def get_current_teacher(
+    payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_db)
+) -> Teacher:
+    """
+    Dependency die den aktuellen authentifizierten Teacher zurückgibt.
+    
+    Das Objekt ist nicht an die Session gebunden; für Änderungen muss der
+    Teacher neu geladen werden (siehe auth_routes.change_password).
     
-    return teacher
+    Raises:
+        HTTPException: 401 wenn Token ungültig oder Teacher nicht gefunden
+    """
+    return _teacher_from_payload(db, payload)
 
 async def get_current_teacher_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -71,7 +82,7 @@ async def get_current_teacher_optional(
         return None
     
     try:
-        return await get_current_teacher(credentials, db)
+        return _teacher_from_payload(db, await get_token_payload(credentials))
     except HTTPException:
         return None
 
@@ -80,8 +91,9 @@ class TeacherChecker:
     Dependency Klasse um zu prüfen ob Teacher Zugriff auf bestimmte Ressourcen hat.
     """
     
-    def __init__(self, allow_own_resources_only: bool = True):
+    def __init__(self, allow_own_resources_only: bool = True, require_admin: bool = False):
         self.allow_own_resources_only = allow_own_resources_only
+        self.require_admin = require_admin
     
     async def __call__(
         self,
@@ -91,37 +103,90 @@ class TeacherChecker:
         """
         Kann erweitert werden um spezifische Berechtigungen zu prüfen.
         """
+        if self.require_admin and not is_admin(teacher):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Nur für Administratoren",
+            )
         # Hier könnten weitere Checks implementiert werden
-        # z.B. Admin-Rechte, Zugriff auf spezifische Klassen etc.
+        # z.B. Zugriff auf spezifische Klassen etc.
         return teacher
 
+def is_admin(teacher: Teacher) -> bool:
+    """Admins sind die Teacher, deren Username in settings.admin_usernames steht."""
+    return teacher.username in (getattr(settings, "admin_usernames", None) or ())
+
 # Vordefinierte Checker
 require_teacher = TeacherChecker(allow_own_resources_only=True)
+require_admin = TeacherChecker(allow_own_resources_only=False, require_admin=True)
 
-async def verify_class_ownership(
+def _remember_class_owner(
     class_id: int,
-    teacher: Teacher = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
-) -> bool:
-    """
-    Prüft ob der Teacher Eigentümer der Klasse ist.
-    
-    Raises:
-        HTTPException: 403 wenn Teacher nicht der Eigentümer ist
-    """
-    class_obj = crud.get_class(db, class_id)
-    if not class_obj:
+    teacher_id: int,
+    owner_id: Optional[int],
+    expires_at: Optional[float]
+) -> None:
+    if owner_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Klasse nicht gefunden"
         )
     
-    if class_obj.teacher_id != teacher.id:
+    if owner_id != teacher_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Keine Berechtigung für diese Klasse"
         )
     
+    auth_cache.remember_class_owner(teacher_id, class_id, expires_at=expires_at)
+
+def check_class_ownership(
+    db: Session,
+    class_id: int,
+    teacher_id: int,
+    expires_at: Optional[float] = None
+) -> None:
+    """
+    Prüft ob der Teacher Eigentümer der Klasse ist (erfolgreiche Prüfungen werden gecacht).
+    
+    Args:
+        expires_at: Ablauf des Tokens, über den geprüft wird (time.time())
+    
+    Raises:
+        HTTPException: 404 wenn die Klasse nicht existiert, 403 wenn Teacher nicht der Eigentümer ist
+    """
+    if auth_cache.is_class_owner(teacher_id, class_id):
+        return
+    
+    class_obj = crud.get_class(db, class_id)
+    _remember_class_owner(class_id, teacher_id, class_obj.teacher_id if class_obj else None, expires_at)
+
+async def check_class_ownership_async(
+    db: AsyncSession,
+    class_id: int,
+    teacher_id: int,
+    expires_at: Optional[float] = None
+) -> None:
+    """Wie check_class_ownership, für Handler mit AsyncSession."""
+    if auth_cache.is_class_owner(teacher_id, class_id):
+        return
+    
+    owner_id = await crud_async.get_class_teacher_id(db, class_id)
+    _remember_class_owner(class_id, teacher_id, owner_id, expires_at)
+
+async def verify_class_ownership(
+    class_id: int,
+    teacher: Teacher = Depends(get_current_teacher),
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload)
+) -> bool:
+    """
+    Prüft ob der Teacher Eigentümer der Klasse ist.
+    
+    Raises:
+        HTTPException: 403 wenn Teacher nicht der Eigentümer ist
+    """
+    check_class_ownership(db, class_id, teacher.id, expires_at=payload.get("exp"))
     return True
 
 # Utility function um Student-Zugriff zu prüfen
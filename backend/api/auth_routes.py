@@ -4,6 +4,7 @@ from datetime import timedelta
 from typing import Optional
 from database import crud
 from services.auth_service import auth_service
+from services import auth_cache
 from config import settings
 from api.auth_dependencies import get_db, get_current_teacher
 from schemas.teacher_schemas import TeacherRead
@@ -48,8 +49,8 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verifiziere Passwort
-    if not auth_service.verify_password(login_data.password, teacher.hashed_password):
+    # Verifiziere Passwort (bcrypt im Thread Pool)
+    if not await auth_service.verify_password_async(login_data.password, teacher.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Benutzername oder Passwort falsch",
@@ -129,10 +130,18 @@ async def change_password(
     """
     Ändert das Passwort des aktuellen Teachers.
     """
+    # Teacher neu laden, current_teacher ist nicht an die Session gebunden
+    teacher = crud.get_teacher(db, current_teacher.id)
+    if teacher is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Teacher nicht gefunden"
+        )
+    
     # Verifiziere aktuelles Passwort
-    if not auth_service.verify_password(
+    if not await auth_service.verify_password_async(
         password_data.current_password, 
-        current_teacher.hashed_password
+        teacher.hashed_password
     ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -140,10 +149,11 @@ async def change_password(
         )
     
     # Update Passwort
-    new_hash = auth_service.get_password_hash(password_data.new_password)
-    current_teacher.hashed_password = new_hash
+    new_hash = await auth_service.get_password_hash_async(password_data.new_password)
+    teacher.hashed_password = new_hash
     db.commit()
+    auth_cache.forget_teacher(teacher.id)
     
-    logger.info(f"Teacher {current_teacher.username} changed password")
+    logger.info(f"Teacher {teacher.username} changed password")
     
     return {"message": "Passwort erfolgreich geändert"}
\ No newline at end of file
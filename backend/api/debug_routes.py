@@ -0,0 +1,94 @@
+"""
+Debug-Endpoints für Administratoren (settings.admin_usernames).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from api.auth_dependencies import require_admin
+from database.models import Teacher
+from services import profiling, query_profiler
+
+router = APIRouter()
+
+def _get_profiler() -> query_profiler.QueryProfiler:
+    profiler = query_profiler.get_profiler()
+    if profiler is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="SQL-Profiler ist nicht aktiviert (settings.sql_profiler_enabled)",
+        )
+    return profiler
+
+@router.get("/sql-profile")
+async def get_sql_profile(
+    limit: int = Query(20, ge=1, le=100),
+    current_teacher: Teacher = Depends(require_admin)
+):
+    """
+    Requests mit den meisten SQL-Statements und Routen nach Statements pro Request.
+
+    "repeated" listet die Statement-Formen, die in einem Request mindestens
+    max_repeats-mal ausgeführt wurden (N+1 Verdacht).
+    """
+    return _get_profiler().worst_offenders(limit)
+
+@router.delete("/sql-profile", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_sql_profile(current_teacher: Teacher = Depends(require_admin)):
+    _get_profiler().reset()
+
+@router.post("/torch-profile")
+async def arm_torch_profile(
+    calls: int = Query(5, ge=1, le=profiling.MAX_PROFILED_CALLS),
+    record_shapes: bool = Query(True),
+    profile_memory: bool = Query(True),
+    with_stack: bool = Query(False),
+    current_teacher: Teacher = Depends(require_admin)
+):
+    """
+    Profiliert die nächsten calls Inferenzaufrufe mit dem Torch-Profiler.
+
+    Frühere Ergebnisse werden verworfen; die Traces bleiben im profile_dir.
+    """
+    return profiling.arm_torch_profiler(
+        calls, record_shapes=record_shapes, profile_memory=profile_memory, with_stack=with_stack
+    )
+
+@router.get("/torch-profile")
+async def get_torch_profile(current_teacher: Teacher = Depends(require_admin)):
+    """Verbleibende Aufrufe und pro profiliertem Aufruf Trace-Datei und teuerste Operatoren."""
+    return profiling.torch_profiler_status()
+
+@router.delete("/torch-profile")
+async def disarm_torch_profile(current_teacher: Teacher = Depends(require_admin)):
+    return profiling.disarm_torch_profiler()
+
+@router.get("/torch-profile/traces/{name}")
+async def download_torch_trace(name: str, current_teacher: Teacher = Depends(require_admin)):
+    """Chrome-Trace zum Öffnen in chrome://tracing oder Perfetto."""
+    path = profiling.trace_path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace nicht gefunden")
+    return FileResponse(path, media_type="application/json", filename=name)
+
+@router.get("/memory")
+async def get_memory_report(
+    top: int = Query(20, ge=1, le=200),
+    current_teacher: Teacher = Depends(require_admin)
+):
+    """
+    RSS, Modellgröße, Caches und ORM-Sessions; mit laufendem tracemalloc
+    zusätzlich der Zuwachs seit dem Start nach Subsystem und Quellzeile.
+    """
+    return await run_in_threadpool(profiling.memory_report, top)
+
+@router.post("/memory/tracemalloc")
+async def start_tracemalloc(
+    nframes: int = Query(25, ge=1, le=100),
+    current_teacher: Teacher = Depends(require_admin)
+):
+    """Startet tracemalloc (neu); spätere Berichte zeigen den Zuwachs ab jetzt."""
+    return await run_in_threadpool(profiling.start_tracemalloc, nframes)
+
+@router.delete("/memory/tracemalloc", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_tracemalloc(current_teacher: Teacher = Depends(require_admin)):
+    profiling.stop_tracemalloc()
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import pandas as pd
 import io
+import hashlib
 from datetime import datetime
 import logging
 from database import crud
 from database.models import Teacher
-from api.auth_dependencies import get_db, get_current_teacher, verify_class_ownership
-from schemas.interaction_schemas import InteractionCreate
+from api.auth_dependencies import get_db, get_current_teacher, get_token_payload, check_class_ownership
+from services.catalog import get_catalog
+from services import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ class ImportResult(BaseModel):
     errors: List[dict]
     warnings: List[str]
     processing_time_seconds: float
+    from_cache: bool = False
 
 class CSVValidationError(BaseModel):
     row: int
@@ -56,8 +58,10 @@ async def import_interactions(
     file: UploadFile = File(...),
     class_id: int = Form(...),
     student_id: Optional[int] = Form(None),
+    force: bool = Form(False),
     current_teacher: Teacher = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    token_payload: dict = Depends(get_token_payload)
 ):
     """
     Importiert Schüler-Interaktionen aus einer CSV-Datei.
@@ -73,10 +77,18 @@ async def import_interactions(
         file: CSV-Datei
         class_id: Klasse für die importiert werden soll
         student_id: Optional - spezifischer Schüler (überschreibt student_id in CSV)
+        force: Import erneut ausführen, auch wenn dieselbe Datei bereits importiert wurde
+    
+    Byte-identische Uploads für dieselbe Klasse (und denselben Ziel-Schüler) liefern
+    das gespeicherte Ergebnis des ersten fehlerfreien Imports zurück, ohne die Zeilen
+    erneut zu verarbeiten. Uploads mit fehlerhaften Zeilen werden nicht gespeichert.
     """
     
+    # pandas erst beim ersten Import laden (Kaltstart der API)
+    import pandas as pd
+    
     # Verify class ownership
-    await verify_class_ownership(class_id, current_teacher, db)
+    check_class_ownership(db, class_id, current_teacher.id, expires_at=token_payload.get("exp"))
     
     # Check file type
     if not file.filename.endswith('.csv'):
@@ -93,6 +105,17 @@ async def import_interactions(
     try:
         # Read CSV file
         contents = await file.read()
+        content_hash = hashlib.sha256(contents).hexdigest()
+        
+        # Bereits importierte Datei? Gespeichertes Ergebnis zurückgeben
+        if not force:
+            import_record = crud.get_import_record(db, class_id, content_hash, student_id)
+            if import_record:
+                logger.info(f"Import für Klasse {class_id} bereits vorhanden (Hash {content_hash[:12]}), gebe gespeichertes Ergebnis zurück")
+                cached_result = ImportResult.model_validate_json(import_record.result_json)
+                cached_result.from_cache = True
+                return cached_result
+        
         df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
         
         logger.info(f"CSV geladen: {len(df)} Zeilen, Spalten: {list(df.columns)}")
@@ -122,6 +145,19 @@ async def import_interactions(
                     detail="Schüler nicht in dieser Klasse gefunden"
                 )
         
+        # Katalog, Schüler und vorhandene Interaktionen einmal laden statt pro Zeile
+        catalog = get_catalog(db)
+        if student_id:
+            students_by_id = {student.id: student}
+        else:
+            csv_student_ids = pd.to_numeric(df['student_id'], errors='coerce').dropna().astype(int).unique().tolist()
+            students_by_id = crud.get_students_by_ids(db, csv_student_ids)
+        existing_keys = crud.get_interaction_keys(
+            db,
+            [sid for sid, s in students_by_id.items() if s.class_id == class_id]
+        )
+        new_rows = []
+        
         # Process each row
         for idx, row in df.iterrows():
             try:
@@ -131,7 +167,7 @@ async def import_interactions(
                 else:
                     # Try to find student by ID in the class
                     student_id_from_csv = int(row['student_id'])
-                    student = crud.get_student(db, student_id_from_csv)
+                    student = students_by_id.get(student_id_from_csv)
                     
                     if not student or student.class_id != class_id:
                         errors.append({
@@ -146,8 +182,8 @@ async def import_interactions(
                 problem_original_id = str(row['problem_id'])
                 skill_original_id = str(row['skill_id'])
                 
-                # Find problem and skill in DB
-                problem = crud.get_problem_by_original_id(db, problem_original_id)
+                # Find problem and skill in catalog
+                problem = catalog.problem_by_original_id(problem_original_id)
                 if not problem:
                     errors.append({
                         "row": idx + 2,
@@ -155,7 +191,7 @@ async def import_interactions(
                     })
                     continue
                 
-                skill = crud.get_skill_by_original_id(db, skill_original_id)
+                skill = catalog.skill_by_original_id(skill_original_id)
                 if not skill:
                     errors.append({
                         "row": idx + 2,
@@ -168,6 +204,11 @@ async def import_interactions(
                     warnings.append(
                         f"Zeile {idx + 2}: Problem {problem_original_id} gehört nicht zu Skill {skill_original_id}"
                     )
+                    errors.append({
+                        "row": idx + 2,
+                        "error": f"Problem {problem.id} gehört nicht zu Skill {skill.id}"
+                    })
+                    continue
                 
                 # Parse timestamp
                 try:
@@ -179,30 +220,22 @@ async def import_interactions(
                     })
                     continue
                 
-                # Create interaction
-                interaction = InteractionCreate(
-                    problem_db_id=problem.id,
-                    skill_db_id=skill.id,
-                    is_correct=bool(int(row['correct'])),
-                    timestamp=timestamp
-                )
-                
-                # Check for duplicate
-                existing = db.query(crud.models.Interaction).filter(
-                    crud.models.Interaction.student_id == target_student_id,
-                    crud.models.Interaction.problem_id == problem.id,
-                    crud.models.Interaction.timestamp == timestamp
-                ).first()
-                
-                if existing:
+                # Check for duplicate (in DB oder bereits in dieser Datei)
+                interaction_key = (target_student_id, problem.id, timestamp)
+                if interaction_key in existing_keys:
                     warnings.append(
                         f"Zeile {idx + 2}: Interaktion bereits vorhanden, übersprungen"
                     )
                     continue
+                existing_keys.add(interaction_key)
                 
-                # Create interaction
-                crud.create_interaction(db, interaction, target_student_id)
-                successful_imports += 1
+                new_rows.append({
+                    "student_id": target_student_id,
+                    "problem_id": problem.id,
+                    "skill_id": skill.id,
+                    "is_correct": bool(int(row['correct'])),
+                    "timestamp": timestamp
+                })
                 
             except Exception as e:
                 errors.append({
@@ -211,12 +244,16 @@ async def import_interactions(
                 })
                 logger.error(f"Fehler bei Zeile {idx + 2}: {e}")
         
+        # Alle gültigen Zeilen in einer Transaktion speichern
+        successful_imports = crud.create_interactions_bulk(db, new_rows)
+        
         # Calculate processing time
         processing_time = (datetime.now() - start_time).total_seconds()
+        metrics.record_import("csv", successful_imports, processing_time)
         
         logger.info(f"Import abgeschlossen: {successful_imports}/{total_rows} erfolgreich")
         
-        return ImportResult(
+        result = ImportResult(
             total_rows=total_rows,
             successful_imports=successful_imports,
             failed_imports=len(errors),
@@ -225,6 +262,22 @@ async def import_interactions(
             processing_time_seconds=processing_time
         )
         
+        # Fehlerfreien Import für idempotente Wiederholungen speichern. Imports mit
+        # fehlerhaften Zeilen nicht: nach der Korrektur (z.B. Schüler der Klasse
+        # zugeordnet, Katalog geladen) soll dieselbe Datei erneut verarbeitet werden.
+        if not errors:
+            crud.save_import_record(
+                db,
+                class_id=class_id,
+                teacher_id=current_teacher.id,
+                content_hash=content_hash,
+                result_json=result.model_dump_json(),
+                student_id=student_id,
+                filename=file.filename
+            )
+        
+        return result
+        
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV-Datei ist leer")
     except Exception as e:
@@ -238,6 +291,7 @@ async def download_interaction_template(
     """
     Gibt eine CSV-Vorlage für den Interaction Import zurück.
     """
+    import pandas as pd
     
     template_data = {
         "student_id": [1, 1, 2, 2],
@@ -280,11 +334,12 @@ async def preview_available_skills_and_problems(
     Hilfreich um zu wissen, welche IDs in der CSV verwendet werden können.
     """
     
-    skills = crud.get_skills(db, limit=limit)
+    catalog = get_catalog(db)
+    skills = [catalog.skill(int(skill_id)) for skill_id in catalog.skill_ids[:limit]]
     
     result = {
-        "total_skills": db.query(crud.models.Skill).count(),
-        "total_problems": db.query(crud.models.Problem).count(),
+        "total_skills": catalog.skill_count,
+        "total_problems": catalog.problem_count,
         "sample_skills": [
             {
                 "original_skill_id": skill.original_skill_id,
@@ -298,7 +353,7 @@ async def preview_available_skills_and_problems(
     
     # Get sample problems for first few skills
     for skill in skills[:3]:
-        problems = crud.get_problems_by_skill_id(db, skill.id, limit=3)
+        problems = catalog.problems_for_skill(skill.id, limit=3)
         for problem in problems:
             result["sample_problems"].append({
                 "original_problem_id": problem.original_problem_id,
@@ -0,0 +1,54 @@
+"""
+GET /metrics im Prometheus-Textformat und Middleware für die HTTP-Metriken.
+
+Die Middleware misst jeden HTTP-Request und ordnet ihn dem Pfad-Template der
+Route zu (z.B. /api/recommendations/students/{student_id}/mastery), damit die
+Anzahl der Label-Kombinationen begrenzt bleibt. Requests ohne passende Route
+landen unter "unmatched".
+"""
+import time
+from fastapi import APIRouter
+from fastapi.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from services import metrics
+
+# charset ergänzt Starlette bei text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.HTTP_REQUESTS_IN_PROGRESS.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.HTTP_REQUESTS_IN_PROGRESS.dec()
+            # Der Router trägt die gefundene Route in den (geteilten) Scope ein
+            route = scope.get("route")
+            metrics.HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start_time,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code
+            )
@@ -0,0 +1,35 @@
+"""
+Middleware für den SQL-Profiler (services/query_profiler.py).
+
+Zeichnet die Statements jedes HTTP-Requests auf, übergibt sie nach Abschluss
+an den Profiler und loggt Requests über den Schwellwerten als Warnung (JSON).
+"""
+import json
+import logging
+from starlette.types import ASGIApp, Receive, Scope, Send
+from services import query_profiler
+from services.query_profiler import QueryProfiler
+
+logger = logging.getLogger(__name__)
+
+class QueryProfilerMiddleware:
+    def __init__(self, app: ASGIApp, profiler: QueryProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = query_profiler.start()
+        queries = query_profiler.current()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            query_profiler.stop(token)
+            if queries.count:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                report = self.profiler.record(scope["method"], route, scope["path"], queries)
+                if report["problems"]:
+                    logger.warning(json.dumps({"event": "sql_profile", **report}))
@@ -1,31 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 import logging
-from database.db_setup import SessionLocal
+import numpy as np
 from database import crud
+from database.history import load_student_history
 from api.auth_dependencies import get_db
+from api.responses import trusted_response
 from schemas.recommendation_schemas import (
     MasteryProfileResponse,
     ConceptMasteryData,
     ConceptPrognosisResponse,
     DifficultyPrognosisData
 )
-from services.akt_model_service import get_akt_service
+from services.akt_model_service import MODEL_LOADING, ModelNotReadyError, get_akt_service, get_loaded_model_version
+from services.catalog import get_catalog
+from services.etag import compute_etag, etag_matches
+from services import metrics, timing
 
-router = APIRouter()
-logger = logging.getLogger(__name__)
+def _require_model():
+    """Schnelle 503 mit Retry-After, solange das Modell lädt oder nicht geladen werden konnte."""
+    try:
+        get_akt_service()
+    except ModelNotReadyError as e:
+        detail = "AKT Model wird geladen" if e.state == MODEL_LOADING else "AKT Model Service nicht verfügbar"
+        if e.state != MODEL_LOADING:
+            logger.error(f"AKT Service nicht verfügbar: {e}")
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(e.retry_after)})
 
-def get_db():
-    db = SessionLocal()
+def _inference_queue_slot():
+    """Zählt Requests, die auf das Modell warten oder es nutzen (akt_inference_queue_depth)."""
+    metrics.AKT_INFERENCE_QUEUE_DEPTH.inc()
     try:
-        yield db
+        yield
     finally:
-        db.close()
+        metrics.AKT_INFERENCE_QUEUE_DEPTH.dec()
+
+router = APIRouter(dependencies=[Depends(_require_model), Depends(_inference_queue_slot)])
+logger = logging.getLogger(__name__)
+
+def _etag_headers(etag: str) -> dict:
+    # Browser dürfen speichern, müssen aber per If-None-Match nachfragen
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+@timing.timed("etag")
+def _check_etag(
+    request: Request,
+    response: Response,
+    db: Session,
+    student_id: int,
+    endpoint: str,
+    **params
+) -> Optional[Response]:
+    """
+    Setzt das ETag einer Empfehlungs-Antwort und gibt bei passendem If-None-Match
+    die 304-Antwort zurück.
+    
+    Das ETag hängt nur von Schüler-Version (eine Zeile), Modell-Version, Katalog
+    und Parametern ab und entsteht vor dem Laden der Historie und jeder Inferenz.
+    Ohne geladenes Modell oder für unbekannte Schüler gibt es kein ETag.
+    """
+    model_version = get_loaded_model_version()
+    if model_version is None:
+        return None
+    version = crud.get_student_version(db, student_id)
+    if version is None:
+        return None
+    
+    etag = compute_etag(endpoint, student_id, tuple(version), model_version, get_catalog(db).fingerprint, params)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_etag_headers(etag))
+    response.headers.update(_etag_headers(etag))
+    return None
 
 # Mastery Profile für einen Schüler
 @router.get("/students/{student_id}/mastery-profile", response_model=MasteryProfileResponse)
 async def get_student_mastery_profile(
+    request: Request,
+    response: Response,
     student_id: int,
     min_interactions: int = Query(1, description="Minimum Interaktionen pro Skill"),
     db: Session = Depends(get_db)
@@ -34,55 +86,50 @@ async def get_student_mastery_profile(
     Berechnet das aktuelle Mastery-Profil eines Schülers über alle Skills mit AKT.
     """
     
+    # Bedingter GET: 304 ohne Historie und Inferenz
+    not_modified = _check_etag(request, response, db, student_id, "mastery-profile", min_interactions=min_interactions)
+    if not_modified:
+        return not_modified
+    
     # Hole Schüler
-    student = crud.get_student(db, student_id)
+    with timing.phase("db"):
+        student = crud.get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
     
     # Hole AKT Service
-    try:
-        akt_service = get_akt_service()
-    except Exception as e:
-        logger.error(f"AKT Service nicht verfügbar: {e}")
-        raise HTTPException(status_code=503, detail="AKT Model Service nicht verfügbar")
+    akt_service = get_akt_service()
     
-    # Hole Interaction History
-    interactions = crud.get_student_interactions(db, student_id, sort_desc=False)
+    catalog = get_catalog(db)
     
-    if not interactions:
-        raise HTTPException(status_code=404, detail="Keine Interaktionen gefunden")
+    # Hole Interaction History (Index-Arrays für den AKT Service)
+    with timing.phase("history"):
+        interaction_history = load_student_history(db, student_id)
     
-    # Konvertiere zu Format für AKT Service
-    interaction_history = []
-    for interaction in interactions:
-        interaction_history.append({
-            "problem_id": interaction.problem.original_problem_id,
-            "skill_id": interaction.skill.original_skill_id,
-            "correct": int(interaction.is_correct),
-            "timestamp": interaction.timestamp
-        })
+    if not len(interaction_history):
+        raise HTTPException(status_code=404, detail="Keine Interaktionen gefunden")
     
-    # Sammle alle Skills die der Schüler bearbeitet hat
-    skill_interaction_count = {}
-    for interaction in interactions:
-        skill_id = interaction.skill.id
-        skill_interaction_count[skill_id] = skill_interaction_count.get(skill_id, 0) + 1
+    # Sammle alle Skills die der Schüler bearbeitet hat (in Reihenfolge der ersten Bearbeitung)
+    skill_indices, first_seen, counts = np.unique(
+        interaction_history.skill_idx, return_index=True, return_counts=True
+    )
+    order = np.argsort(first_seen, kind="stable")
     
     # Berechne Mastery für jeden Skill mit genug Interaktionen
     mastery_data = []
     
-    for skill_id, count in skill_interaction_count.items():
+    for skill_idx, count in zip(skill_indices[order], counts[order]):
         if count < min_interactions:
             continue
             
-        skill = crud.get_skill(db, skill_id)
+        skill = catalog.skill_by_internal_idx(int(skill_idx))
         if not skill:
             continue
         
         # Berechne Mastery mit AKT
         mastery_result = akt_service.get_skill_mastery(
             interaction_history, 
-            skill.original_skill_id
+            skill.internal_idx
         )
         
         mastery_data.append(ConceptMasteryData(
@@ -98,16 +145,18 @@ async def get_student_mastery_profile(
     # Sortiere nach Mastery Score (niedrigste zuerst für Förderempfehlungen)
     mastery_data.sort(key=lambda x: x.mastery_score)
     
-    return MasteryProfileResponse(
+    return trusted_response(MasteryProfileResponse(
         student_db_id=student.id,
         student_first_name=student.first_name,
         student_last_name=student.last_name,
         profile_data=mastery_data
-    )
+    ), response)
 
 # Vorhersage für ein spezifisches Problem
 @router.get("/students/{student_id}/predict-performance")
 async def predict_problem_performance(
+    request: Request,
+    response: Response,
     student_id: int,
     problem_id: int,
     db: Session = Depends(get_db)
@@ -116,26 +165,31 @@ async def predict_problem_performance(
     Vorhersage der Erfolgswahrscheinlichkeit für ein spezifisches Problem mit AKT.
     """
     
+    # Bedingter GET: 304 ohne Historie und Inferenz
+    not_modified = _check_etag(request, response, db, student_id, "predict-performance", problem_id=problem_id)
+    if not_modified:
+        return not_modified
+    
     # Validierung
-    student = crud.get_student(db, student_id)
-    problem = crud.get_problem(db, problem_id)
+    catalog = get_catalog(db)
+    with timing.phase("db"):
+        student = crud.get_student(db, student_id)
+    problem = catalog.problem(problem_id)
     
     if not student:
         raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
     if not problem:
         raise HTTPException(status_code=404, detail="Problem nicht gefunden")
+    problem_skill = catalog.skill(problem.skill_id)
     
     # AKT Service
-    try:
-        akt_service = get_akt_service()
-    except Exception as e:
-        logger.error(f"AKT Service error: {e}")
-        raise HTTPException(status_code=503, detail="AKT Service nicht verfügbar")
+    akt_service = get_akt_service()
     
     # Hole Interaction History
-    interactions = crud.get_student_interactions(db, student_id, sort_desc=False)
+    with timing.phase("history"):
+        interaction_history = load_student_history(db, student_id)
     
-    if not interactions:
+    if not len(interaction_history):
         return {
             "student_id": student_id,
             "problem_id": problem_id,
@@ -144,29 +198,19 @@ async def predict_problem_performance(
             "message": "Keine Historie verfügbar, neutrale Vorhersage"
         }
     
-    # Konvertiere History
-    interaction_history = [
-        {
-            "problem_id": i.problem.original_problem_id,
-            "skill_id": i.skill.original_skill_id,
-            "correct": int(i.is_correct)
-        }
-        for i in interactions
-    ]
-    
     # Vorhersage mit AKT
     try:
         success_probability = akt_service.predict_next_correct_probability(
             interaction_history,
-            next_problem_id=problem.original_problem_id,
-            next_skill_id=problem.skill.original_skill_id
+            next_problem_idx=problem.internal_idx,
+            next_skill_idx=problem_skill.internal_idx
         )
         
         # Schwierigkeitskategorisierung
         difficulty_info = akt_service.get_problem_difficulty_for_student(
             interaction_history,
-            problem_id=problem.original_problem_id,
-            skill_id=problem.skill.original_skill_id
+            problem_idx=problem.internal_idx,
+            skill_idx=problem_skill.internal_idx
         )
         
         return {
@@ -174,8 +218,8 @@ async def predict_problem_performance(
             "problem_id": problem_id,
             "problem_original_id": problem.original_problem_id,
             "skill": {
-                "id": problem.skill.id,
-                "name": problem.skill.name
+                "id": problem_skill.id,
+                "name": problem_skill.name
             },
             "predicted_success": success_probability,
             "difficulty": difficulty_info["difficulty"],
@@ -190,6 +234,8 @@ async def predict_problem_performance(
 # Skill-spezifische Prognose
 @router.get("/students/{student_id}/skills/{skill_id}/prognosis", response_model=ConceptPrognosisResponse)
 async def get_skill_prognosis(
+    request: Request,
+    response: Response,
     student_id: int,
     skill_id: int,
     sample_size: int = Query(5, description="Anzahl Probleme pro Schwierigkeitskategorie"),
@@ -199,31 +245,28 @@ async def get_skill_prognosis(
     Prognose für verschiedene Schwierigkeitsgrade eines Skills mit AKT.
     """
     
-    student = crud.get_student(db, student_id)
-    skill = crud.get_skill(db, skill_id)
+    # Bedingter GET: 304 ohne Historie und Inferenz
+    not_modified = _check_etag(request, response, db, student_id, "prognosis", skill_id=skill_id, sample_size=sample_size)
+    if not_modified:
+        return not_modified
+    
+    catalog = get_catalog(db)
+    with timing.phase("db"):
+        student = crud.get_student(db, student_id)
+    skill = catalog.skill(skill_id)
     
     if not student or not skill:
         raise HTTPException(status_code=404, detail="Schüler oder Skill nicht gefunden")
     
     # AKT Service
-    try:
-        akt_service = get_akt_service()
-    except:
-        raise HTTPException(status_code=503, detail="AKT Service nicht verfügbar")
+    akt_service = get_akt_service()
     
     # Interaction History
-    interactions = crud.get_student_interactions(db, student_id, sort_desc=False)
-    interaction_history = [
-        {
-            "problem_id": i.problem.original_problem_id,
-            "skill_id": i.skill.original_skill_id,
-            "correct": int(i.is_correct)
-        }
-        for i in interactions
-    ]
+    with timing.phase("history"):
+        interaction_history = load_student_history(db, student_id)
     
     # Hole alle Probleme für diesen Skill
-    all_problems = crud.get_problems_by_skill_id(db, skill_id)
+    all_problems = catalog.problems_for_skill(skill_id, limit=100)
     
     if not all_problems:
         raise HTTPException(status_code=404, detail="Keine Probleme für diesen Skill")
@@ -234,8 +277,8 @@ async def get_skill_prognosis(
         try:
             pred = akt_service.predict_next_correct_probability(
                 interaction_history,
-                next_problem_id=problem.original_problem_id,
-                next_skill_id=skill.original_skill_id
+                next_problem_idx=problem.internal_idx,
+                next_skill_idx=skill.internal_idx
             )
             problem_predictions.append((problem, pred))
         except:
@@ -270,7 +313,7 @@ async def get_skill_prognosis(
                 num_probes_in_category=len(problems)
             ))
     
-    return ConceptPrognosisResponse(
+    return trusted_response(ConceptPrognosisResponse(
         student_db_id=student.id,
         student_first_name=student.first_name,
         student_last_name=student.last_name,
@@ -279,11 +322,13 @@ async def get_skill_prognosis(
         original_skill_id=skill.original_skill_id,
         concept_name=skill.name,
         prognosis_by_difficulty=prognosis_data
-    )
+    ), response)
 
 # Empfohlene nächste Probleme
 @router.get("/students/{student_id}/recommended-problems")
 async def get_recommended_problems(
+    request: Request,
+    response: Response,
     student_id: int,
     skill_id: Optional[int] = None,
     n_recommendations: int = Query(5, ge=1, le=20),
@@ -299,26 +344,27 @@ async def get_recommended_problems(
     - challenge: 30-50%
     """
     
-    student = crud.get_student(db, student_id)
+    # Bedingter GET: 304 ohne Historie und Inferenz
+    not_modified = _check_etag(
+        request, response, db, student_id, "recommended-problems",
+        skill_id=skill_id, n_recommendations=n_recommendations, target_difficulty=target_difficulty
+    )
+    if not_modified:
+        return not_modified
+    
+    with timing.phase("db"):
+        student = crud.get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
     
     # AKT Service
-    try:
-        akt_service = get_akt_service()
-    except:
-        raise HTTPException(status_code=503, detail="AKT Service nicht verfügbar")
+    akt_service = get_akt_service()
+    
+    catalog = get_catalog(db)
     
     # History
-    interactions = crud.get_student_interactions(db, student_id, sort_desc=False)
-    interaction_history = [
-        {
-            "problem_id": i.problem.original_problem_id,
-            "skill_id": i.skill.original_skill_id,
-            "correct": int(i.is_correct)
-        }
-        for i in interactions
-    ]
+    with timing.phase("history"):
+        interaction_history = load_student_history(db, student_id)
     
     # Bestimme Ziel-Erfolgsbereich
     target_ranges = {
@@ -330,13 +376,16 @@ async def get_recommended_problems(
     
     # Hole Kandidaten-Probleme
     if skill_id:
-        candidate_problems = crud.get_problems_by_skill_id(db, skill_id, limit=100)
+        candidate_problems = catalog.problems_for_skill(skill_id, limit=100)
     else:
         # Hole Probleme von Skills, die der Schüler bereits bearbeitet hat
-        practiced_skill_ids = list(set(i.skill_id for i in interactions))
+        practiced_skills = [
+            catalog.skill_by_internal_idx(int(skill_idx))
+            for skill_idx in np.unique(interaction_history.skill_idx)
+        ]
         candidate_problems = []
-        for sid in practiced_skill_ids[:10]:  # Limitiere auf 10 Skills
-            candidate_problems.extend(crud.get_problems_by_skill_id(db, sid, limit=20))
+        for skill in [s for s in practiced_skills if s][:10]:  # Limitiere auf 10 Skills
+            candidate_problems.extend(catalog.problems_for_skill(skill.id, limit=20))
     
     if not candidate_problems:
         return {"recommendations": [], "message": "Keine passenden Probleme gefunden"}
@@ -346,10 +395,11 @@ async def get_recommended_problems(
     
     for problem in candidate_problems:
         try:
+            problem_skill = catalog.skill(problem.skill_id)
             pred = akt_service.predict_next_correct_probability(
                 interaction_history,
-                next_problem_id=problem.original_problem_id,
-                next_skill_id=problem.skill.original_skill_id
+                next_problem_idx=problem.internal_idx,
+                next_skill_idx=problem_skill.internal_idx
             )
             
             # Berechne Fitness Score (wie gut passt es zum Zielbereich)
@@ -362,6 +412,7 @@ async def get_recommended_problems(
             
             scored_problems.append({
                 "problem": problem,
+                "skill": problem_skill,
                 "prediction": pred,
                 "fitness": fitness
             })
@@ -382,8 +433,8 @@ async def get_recommended_problems(
             "original_problem_id": problem.original_problem_id,
             "description": problem.description_placeholder,
             "skill": {
-                "id": problem.skill.id,
-                "name": problem.skill.name
+                "id": item["skill"].id,
+                "name": item["skill"].name
             },
             "predicted_success": round(item["prediction"], 3),
             "fitness_score": round(item["fitness"], 3),
@@ -0,0 +1,44 @@
+"""
+Schnelle JSON-Antworten.
+
+Alle Endpunkte rendern mit orjson (TimedORJSONResponse als default_response_class
+in main.py, misst das Rendern als Server-Timing Phase "serialize"). Große
+Antworten aus bereits validierten Pydantic-Modellen (z.B. Mastery-Profile) werden
+mit trusted_response direkt per model_dump_json gerendert. FastAPI würde das
+Modell sonst über response_model ein zweites Mal validieren und per
+jsonable_encoder umwandeln. response_model bleibt für die OpenAPI-Dokumentation
+erhalten.
+
+model_construct lohnt sich hier nicht: für Modelle dieser Größe ist die
+Validierung in pydantic-core schneller als die Konstruktion in Python
+(siehe benchmarks/bench_serialization.py).
+"""
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from services import timing
+
+class TimedORJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        with timing.phase("serialize"):
+            return super().render(content)
+
+def trusted_response(model: BaseModel, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    """
+    Rendert ein bereits validiertes Modell ohne erneute Validierung.
+
+    Args:
+        response: Die Response-Dependency des Endpunkts; ihre Header (z.B. ETag) werden übernommen
+    """
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    with timing.phase("serialize"):
+        content = model.model_dump_json()
+    return Response(
+        content=content,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -0,0 +1,72 @@
+"""
+Server-Timing Header und strukturierte Timing-Logs pro Request.
+
+Für einen Anteil sample_rate der Requests wird eine Messung gestartet
+(services/timing.py). Die gemessenen Phasen kommen als Server-Timing Header in
+die Antwort (im Browser unter Netzwerk > Timing sichtbar) und nach Abschluss als
+JSON-Zeile ins Log, sofern der Request mindestens log_min_ms gedauert hat.
+Bei gestreamten Antworten enthält der Header nur die Zeit bis zum ersten Byte,
+das Log die gesamte Dauer.
+"""
+import json
+import logging
+import random
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from services import timing
+
+logger = logging.getLogger(__name__)
+
+class ServerTimingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 1.0,
+        log_min_ms: Optional[float] = 0.0,
+        header: bool = True
+    ):
+        """
+        Args:
+            sample_rate: Anteil der gemessenen Requests (0 = aus, 1 = alle)
+            log_min_ms: Nur Requests ab dieser Dauer loggen (None = kein Log)
+            header: Server-Timing Header setzen
+        """
+        self.app = app
+        self.sample_rate = sample_rate
+        self.log_min_ms = log_min_ms
+        self.header = header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.sample_rate <= 0 or (
+            self.sample_rate < 1 and random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        token = timing.start()
+        timings = timing.current()
+        status_code = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.header:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.header_value())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            timing.stop(token)
+            total_ms = timings.elapsed_ms()
+            if self.log_min_ms is not None and total_ms >= self.log_min_ms:
+                logger.info(json.dumps({
+                    "event": "request_timing",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "total_ms": round(total_ms, 3),
+                    "phases": timings.summary(total_ms)
+                }))
@@ -1,49 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional
+from datetime import datetime
+import json
+import logging
+from database import crud, crud_async
 from database.db_setup import SessionLocal
-from database import crud
+from database.models import Interaction, Teacher
+from database.pagination import (
+    decode_interaction_cursor,
+    decode_student_cursor,
+    interaction_cursor,
+    interaction_order,
+    student_cursor
+)
+from api.auth_dependencies import check_class_ownership_async, get_current_teacher, get_db, get_async_db, get_token_payload
+from services.catalog import get_catalog
+from services import metrics
 import schemas
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Zeilen pro Datenbank-Fetch beim NDJSON-Export
+EXPORT_BATCH_SIZE = 1000
 
 # Get all students in a class
 @router.get("/classes/{class_id}/students", response_model=List[schemas.StudentRead])
 async def get_students_in_class(
     class_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Listet alle Schüler einer Klasse auf."""
-    class_obj = crud.get_class(db, class_id)
+    """
+    Listet alle Schüler einer Klasse auf (sortiert nach ID).
+    
+    Ist die Seite voll, enthält der Header X-Next-Cursor den Cursor für die
+    nächste Seite (Parameter cursor, statt skip). Mit search werden die Treffer
+    nach Relevanz sortiert und mit skip geblättert.
+    """
+    if search and cursor:
+        raise HTTPException(status_code=400, detail="cursor kann nicht mit search kombiniert werden")
+    try:
+        after_id = decode_student_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    class_obj = await crud_async.get_class(db, class_id)
     if not class_obj:
         raise HTTPException(status_code=404, detail="Klasse nicht gefunden")
     
     if search:
-        students = crud.search_students_in_class(db, class_id, search, skip, limit)
-    else:
-        students = crud.get_students_by_class(db, class_id, skip, limit)
+        return await crud_async.search_students_in_class(db, class_id, search, skip, limit)
+    
+    students = await crud_async.get_students_by_class(db, class_id, skip, limit, after_id=after_id)
+    if len(students) == limit:
+        response.headers["X-Next-Cursor"] = student_cursor(students[-1].id)
     
     return students
 
+# Search students (school-wide)
+@router.get("/students/search", response_model=List[schemas.StudentRead])
+async def search_students(
+    q: str = Query(..., min_length=1, max_length=100),
+    class_id: Optional[List[int]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_teacher: Teacher = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Sucht Schüler in allen Klassen der Lehrkraft (oder den angegebenen davon) nach
+    Vor- und Nachnamen.
+    
+    Jedes Wort wird als Präfix gesucht ("ma mü" findet "Max Müller"), die Treffer
+    sind nach Relevanz sortiert. Gelöschte Schüler werden nicht gefunden, Klassen
+    anderer Lehrkräfte werden ignoriert.
+    """
+    class_ids = await crud_async.get_class_ids_for_teacher(db, current_teacher.id)
+    if class_id is not None:
+        class_ids = sorted(set(class_ids) & set(class_id))
+    if not class_ids:
+        return []
+    return await crud_async.search_students(db, q, class_ids=class_ids, skip=skip, limit=limit)
+
 # Get single student
 @router.get("/students/{student_id}", response_model=schemas.StudentRead)
 async def get_student(
     student_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Ruft einen einzelnen Schüler ab."""
-    student = crud.get_student(db, student_id)
+    student = await crud_async.get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
     return student
@@ -88,24 +144,101 @@ async def delete_student(
         raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
     return {"message": "Schüler erfolgreich gelöscht"}
 
+# Batch-Ingestion von Interaktionen (mehrere Schüler)
+# Ohne async: FastAPI führt den Handler im Threadpool aus (Validierung, Bulk-Insert
+# und Commit laufen vollständig über die synchrone Session)
+@router.post("/students/interactions:batch", response_model=schemas.InteractionBatchResult)
+def create_interactions_batch(
+    batch: schemas.InteractionBatchCreate,
+    current_teacher: Teacher = Depends(get_current_teacher),
+    db: Session = Depends(get_db)
+):
+    """
+    Nimmt viele Interaktionen für viele Schüler auf einmal entgegen.
+    
+    Alle Einträge werden gegen den Problem/Skill-Katalog im Speicher validiert und
+    die gültigen in einer Transaktion gespeichert. Ungültige Einträge werden mit
+    ihrem Index im Request in errors zurückgegeben.
+    """
+    start_time = datetime.now()
+    items = batch.interactions
+    
+    # Katalog und Schüler-Berechtigungen einmal pro Batch laden
+    catalog = get_catalog(db)
+    allowed_student_ids = crud.get_student_ids_for_teacher(
+        db,
+        teacher_id=current_teacher.id,
+        student_ids=list({item.student_id for item in items})
+    )
+    
+    errors = []
+    rows = []
+    for index, item in enumerate(items):
+        if item.student_id not in allowed_student_ids:
+            errors.append({"index": index, "error": f"Schüler {item.student_id} nicht gefunden oder keine Berechtigung"})
+            continue
+        
+        problem = catalog.problem(item.problem_db_id)
+        if problem is None:
+            errors.append({"index": index, "error": f"Problem mit ID {item.problem_db_id} nicht gefunden"})
+            continue
+        
+        if problem.skill_id != item.skill_db_id:
+            errors.append({"index": index, "error": f"Problem {item.problem_db_id} gehört nicht zu Skill {item.skill_db_id}"})
+            continue
+        
+        rows.append({
+            "student_id": item.student_id,
+            "problem_id": item.problem_db_id,
+            "skill_id": item.skill_db_id,
+            "is_correct": item.is_correct,
+            "timestamp": item.timestamp
+        })
+    
+    inserted = crud.create_interactions_bulk(db, rows)
+    processing_time = (datetime.now() - start_time).total_seconds()
+    metrics.record_import("batch", inserted, processing_time)
+    
+    logger.info(f"Batch-Ingestion: {inserted}/{len(items)} Interaktionen gespeichert in {processing_time:.3f}s")
+    
+    return schemas.InteractionBatchResult(
+        received=len(items),
+        inserted=inserted,
+        failed=len(errors),
+        errors=errors,
+        processing_time_seconds=processing_time
+    )
+
 # Get student interactions
 @router.get("/students/{student_id}/interactions")
 async def get_student_interactions(
     student_id: int,
     limit: Optional[int] = Query(100, ge=1, le=1000),
     skill_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Ruft die Interaktionen eines Schülers ab."""
-    student = crud.get_student(db, student_id)
+    """
+    Ruft die Interaktionen eines Schülers ab (neueste zuerst).
+    
+    Ist die Seite voll, enthält next_cursor den Cursor für die nächste Seite.
+    Für die vollständige Historie siehe /students/{student_id}/interactions/export.
+    """
+    try:
+        after = decode_interaction_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    student = await crud_async.get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
     
-    interactions = crud.get_student_interactions(
+    interactions = await crud_async.get_student_interactions(
         db, 
         student_id, 
         limit=limit,
-        skill_id=skill_id
+        skill_id=skill_id,
+        after=after
     )
     
     # Formatiere für API Response
@@ -126,24 +259,106 @@ async def get_student_interactions(
             "is_correct": interaction.is_correct
         })
     
+    next_cursor = None
+    if interactions and len(interactions) == limit:
+        next_cursor = interaction_cursor(interactions[-1].timestamp, interactions[-1].id)
+    
     return {
         "student_id": student_id,
         "total_interactions": len(result),
-        "interactions": result
+        "interactions": result,
+        "next_cursor": next_cursor
     }
 
+def _export_interactions(student_id: int, skill_id: Optional[int]) -> Iterator[str]:
+    """
+    NDJSON-Zeilen aller Interaktionen eines Schülers (älteste zuerst).
+    
+    Läuft in einer eigenen Session, da die Antwort erst nach dem Request-Handler
+    gestreamt wird. yield_per liest die Zeilen blockweise (serverseitiger Cursor),
+    Problem und Skill kommen aus dem Katalog.
+    """
+    db = SessionLocal()
+    try:
+        catalog = get_catalog(db)
+        statement = (
+            select(
+                Interaction.id,
+                Interaction.timestamp,
+                Interaction.problem_id,
+                Interaction.skill_id,
+                Interaction.is_correct
+            )
+            .where(Interaction.student_id == student_id)
+            .order_by(*interaction_order(sort_desc=False))
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if skill_id:
+            statement = statement.where(Interaction.skill_id == skill_id)
+        
+        for rows in db.execute(statement).partitions():
+            lines = []
+            for row in rows:
+                problem = catalog.problem(row.problem_id)
+                skill = catalog.skill(row.skill_id)
+                lines.append(json.dumps({
+                    "id": row.id,
+                    "timestamp": row.timestamp.isoformat(),
+                    "problem": {
+                        "id": row.problem_id,
+                        "original_id": problem.original_problem_id if problem else None,
+                        "description": problem.description_placeholder if problem else None
+                    },
+                    "skill": {
+                        "id": row.skill_id,
+                        "name": skill.name if skill else None
+                    },
+                    "is_correct": row.is_correct
+                }, ensure_ascii=False))
+            yield "\n".join(lines) + "\n"
+    finally:
+        db.close()
+
+# Export student interactions (NDJSON)
+@router.get("/students/{student_id}/interactions/export")
+async def export_student_interactions(
+    student_id: int,
+    skill_id: Optional[int] = None,
+    current_teacher: Teacher = Depends(get_current_teacher),
+    token_payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Exportiert alle Interaktionen eines Schülers als NDJSON (eine Interaktion pro Zeile).
+    
+    Die Antwort wird gestreamt; der Speicherbedarf hängt nicht von der Länge der Historie ab.
+    Nur für die Lehrkraft der Klasse des Schülers.
+    """
+    student = await crud_async.get_student(db, student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
+    
+    # Vor dem Öffnen des Streams prüfen: der Generator läuft erst nach dem Handler
+    await check_class_ownership_async(db, student.class_id, current_teacher.id, expires_at=token_payload.get("exp"))
+    
+    return StreamingResponse(
+        _export_interactions(student_id, skill_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="student_{student_id}_interactions.ndjson"'}
+    )
+
 # Get student statistics
 @router.get("/students/{student_id}/statistics")
 async def get_student_statistics(
     student_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Berechnet Statistiken für einen Schüler."""
-    student = crud.get_student(db, student_id)
+    student = await crud_async.get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Schüler nicht gefunden")
     
-    stats = crud.get_student_statistics(db, student_id)
+    stats = await crud_async.get_student_statistics(db, student_id)
     
     return {
         "student_id": student_id,
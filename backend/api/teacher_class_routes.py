@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Any # Any hinzugefügt für die neue Dashboard Route
-from database import crud
+from database import crud, crud_async
 from database.models import Teacher
-from .auth_dependencies import get_db, get_current_teacher, verify_class_ownership
+from .auth_dependencies import get_db, get_async_db, get_current_teacher, verify_class_ownership
 from schemas.class_schemas import ClassRead, ClassCreate, ClassDashboardRead 
 from schemas.teacher_schemas import TeacherRead
+from services import auth_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,12 +19,12 @@ async def get_my_classes(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     current_teacher: Teacher = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Listet alle Klassen des aktuellen Teachers auf.
     """
-    classes = crud.get_classes_by_teacher(
+    classes = await crud_async.get_classes_by_teacher(
         db,
         teacher_id=current_teacher.id,
         skip=skip,
@@ -34,14 +36,14 @@ async def get_my_classes(
 async def get_class_details(
     class_id: int,
     current_teacher: Teacher = Depends(get_current_teacher),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(verify_class_ownership) 
 ):
     """
     Ruft Details einer spezifischen Klasse ab.
     Nur der Eigentümer kann darauf zugreifen.
     """
-    class_obj = crud.get_class(db, class_id)
+    class_obj = await crud_async.get_class(db, class_id)
     if not class_obj: 
         raise HTTPException(status_code=404, detail="Klasse nicht gefunden")
     return class_obj
@@ -94,6 +96,7 @@ async def delete_class(
         deleted_class = crud.delete_class(db, class_id)
         if not deleted_class:
              raise HTTPException(status_code=404, detail="Klasse nicht gefunden oder konnte nicht gelöscht werden.")
+        auth_cache.forget_class(class_id)
         
         logger.info(f"Teacher {current_teacher.username} deleted class: {deleted_class.name}")
         return {"message": f"Klasse '{deleted_class.name}' erfolgreich gelöscht"}
@@ -113,38 +116,21 @@ async def get_teacher_profile(
 @router.get("/teacher/statistics")
 async def get_teacher_statistics( 
     current_teacher: Teacher = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Gibt Statistiken über alle Klassen und Schüler des Teachers zurück.
     """
-    from sqlalchemy import func #
-    
-    class_count = db.query(func.count(crud.models.Class.id))\
-        .filter(crud.models.Class.teacher_id == current_teacher.id).scalar()
-    
-    student_count = db.query(func.count(crud.models.Student.id))\
-        .join(crud.models.Class)\
-        .filter(crud.models.Class.teacher_id == current_teacher.id)\
-        .filter(crud.models.Student.is_deleted == False).scalar()
-    
-    interaction_count = db.query(func.count(crud.models.Interaction.id))\
-        .join(crud.models.Student)\
-        .join(crud.models.Class)\
-        .filter(crud.models.Class.teacher_id == current_teacher.id).scalar()
-    
-    last_interaction = db.query(func.max(crud.models.Interaction.timestamp))\
-        .join(crud.models.Student)\
-        .join(crud.models.Class)\
-        .filter(crud.models.Class.teacher_id == current_teacher.id).scalar()
+    stats = await crud_async.get_teacher_statistics(db, current_teacher.id)
+    last_interaction = stats["last_activity"]
     
     return {
         "teacher_id": current_teacher.id,
         "username": current_teacher.username,
         "statistics": {
-            "total_classes": class_count or 0,
-            "total_students": student_count or 0,
-            "total_interactions": interaction_count or 0,
+            "total_classes": stats["total_classes"],
+            "total_students": stats["total_students"],
+            "total_interactions": stats["total_interactions"],
             "last_activity": last_interaction.isoformat() if last_interaction else None,
             "member_since": current_teacher.created_at.isoformat()
         }
@@ -155,11 +141,11 @@ async def get_teacher_statistics(
 async def get_teacher_dashboard_classes(
     limit: int = Query(5, ge=1, le=10, description="Maximale Anzahl der Klassen, die zurückgegeben werden sollen."),
     current_teacher: Teacher = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Ruft eine Liste der Klassen der Lehrkraft mit aggregierten Dashboard-Informationen ab
     (ID, Name, Schüleranzahl).
     """
-    classes_data = crud.get_classes_for_dashboard(db, teacher_id=current_teacher.id, limit=limit)
+    classes_data = await crud_async.get_classes_for_dashboard(db, teacher_id=current_teacher.id, limit=limit)
     return classes_data
\ No newline at end of file
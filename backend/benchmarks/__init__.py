@@ -0,0 +1,6 @@
+"""
+Benchmarks für das Backend.
+
+Ausführen aus dem backend/ Verzeichnis, z.B.:
+    python -m benchmarks.bench_batch_ingest --output bench_batch_ingest.json
+"""
@@ -0,0 +1,333 @@
+"""
+Benchmark-Baselines und Regressionsvergleich.
+
+Eine Baseline ist eine versionierte JSON-Datei mit den Metriken einer oder mehrerer
+Benchmark-Reports (siehe common.py), dazu Git-Commit und Umgebung der Messung.
+Spätere Läufe werden dagegen verglichen; Metriken mit Suffix ``_per_second`` sind
+besser, wenn sie steigen, alle anderen, wenn sie sinken.
+
+    # Standard-Suite laufen lassen (ein Report pro Benchmark)
+    python -m benchmarks.baseline run --output-dir benchmark-results
+
+    # Reports als Baseline speichern (--merge ersetzt nur die enthaltenen Benchmarks)
+    python -m benchmarks.baseline save benchmark-results/*.json --baseline benchmarks/baselines/local.json
+
+    # Neue Reports gegen die Baseline prüfen; Exit-Code 1 bei Regression
+    python -m benchmarks.baseline compare benchmark-results/*.json --baseline benchmarks/baselines/local.json \\
+        --tolerance 0.1 --metric-tolerance "*.p99_ms=0.3" --only-changes
+
+Baselines sind nur auf derselben Maschine aussagekräftig; bei abweichender
+Umgebung oder abweichenden Benchmark-Parametern wird gewarnt.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from benchmarks.common import environment_info, higher_is_better
+
+BASELINE_FORMAT_VERSION = 1
+
+# Name -> (Modul, Argumente); klein genug für einen Lauf vor jedem Merge
+SUITE: Dict[str, Tuple[str, List[str]]] = {
+    "akt_inference": (
+        "benchmarks.bench_akt_inference",
+        ["--batch-sizes", "1", "32", "--history-lengths", "10", "200", "--repeat", "10"]
+    ),
+    "batch_ingest": ("benchmarks.bench_batch_ingest", ["--rows", "5000", "--single-rows", "500"]),
+    "serialization": ("benchmarks.bench_serialization", ["--repeat", "20"]),
+    "load": ("benchmarks.bench_load", ["--requests", "100", "--concurrency", "1", "8"]),
+    "startup": ("benchmarks.bench_startup", ["--repeat", "3", "--ready-timeout", "10"])
+}
+
+# Nicht vergleichsrelevante Parameter
+IGNORED_PARAMS = {"output"}
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _comparable_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in params.items() if key not in IGNORED_PARAMS}
+
+def load_reports(paths: List[str]) -> List[Dict[str, Any]]:
+    reports = []
+    for path in paths:
+        with open(path) as f:
+            report = json.load(f)
+        if "benchmark" not in report or "metrics" not in report:
+            raise ValueError(f"'{path}' ist kein Benchmark-Report")
+        reports.append(report)
+    return reports
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        baseline = json.load(f)
+    version = baseline.get("format_version")
+    if version != BASELINE_FORMAT_VERSION:
+        raise ValueError(f"Baseline-Format {version} wird nicht unterstützt (erwartet {BASELINE_FORMAT_VERSION})")
+    return baseline
+
+def build_baseline(reports: List[Dict[str, Any]], label: Optional[str] = None, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Baseline aus Reports; mit previous bleiben dort nicht enthaltene Benchmarks erhalten."""
+    benchmarks = dict(previous["benchmarks"]) if previous else {}
+    for report in reports:
+        benchmarks[report["benchmark"]] = {
+            "created_at": report.get("created_at"),
+            "params": _comparable_params(report.get("params", {})),
+            "metrics": report["metrics"]
+        }
+    return {
+        "format_version": BASELINE_FORMAT_VERSION,
+        "label": label or (previous or {}).get("label"),
+        "created_at": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "environment": environment_info(),
+        "benchmarks": dict(sorted(benchmarks.items()))
+    }
+
+def tolerance_for(metric: str, default: float, overrides: List[Tuple[str, float]]) -> float:
+    """Toleranz einer Metrik; das letzte passende Muster aus overrides gewinnt."""
+    tolerance = default
+    for pattern, value in overrides:
+        if fnmatch.fnmatch(metric, pattern):
+            tolerance = value
+    return tolerance
+
+def compare_metric(metric: str, baseline: float, current: float, tolerance: float) -> Tuple[Optional[float], str]:
+    """
+    Vergleicht einen Messwert mit der Baseline.
+
+    Returns:
+        (relative Änderung oder None bei Baseline 0, Status: ok | besser | REGRESSION)
+    """
+    if baseline == 0:
+        if current == 0:
+            return 0.0, "ok"
+        worse = current < 0 if higher_is_better(metric) else current > 0
+        return None, "REGRESSION" if worse else "besser"
+
+    change = (current - baseline) / abs(baseline)
+    signed = change if higher_is_better(metric) else -change  # positiv = besser
+    if signed < -tolerance:
+        return change, "REGRESSION"
+    if signed > tolerance:
+        return change, "besser"
+    return change, "ok"
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    reports: List[Dict[str, Any]],
+    tolerance: float = 0.1,
+    overrides: Optional[List[Tuple[str, float]]] = None,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Vergleicht Reports mit der Baseline.
+
+    Args:
+        overrides: (Muster, Toleranz) für einzelne Metriken, Muster wie "load.*.p99_ms"
+        include / exclude: Muster für zu vergleichende bzw. auszulassende Metriken
+
+    Returns:
+        (Zeilen der Vergleichstabelle, Warnungen)
+    """
+    overrides = overrides or []
+    rows, warnings = [], []
+
+    def selected(key: str) -> bool:
+        if include and not any(fnmatch.fnmatch(key, p) for p in include):
+            return False
+        return not (exclude and any(fnmatch.fnmatch(key, p) for p in exclude))
+
+    for report in reports:
+        name = report["benchmark"]
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            warnings.append(f"{name}: keine Baseline vorhanden")
+            continue
+        if _comparable_params(report.get("params", {})) != reference.get("params", {}):
+            warnings.append(f"{name}: Parameter weichen von der Baseline ab")
+
+        metrics = report["metrics"]
+        for metric in sorted(set(metrics) | set(reference["metrics"])):
+            key = f"{name}.{metric}"
+            if not selected(key):
+                continue
+            row = {
+                "benchmark": name,
+                "metric": metric,
+                "baseline": reference["metrics"].get(metric),
+                "current": metrics.get(metric),
+                "change": None
+            }
+            if row["baseline"] is None:
+                row["status"] = "neu"
+            elif row["current"] is None:
+                row["status"] = "fehlt"
+            else:
+                row["change"], row["status"] = compare_metric(
+                    metric, row["baseline"], row["current"], tolerance_for(key, tolerance, overrides)
+                )
+            rows.append(row)
+
+    current_env, baseline_env = environment_info(), baseline.get("environment", {})
+    differing = [key for key in ("platform", "processor", "cpu_count", "python") if current_env.get(key) != baseline_env.get(key)]
+    if differing:
+        warnings.append(f"Umgebung weicht von der Baseline ab ({', '.join(differing)})")
+    return rows, warnings
+
+def _format_value(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.4g}"
+
+def _format_change(row: Dict[str, Any]) -> str:
+    if row["change"] is None:
+        return "-"
+    return f"{row['change'] * 100:+.1f}%"
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Vergleichstabelle als Text (eine Zeile pro Metrik)."""
+    header = ("Benchmark", "Metrik", "Baseline", "Aktuell", "Änderung", "Status")
+    lines = [
+        (row["benchmark"], row["metric"], _format_value(row["baseline"]),
+         _format_value(row["current"]), _format_change(row), row["status"])
+        for row in rows
+    ]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *lines)]
+    numeric = {2, 3, 4}
+
+    def render(cells):
+        return "  ".join(
+            str(cell).rjust(width) if i in numeric else str(cell).ljust(width)
+            for i, (cell, width) in enumerate(zip(cells, widths))
+        ).rstrip()
+
+    return "\n".join([render(header), render(["-" * w for w in widths])] + [render(line) for line in lines])
+
+def _parse_override(value: str) -> Tuple[str, float]:
+    pattern, sep, tolerance = value.rpartition("=")
+    if not sep or not pattern:
+        raise argparse.ArgumentTypeError(f"Erwartet MUSTER=TOLERANZ, nicht '{value}'")
+    try:
+        return pattern, float(tolerance)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültige Toleranz in '{value}'")
+
+def cmd_run(args) -> int:
+    os.makedirs(args.output_dir, exist_ok=True)
+    names = args.only or list(SUITE)
+    unknown = [name for name in names if name not in SUITE]
+    if unknown:
+        print(f"Unbekannte Benchmarks: {', '.join(unknown)} (verfügbar: {', '.join(SUITE)})", file=sys.stderr)
+        return 2
+    failed = []
+    for name in names:
+        module, argv = SUITE[name]
+        output = os.path.join(args.output_dir, f"{name}.json")
+        print(f"==> {name}", file=sys.stderr)
+        result = subprocess.run([sys.executable, "-m", module, *argv, "--output", output])
+        if result.returncode != 0:
+            failed.append(name)
+    if failed:
+        print(f"Fehlgeschlagen: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+def cmd_save(args) -> int:
+    previous = None
+    if args.merge and os.path.exists(args.baseline):
+        previous = load_baseline(args.baseline)
+    baseline = build_baseline(load_reports(args.reports), label=args.label, previous=previous)
+    directory = os.path.dirname(args.baseline)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.baseline, "w") as f:
+        json.dump(baseline, f, indent=2, default=str)
+        f.write("\n")
+    print(
+        f"Baseline gespeichert in '{args.baseline}' "
+        f"({', '.join(baseline['benchmarks'])}; Commit {baseline['git_commit'] or 'unbekannt'})",
+        file=sys.stderr
+    )
+    return 0
+
+def cmd_compare(args) -> int:
+    baseline = load_baseline(args.baseline)
+    rows, warnings = compare_reports(
+        baseline,
+        load_reports(args.reports),
+        tolerance=args.tolerance,
+        overrides=args.metric_tolerance,
+        include=args.metrics,
+        exclude=args.ignore
+    )
+    failing = {"REGRESSION", "fehlt"} if args.fail_on_missing else {"REGRESSION"}
+    regressions = [row for row in rows if row["status"] in failing]
+
+    shown = [row for row in rows if row["status"] != "ok"] if args.only_changes else rows
+    print(f"Baseline: {args.baseline} (Commit {baseline.get('git_commit') or 'unbekannt'}, {baseline.get('created_at')})")
+    print(f"Toleranz: {args.tolerance:.0%}" + "".join(f", {p}={t:.0%}" for p, t in args.metric_tolerance))
+    print()
+    print(format_table(shown) if shown else "Keine Abweichungen.")
+    for warning in warnings:
+        print(f"Warnung: {warning}", file=sys.stderr)
+    print()
+    counts = {status: sum(1 for row in rows if row["status"] == status) for status in ("ok", "besser", "REGRESSION", "neu", "fehlt")}
+    print(", ".join(f"{count} {status}" for status, count in counts.items() if count))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"baseline": args.baseline, "rows": rows, "warnings": warnings}, f, indent=2)
+    return 1 if regressions else 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Standard-Suite laufen lassen")
+    run.add_argument("--output-dir", default="benchmark-results")
+    run.add_argument("--only", nargs="+", help=f"Nur diese Benchmarks ({', '.join(SUITE)})")
+    run.set_defaults(func=cmd_run)
+
+    save = commands.add_parser("save", help="Reports als Baseline speichern")
+    save.add_argument("reports", nargs="+", help="Report-Dateien (JSON)")
+    save.add_argument("--baseline", required=True, help="Baseline-Datei")
+    save.add_argument("--label", help="Beschreibung, z.B. Maschine oder Release")
+    save.add_argument("--merge", action="store_true", help="Andere Benchmarks der bestehenden Baseline behalten")
+    save.set_defaults(func=cmd_save)
+
+    compare = commands.add_parser("compare", help="Reports mit der Baseline vergleichen")
+    compare.add_argument("reports", nargs="+", help="Report-Dateien (JSON)")
+    compare.add_argument("--baseline", required=True, help="Baseline-Datei")
+    compare.add_argument("--tolerance", type=float, default=0.1, help="Erlaubte relative Verschlechterung (Standard 0.1 = 10%%)")
+    compare.add_argument(
+        "--metric-tolerance", type=_parse_override, action="append", default=[], metavar="MUSTER=TOLERANZ",
+        help="Toleranz für Metriken nach Muster auf <benchmark>.<metrik>, z.B. '*.p99_ms=0.3'"
+    )
+    compare.add_argument("--metrics", action="append", metavar="MUSTER", help="Nur passende Metriken vergleichen")
+    compare.add_argument("--ignore", action="append", metavar="MUSTER", help="Passende Metriken auslassen")
+    compare.add_argument("--fail-on-missing", action="store_true", help="Fehlende Metriken als Regression werten")
+    compare.add_argument("--only-changes", action="store_true", help="Nur Zeilen mit Status != ok anzeigen")
+    compare.add_argument("--output", help="Vergleich zusätzlich als JSON speichern")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
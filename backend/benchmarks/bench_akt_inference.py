@@ -0,0 +1,212 @@
+"""
+Inferenz-Benchmark für AKT.forward und AKTModelService.
+
+Läuft offline auf CPU mit einem zufällig initialisierten Modell in der Form des
+Produktionsmodells (services.akt_model_service.DEFAULT_MODEL_PARAMS: n_question 102,
+n_pid 3162, d_model 256, seqlen 200); der echte Checkpoint wird nicht gebraucht.
+
+Gemessen werden:
+  - forward:  AKT.forward für Batchgrößen 1-256 (volle Sequenzlänge, wie im Service
+              vorne gepaddet), je Variante fp32 (torch.no_grad, wie der Service),
+              inference_mode, bf16-Autocast und dynamisch quantisiertes int8
+  - service:  predict_next_correct_probability und _prepare_sequences für
+              Historienlängen 1-200 und ein komplettes Mastery-Profil
+              (get_skill_mastery für alle Skills)
+
+Latenzen als p50/p95/p99 in ms, Durchsatz in Sequenzen pro Sekunde, dazu der
+maximale Abstand der Vorhersagen jeder Variante zu fp32 und der Peak-RSS des
+Prozesses (Hochwassermarke, die Fälle laufen daher nach Größe aufsteigend).
+
+    python -m benchmarks.bench_akt_inference --batch-sizes 1 8 32 128 256 --repeat 20
+"""
+import argparse
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+import numpy as np
+import torch
+from torch import nn
+from database.history import StudentHistory
+from services.akt_model_service import AKTModelService, DEFAULT_MODEL_PARAMS, build_akt_model
+from services.catalog import MODEL_INDEX_OFFSET
+from benchmarks.common import build_report, percentiles, write_report
+
+DEFAULT_BATCH_SIZES = [1, 8, 32, 64, 128, 256]
+DEFAULT_HISTORY_LENGTHS = [1, 10, 50, 100, 200]
+
+def peak_rss_mb() -> float:
+    """Peak-RSS des Prozesses in MB (ru_maxrss ist auf Linux in KB, auf macOS in Bytes)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def random_batch(params, batch_size: int, history_length: int, rng: np.random.Generator):
+    """Zufällige Modell-Eingaben (q, qa, target, pid), vorne auf seqlen gepaddet."""
+    seqlen = params.seqlen
+    length = min(history_length, seqlen)
+    q = np.zeros((batch_size, seqlen), dtype=np.int64)
+    qa = np.zeros((batch_size, seqlen), dtype=np.int64)
+    pid = np.zeros((batch_size, seqlen), dtype=np.int64)
+    q[:, -length:] = rng.integers(1, params.n_question + 1, size=(batch_size, length))
+    pid[:, -length:] = rng.integers(1, params.n_pid + 1, size=(batch_size, length))
+    qa[:, -length:] = q[:, -length:] + rng.integers(0, 2, size=(batch_size, length)) * params.n_question
+    q, qa, pid = (torch.from_numpy(a) for a in (q, qa, pid))
+    return q, qa, torch.ones_like(q, dtype=torch.float), pid
+
+def random_history(params, length: int, rng: np.random.Generator) -> StudentHistory:
+    """Zufällige Historie mit internal_idx aus dem Modellbereich."""
+    start = np.datetime64("2024-09-01T08:00:00", "us")
+    return StudentHistory(
+        problem_idx=rng.integers(0, params.n_pid, size=length) + 1 - MODEL_INDEX_OFFSET,
+        skill_idx=rng.integers(0, params.n_question, size=length) + 1 - MODEL_INDEX_OFFSET,
+        correct=rng.integers(0, 2, size=length),
+        timestamps=start + np.arange(length) * np.timedelta64(1, "s")
+    )
+
+def build_variants(model: nn.Module) -> Dict[str, Callable]:
+    """Inferenz-Varianten; jede liefert die Vorhersagen (sigmoid) als Tensor."""
+    def run(module, context):
+        def forward(q, qa, target, pid):
+            with context():
+                return module(q, qa, target, pid)[1].float()
+        return forward
+
+    variants = {
+        "fp32": run(model, torch.no_grad),
+        "inference_mode": run(model, torch.inference_mode)
+    }
+
+    @contextmanager
+    def bf16():
+        with torch.inference_mode(), torch.autocast("cpu", dtype=torch.bfloat16):
+            yield
+    variants["bf16"] = run(model, bf16)
+
+    try:
+        quantized = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        variants["int8_dynamic"] = run(quantized, torch.inference_mode)
+    except (RuntimeError, AssertionError) as e:  # kein Quantisierungs-Backend
+        print(f"int8_dynamic übersprungen: {e}", file=sys.stderr)
+    return variants
+
+def measure(func: Callable, warmup: int, repeat: int) -> List[float]:
+    """Laufzeiten in ms nach warmup Aufwärmläufen."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def bench_forward(model, params, batch_sizes, warmup, repeat, rng):
+    metrics, details = {}, {}
+    variants = build_variants(model)
+    for batch_size in sorted(batch_sizes):
+        inputs = random_batch(params, batch_size, params.seqlen, rng)
+        reference = variants["fp32"](*inputs)
+        for name, forward in variants.items():
+            samples = measure(lambda: forward(*inputs), warmup, repeat)
+            stats = percentiles(samples)
+            prefix = f"forward.{name}.b{batch_size}"
+            for point, value in stats.items():
+                metrics[f"{prefix}.{point}_ms"] = value
+            metrics[f"{prefix}.sequences_per_second"] = batch_size * 1000 / stats["p50"]
+            details[prefix] = {
+                "max_abs_diff_vs_fp32": float((forward(*inputs) - reference).abs().max()),
+                "peak_rss_mb": peak_rss_mb()
+            }
+    return metrics, details
+
+def bench_service(service, params, history_lengths, warmup, repeat, rng):
+    metrics, details = {}, {}
+    for length in sorted(history_lengths):
+        history = random_history(params, length, rng)
+        next_problem = int(history.problem_idx[-1])
+        next_skill = int(history.skill_idx[-1])
+        samples = measure(
+            lambda: service.predict_next_correct_probability(history, next_problem, next_skill),
+            warmup, repeat
+        )
+        stats = percentiles(samples)
+        for point, value in stats.items():
+            metrics[f"service.predict.h{length}.{point}_ms"] = value
+        metrics[f"service.predict.h{length}.predictions_per_second"] = 1000 / stats["p50"]
+
+        # Nur die Vorbereitung der Eingaben (ohne Forward)
+        samples = measure(
+            lambda: service._prepare_sequences(history, next_problem, next_skill),
+            warmup, repeat * 10
+        )
+        for point, value in percentiles(samples).items():
+            metrics[f"service.prepare.h{length}.{point}_ms"] = value
+
+    # Mastery-Profil wie GET /students/{id}/mastery-profile: ein Forward pro geübtem Skill
+    history = random_history(params, params.seqlen, rng)
+    skills = range(1 - MODEL_INDEX_OFFSET, params.n_question + 1 - MODEL_INDEX_OFFSET)
+    samples = measure(
+        lambda: [service.get_skill_mastery(history, skill) for skill in skills],
+        min(warmup, 1), max(1, repeat // 5)
+    )
+    for point, value in percentiles(samples).items():
+        metrics[f"service.mastery_profile.{point}_ms"] = value
+    details["service.mastery_profile"] = {
+        "history_length": len(history),
+        "skills_practiced": int(len(np.unique(history.skill_idx))),
+        "peak_rss_mb": peak_rss_mb()
+    }
+    return metrics, details
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--history-lengths", type=int, nargs="+", default=DEFAULT_HISTORY_LENGTHS)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threads", type=int, help="torch.set_num_threads (Standard: PyTorch-Vorgabe)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-forward", action="store_true")
+    parser.add_argument("--skip-service", action="store_true")
+    parser.add_argument("--output", help="Report-Datei (JSON), sonst stdout")
+    args = parser.parse_args(argv)
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+
+    params = SimpleNamespace(**DEFAULT_MODEL_PARAMS)
+    model = build_akt_model(params, torch.device("cpu")).eval()
+    service = AKTModelService.from_model(model, params, model_version="random")
+
+    metrics = {"memory.model_rss_mb": peak_rss_mb()}
+    details = {}
+    if not args.skip_forward:
+        forward_metrics, forward_details = bench_forward(model, params, args.batch_sizes, args.warmup, args.repeat, rng)
+        metrics.update(forward_metrics)
+        details.update(forward_details)
+    if not args.skip_service:
+        service_metrics, service_details = bench_service(service, params, args.history_lengths, args.warmup, args.repeat, rng)
+        metrics.update(service_metrics)
+        details.update(service_details)
+    metrics["memory.peak_rss_mb"] = peak_rss_mb()
+
+    report = build_report(
+        "akt_inference",
+        metrics,
+        params={
+            **vars(args),
+            "model": DEFAULT_MODEL_PARAMS,
+            "torch": torch.__version__,
+            "torch_threads": torch.get_num_threads(),
+            "parameters": sum(p.numel() for p in model.parameters())
+        },
+        details=details
+    )
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Authentifizierung: Overhead pro geschütztem Request und Login-Durchsatz.
+
+Misst die Auth-Dependencies (Token prüfen, Teacher laden, Klassen-Besitz prüfen)
+mit leerem und gefülltem Cache sowie /api/auth/login bei steigender Parallelität,
+jeweils mit bcrypt im Thread Pool und (zum Vergleich) direkt im Event Loop.
+Die Event-Loop-Verzögerung zeigt, wie stark Logins andere Requests blockieren.
+
+    python -m benchmarks.bench_auth --requests 2000 --logins 32 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from database import db_setup
+from services import auth_cache
+from services.auth_service import auth_service
+from api.auth_dependencies import check_class_ownership, get_current_teacher, get_token_payload
+from fastapi.security import HTTPAuthorizationCredentials
+from benchmarks.common import (
+    build_report,
+    measure_loop_lag,
+    percentiles,
+    seed_synthetic_catalog,
+    seed_synthetic_school,
+    temporary_database,
+    write_report
+)
+
+PASSWORD = "benchmark"
+
+async def bench_dependencies(SessionLocal, token, class_id, n_requests, cold):
+    """Laufzeit der Auth-Dependencies eines Requests (mit eigener Session wie get_db)."""
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    samples = []
+    for _ in range(n_requests):
+        if cold:
+            auth_cache.clear()
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            payload = await get_token_payload(credentials)
+            teacher = await get_current_teacher(payload, db)
+            check_class_ownership(db, class_id, teacher.id, expires_at=payload.get("exp"))
+        finally:
+            db.close()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+async def _inline_verify_password(plain_password, hashed_password):
+    return auth_service.verify_password(plain_password, hashed_password)
+
+async def bench_logins(app, n_logins, concurrency):
+    """Parallele Logins über die ASGI-App; liefert Latenzen, Dauer, Fehler und Loop-Lag."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+        async def login():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/api/auth/login", json={"username": "teacher_0", "password": PASSWORD})
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(n_logins)])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        lags = await lag_task
+
+    return {
+        "seconds": elapsed,
+        "errors": errors,
+        "latency_ms": percentiles(latencies),
+        "loop_lag_ms": {**percentiles(lags), "max": max(lags, default=0.0)}
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests für den Dependency-Overhead")
+    parser.add_argument("--logins", type=int, default=32, help="Logins pro Parallelitätsstufe")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--output", help="Report-Datei (JSON), sonst stdout")
+    args = parser.parse_args(argv)
+
+    from main import app
+
+    with temporary_database() as (engine, SessionLocal):
+        db = SessionLocal()
+        seed_synthetic_catalog(db, n_skills=10, n_problems=100)
+        school = seed_synthetic_school(db, password_hash=auth_service.get_password_hash(PASSWORD))
+        db.close()
+        # Die App (get_db) auf die temporäre Datenbank umstellen
+        db_setup.configure_engine(engine.url.render_as_string(hide_password=False))
+
+        token = auth_service.create_access_token({"sub": str(school["teacher_ids"][0])})
+        class_id = school["class_ids"][0]
+
+        dependencies = {}
+        for mode, cold in (("cold", True), ("warm", False)):
+            auth_cache.clear()
+            samples = asyncio.run(bench_dependencies(SessionLocal, token, class_id, args.requests, cold))
+            dependencies[mode] = {**percentiles(samples), "mean": sum(samples) / len(samples)}
+
+        logins = {}
+        for mode in ("threadpool", "inline"):
+            if mode == "inline":
+                auth_service.verify_password_async = _inline_verify_password
+            try:
+                for concurrency in args.concurrency:
+                    logins[f"{mode}.c{concurrency}"] = asyncio.run(bench_logins(app, args.logins, concurrency))
+            finally:
+                auth_service.__dict__.pop("verify_password_async", None)
+
+    metrics = {
+        "auth.cold.p50_ms": dependencies["cold"]["p50"],
+        "auth.cold.p95_ms": dependencies["cold"]["p95"],
+        "auth.warm.p50_ms": dependencies["warm"]["p50"],
+        "auth.warm.p95_ms": dependencies["warm"]["p95"]
+    }
+    for key, result in logins.items():
+        metrics[f"login.{key}.logins_per_second"] = args.logins / result["seconds"]
+        metrics[f"login.{key}.p95_ms"] = result["latency_ms"]["p95"]
+        metrics[f"login.{key}.loop_lag_max_ms"] = result["loop_lag_ms"]["max"]
+
+    report = build_report(
+        "auth",
+        metrics,
+        params=vars(args),
+        details={"dependencies": dependencies, "logins": logins, "cache": auth_cache.info()}
+    )
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
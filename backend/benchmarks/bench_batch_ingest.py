@@ -0,0 +1,115 @@
+"""
+Durchsatz der Interaktions-Ingestion: Einzel-Inserts vs. Batch-Insert.
+
+    python -m benchmarks.bench_batch_ingest --rows 20000 --batch-size 500
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from database import crud
+from services.catalog import load_catalog
+import schemas
+from benchmarks.common import (
+    build_report,
+    seed_synthetic_catalog,
+    seed_synthetic_school,
+    temporary_database,
+    write_report
+)
+
+def generate_interactions(catalog, student_ids, n_rows, seed=0):
+    rng = random.Random(seed)
+    problem_ids = catalog.problem_ids.tolist()
+    start = datetime(2024, 9, 1, 8, 0, 0)
+    rows = []
+    for i in range(n_rows):
+        problem_id = rng.choice(problem_ids)
+        rows.append({
+            "student_id": rng.choice(student_ids),
+            "problem_id": problem_id,
+            "skill_id": catalog.problem(problem_id).skill_id,
+            "is_correct": rng.random() < 0.65,
+            "timestamp": start + timedelta(seconds=i)
+        })
+    return rows
+
+def bench_single(SessionLocal, rows):
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        for row in rows:
+            crud.create_interaction(
+                db,
+                schemas.InteractionCreate(
+                    problem_db_id=row["problem_id"],
+                    skill_db_id=row["skill_id"],
+                    is_correct=row["is_correct"],
+                    timestamp=row["timestamp"]
+                ),
+                row["student_id"]
+            )
+        return time.perf_counter() - start
+    finally:
+        db.close()
+
+def bench_batch(SessionLocal, rows, batch_size):
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        catalog = load_catalog(db)
+        for offset in range(0, len(rows), batch_size):
+            chunk = rows[offset:offset + batch_size]
+            # Validierung gegen den Katalog wie im Batch-Endpoint
+            valid = []
+            for row in chunk:
+                problem = catalog.problem(row["problem_id"])
+                if problem is not None and problem.skill_id == row["skill_id"]:
+                    valid.append(row)
+            crud.create_interactions_bulk(db, valid)
+        return time.perf_counter() - start
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000, help="Interaktionen für den Batch-Lauf")
+    parser.add_argument("--single-rows", type=int, default=1000, help="Interaktionen für den Einzel-Lauf")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--output", help="Report-Datei (JSON), sonst stdout")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode, n_rows in (("single", args.single_rows), ("batch", args.rows)):
+        with temporary_database() as (_, SessionLocal):
+            db = SessionLocal()
+            seed_synthetic_catalog(db)
+            school = seed_synthetic_school(db, students_per_class=args.students, password_hash="-")
+            rows = generate_interactions(load_catalog(db), school["student_ids"], n_rows)
+            db.close()
+
+            if mode == "single":
+                elapsed = bench_single(SessionLocal, rows)
+            else:
+                elapsed = bench_batch(SessionLocal, rows, args.batch_size)
+            results[mode] = {"rows": n_rows, "seconds": elapsed}
+
+    metrics = {
+        "single.rows_per_second": results["single"]["rows"] / results["single"]["seconds"],
+        "batch.rows_per_second": results["batch"]["rows"] / results["batch"]["seconds"],
+        "batch.seconds_per_batch": results["batch"]["seconds"] / max(1, -(-args.rows // args.batch_size))
+    }
+    report = build_report(
+        "batch_ingest",
+        metrics,
+        params=vars(args),
+        details={
+            **results,
+            "speedup": metrics["batch.rows_per_second"] / metrics["single.rows_per_second"]
+        }
+    )
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
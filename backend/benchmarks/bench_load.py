@@ -0,0 +1,300 @@
+"""
+Lasttest der gesamten API mit synthetischen Schulen.
+
+Legt eine temporäre SQLite-Datenbank mit synthetischem Katalog, Lehrkräften,
+Klassen, Schülern und ASSISTments-ähnlichen Interaktionen an
+(common.generate_synthetic_interactions) und treibt main.app in-process über
+httpx mit steigender Zahl paralleler Clients. Jeder Request wählt einen Endpunkt
+nach Gewicht (Dashboard, Schüleransichten, Mastery/Empfehlungen, CSV-Import und
+Batch-Ingestion) und einen Schüler aus den Klassen einer zufälligen Lehrkraft.
+
+Das Modell ist standardmäßig ein zufällig initialisiertes AKT in Produktionsform
+(wie benchmarks/bench_akt_inference); mit --model checkpoint lädt der Service wie
+im Betrieb den Checkpoint aus config (ohne Checkpoint liefern die
+Empfehlungs-Endpunkte 503).
+
+Berichtet pro Endpunkt und Parallelitätsstufe p50/p95/p99 und Fehler (Status >= 400
+oder Exception), dazu Durchsatz und Event-Loop-Verzögerung pro Stufe.
+
+    python -m benchmarks.bench_load --teachers 4 --classes 2 --students 30 --requests 300 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import io
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List
+import httpx
+import torch
+from database import crud, db_setup
+from services import akt_model_service
+from services.akt_model_service import AKTModelService, DEFAULT_MODEL_PARAMS, build_akt_model
+from services.auth_service import auth_service
+from services.catalog import invalidate_catalog, load_catalog
+from benchmarks.common import (
+    build_report,
+    generate_synthetic_interactions,
+    measure_loop_lag,
+    percentiles,
+    seed_synthetic_catalog,
+    seed_synthetic_school,
+    temporary_database,
+    write_report
+)
+
+SEED_CHUNK_SIZE = 5000
+
+def seed_school(SessionLocal, args) -> Dict[str, Any]:
+    """Katalog, Schule und Interaktionen anlegen; liefert die Daten für die Clients."""
+    db = SessionLocal()
+    try:
+        seed_synthetic_catalog(db, n_skills=args.skills, n_problems=args.problems, seed=args.seed)
+        school = seed_synthetic_school(
+            db,
+            n_teachers=args.teachers,
+            classes_per_teacher=args.classes,
+            students_per_class=args.students
+        )
+        catalog = load_catalog(db)
+        rows = generate_synthetic_interactions(
+            catalog, school["student_ids"], median_per_student=args.interactions, seed=args.seed
+        )
+        for offset in range(0, len(rows), SEED_CHUNK_SIZE):
+            crud.create_interactions_bulk(db, rows[offset:offset + SEED_CHUNK_SIZE])
+
+        # Klassen und Schüler pro Lehrkraft
+        teachers = []
+        for teacher_id in school["teacher_ids"]:
+            classes = {
+                c.id: [s.id for s in crud.get_students_by_class(db, c.id, limit=1000)]
+                for c in crud.get_classes_by_teacher(db, teacher_id)
+            }
+            teachers.append(SimpleNamespace(
+                id=teacher_id,
+                headers={"Authorization": f"Bearer {auth_service.create_access_token({'sub': str(teacher_id)})}"},
+                classes=classes
+            ))
+        return {
+            "teachers": teachers,
+            "catalog": catalog,
+            "interactions": len(rows),
+            "correct_rate": sum(row["is_correct"] for row in rows) / max(1, len(rows))
+        }
+    finally:
+        db.close()
+
+def install_random_model(seed: int) -> None:
+    """Zufällig initialisiertes Modell als geteilte Service-Instanz (statt Checkpoint)."""
+    torch.manual_seed(seed)
+    params = SimpleNamespace(**DEFAULT_MODEL_PARAMS)
+    model = build_akt_model(params, torch.device("cpu"))
+    akt_model_service._akt_service_instance = AKTModelService.from_model(model, params, model_version="random")
+
+class Workload:
+    """Gewichtete Auswahl von Requests (ein Request = eine Lehrkraft, ein Schüler)."""
+
+    def __init__(self, school: Dict[str, Any], rng: random.Random):
+        self.teachers = school["teachers"]
+        self.catalog = school["catalog"]
+        self.rng = rng
+        self.import_counter = 0
+        # Name -> (Gewicht, Funktion); Gewichte: typische Nutzung einer Lehrkraft
+        self.endpoints: Dict[str, tuple] = {
+            "dashboard_classes": (8, self.dashboard_classes),
+            "teacher_statistics": (5, self.teacher_statistics),
+            "class_students": (10, self.class_students),
+            "student_statistics": (10, self.student_statistics),
+            "student_interactions": (10, self.student_interactions),
+            "mastery_profile": (10, self.mastery_profile),
+            "recommended_problems": (10, self.recommended_problems),
+            "predict_performance": (5, self.predict_performance),
+            "skill_prognosis": (5, self.skill_prognosis),
+            "import_csv": (2, self.import_csv),
+            "interactions_batch": (3, self.interactions_batch)
+        }
+        self.names = list(self.endpoints)
+        self.weights = [self.endpoints[name][0] for name in self.names]
+
+    def pick(self):
+        name = self.rng.choices(self.names, weights=self.weights)[0]
+        teacher = self.rng.choice(self.teachers)
+        class_id = self.rng.choice(list(teacher.classes))
+        student_id = self.rng.choice(teacher.classes[class_id])
+        return name, self.endpoints[name][1], SimpleNamespace(teacher=teacher, class_id=class_id, student_id=student_id)
+
+    def _random_problem(self):
+        return self.catalog.problem(int(self.rng.choice(self.catalog.problem_ids)))
+
+    def dashboard_classes(self, client, ctx):
+        return client.get("/api/teacher/dashboard/classes", headers=ctx.teacher.headers)
+
+    def teacher_statistics(self, client, ctx):
+        return client.get("/api/teacher/statistics", headers=ctx.teacher.headers)
+
+    def class_students(self, client, ctx):
+        return client.get(f"/api/classes/{ctx.class_id}/students", headers=ctx.teacher.headers)
+
+    def student_statistics(self, client, ctx):
+        return client.get(f"/api/students/{ctx.student_id}/statistics", headers=ctx.teacher.headers)
+
+    def student_interactions(self, client, ctx):
+        return client.get(f"/api/students/{ctx.student_id}/interactions", params={"limit": 50}, headers=ctx.teacher.headers)
+
+    def mastery_profile(self, client, ctx):
+        return client.get(f"/api/recommendations/students/{ctx.student_id}/mastery-profile", headers=ctx.teacher.headers)
+
+    def recommended_problems(self, client, ctx):
+        return client.get(f"/api/recommendations/students/{ctx.student_id}/recommended-problems", headers=ctx.teacher.headers)
+
+    def predict_performance(self, client, ctx):
+        return client.get(
+            f"/api/recommendations/students/{ctx.student_id}/predict-performance",
+            params={"problem_id": self._random_problem().id},
+            headers=ctx.teacher.headers
+        )
+
+    def skill_prognosis(self, client, ctx):
+        skill_id = self._random_problem().skill_id
+        return client.get(f"/api/recommendations/students/{ctx.student_id}/skills/{skill_id}/prognosis", headers=ctx.teacher.headers)
+
+    def import_csv(self, client, ctx, rows: int = 20):
+        # Neue Timestamps pro Upload, damit der Import nicht aus dem Idempotenz-Cache kommt
+        self.import_counter += 1
+        start = datetime(2025, 1, 1) + timedelta(days=self.import_counter)
+        lines = ["student_id,problem_id,skill_id,correct,timestamp"]
+        for i in range(rows):
+            problem = self._random_problem()
+            skill = self.catalog.skill(problem.skill_id)
+            timestamp = (start + timedelta(seconds=30 * i)).strftime("%Y-%m-%d %H:%M:%S")
+            lines.append(f"{ctx.student_id},{problem.original_problem_id},{skill.original_skill_id},{int(self.rng.random() < 0.65)},{timestamp}")
+        return client.post(
+            "/api/import/interactions",
+            data={"class_id": str(ctx.class_id)},
+            files={"file": ("load.csv", io.BytesIO("\n".join(lines).encode()), "text/csv")},
+            headers=ctx.teacher.headers
+        )
+
+    def interactions_batch(self, client, ctx, items: int = 50):
+        students = [s for students in ctx.teacher.classes.values() for s in students]
+        now = datetime.utcnow()
+        interactions = []
+        for i in range(items):
+            problem = self._random_problem()
+            interactions.append({
+                "student_id": self.rng.choice(students),
+                "problem_db_id": problem.id,
+                "skill_db_id": problem.skill_id,
+                "is_correct": self.rng.random() < 0.65,
+                "timestamp": (now + timedelta(microseconds=i)).isoformat()
+            })
+        return client.post("/api/students/interactions:batch", json={"interactions": interactions}, headers=ctx.teacher.headers)
+
+async def run_level(app, workload: Workload, n_requests: int, concurrency: int) -> Dict[str, Any]:
+    """n_requests Requests mit concurrency parallelen Clients."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, Counter] = defaultdict(Counter)
+    remaining = n_requests
+
+    async with httpx.AsyncClient(app=app, base_url="http://loadtest", timeout=None) as client:
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                name, request, ctx = workload.pick()
+                start = time.perf_counter()
+                try:
+                    response = await request(client, ctx)
+                    if response.status_code >= 400:
+                        errors[name][str(response.status_code)] += 1
+                except Exception as e:
+                    errors[name][type(e).__name__] += 1
+                latencies[name].append((time.perf_counter() - start) * 1000)
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        lags = await lag_task
+
+    return {
+        "seconds": elapsed,
+        "requests": n_requests,
+        "endpoints": {
+            name: {
+                "count": len(samples),
+                "errors": sum(errors[name].values()),
+                "error_types": dict(errors[name]),
+                "latency_ms": percentiles(samples)
+            }
+            for name, samples in sorted(latencies.items())
+        },
+        "loop_lag_ms": {**percentiles(lags), "max": max(lags, default=0.0)}
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teachers", type=int, default=2)
+    parser.add_argument("--classes", type=int, default=2, help="Klassen pro Lehrkraft")
+    parser.add_argument("--students", type=int, default=30, help="Schüler pro Klasse")
+    parser.add_argument("--interactions", type=int, default=60, help="Median der Interaktionen pro Schüler")
+    parser.add_argument("--skills", type=int, default=DEFAULT_MODEL_PARAMS["n_question"])
+    parser.add_argument("--problems", type=int, default=DEFAULT_MODEL_PARAMS["n_pid"])
+    parser.add_argument("--requests", type=int, default=200, help="Requests pro Parallelitätsstufe")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--model", choices=["random", "checkpoint"], default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Report-Datei (JSON), sonst stdout")
+    args = parser.parse_args(argv)
+
+    from main import app
+
+    with temporary_database() as (engine, SessionLocal):
+        seed_start = time.perf_counter()
+        school = seed_school(SessionLocal, args)
+        seed_seconds = time.perf_counter() - seed_start
+
+        # Die App (get_db, Katalog, Modell) auf die temporäre Datenbank umstellen
+        db_setup.configure_engine(engine.url.render_as_string(hide_password=False))
+        invalidate_catalog()
+        if args.model == "random":
+            install_random_model(args.seed)
+
+        workload = Workload(school, random.Random(args.seed))
+        levels = {}
+        for concurrency in args.concurrency:
+            levels[f"c{concurrency}"] = asyncio.run(run_level(app, workload, args.requests, concurrency))
+
+    metrics = {}
+    for level, result in levels.items():
+        metrics[f"{level}.requests_per_second"] = result["requests"] / result["seconds"]
+        metrics[f"{level}.errors"] = sum(endpoint["errors"] for endpoint in result["endpoints"].values())
+        metrics[f"{level}.loop_lag_max_ms"] = result["loop_lag_ms"]["max"]
+        for name, endpoint in result["endpoints"].items():
+            for point, value in endpoint["latency_ms"].items():
+                metrics[f"{name}.{level}.{point}_ms"] = value
+            metrics[f"{name}.{level}.errors"] = endpoint["errors"]
+
+    report = build_report(
+        "load",
+        metrics,
+        params=vars(args),
+        details={
+            "seed": {
+                "seconds": seed_seconds,
+                "teachers": len(school["teachers"]),
+                "students": sum(len(s) for t in school["teachers"] for s in t.classes.values()),
+                "interactions": school["interactions"],
+                "correct_rate": school["correct_rate"]
+            },
+            "levels": levels
+        }
+    )
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
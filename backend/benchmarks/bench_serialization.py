@@ -0,0 +1,147 @@
+"""
+Serialisierung eines Klassen-Reports (Mastery-Profile aller Schüler einer Klasse).
+
+Vergleicht den Standardweg von FastAPI (erneute Validierung über response_model,
+Encoding nach JSON-Typen, json.dumps) mit orjson, model_dump_json
+(api/responses.py: trusted_response) und model_construct. Alle Zeiten enthalten
+den Aufbau der Modelle. Dazu die übertragenen Bytes unkomprimiert, mit Gzip und
+(falls installiert) Brotli.
+
+    python -m benchmarks.bench_serialization --students 30 --skills 102 --repeat 50
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from typing import List
+import orjson
+from pydantic import TypeAdapter
+from api.compression import brotli
+from schemas.recommendation_schemas import ConceptMasteryData, MasteryProfileResponse
+from benchmarks.common import build_report, write_report
+
+def generate_profiles(n_students: int, n_skills: int, seed: int = 0) -> List[dict]:
+    """Rohdaten wie sie der Mastery-Endpunkt pro Schüler erzeugt."""
+    rng = random.Random(seed)
+    return [
+        {
+            "student_db_id": s + 1,
+            "student_first_name": f"Vorname{s}",
+            "student_last_name": f"Nachname{s}",
+            "profile_data": [
+                {
+                    "concept_db_id": k + 1,
+                    "internal_concept_idx": k,
+                    "original_skill_id": f"skill_{k}",
+                    "concept_name": f"Skill {k}",
+                    "mastery_score": round(rng.random(), 3),
+                    "confidence": rng.choice(["low", "medium", "high"]),
+                    "probes_evaluated": rng.randint(0, 40)
+                }
+                for k in range(n_skills)
+            ]
+        }
+        for s in range(n_students)
+    ]
+
+_report_adapter = TypeAdapter(List[MasteryProfileResponse])
+
+def build_models(profiles: List[dict]) -> List[MasteryProfileResponse]:
+    return [MasteryProfileResponse(**profile) for profile in profiles]
+
+def construct_models(profiles: List[dict]) -> List[MasteryProfileResponse]:
+    return [
+        MasteryProfileResponse.model_construct(
+            student_db_id=profile["student_db_id"],
+            student_first_name=profile["student_first_name"],
+            student_last_name=profile["student_last_name"],
+            profile_data=[ConceptMasteryData.model_construct(**concept) for concept in profile["profile_data"]]
+        )
+        for profile in profiles
+    ]
+
+def serialize_fastapi_default(profiles: List[dict]) -> bytes:
+    # Wie FastAPI mit response_model: model_dump, erneut validieren, nach JSON-Typen, json.dumps
+    content = [model.model_dump() for model in build_models(profiles)]
+    content = _report_adapter.dump_python(_report_adapter.validate_python(content), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def serialize_orjson(profiles: List[dict]) -> bytes:
+    # model_dump + orjson (Weg über ORJSONResponse)
+    return orjson.dumps([model.model_dump() for model in build_models(profiles)])
+
+def serialize_trusted(profiles: List[dict]) -> bytes:
+    # model_dump_json in pydantic-core (api/responses.py: trusted_response)
+    return _report_adapter.dump_json(build_models(profiles))
+
+def serialize_constructed(profiles: List[dict]) -> bytes:
+    # model_construct ohne Validierung, dann wie trusted
+    return _report_adapter.dump_json(construct_models(profiles))
+
+PATHS = {
+    "fastapi_default": serialize_fastapi_default,
+    "orjson": serialize_orjson,
+    "trusted": serialize_trusted,
+    "constructed": serialize_constructed
+}
+
+def _time_ms(func, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--skills", type=int, default=102)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Report-Datei (JSON), sonst stdout")
+    args = parser.parse_args(argv)
+
+    profiles = generate_profiles(args.students, args.skills)
+    bodies = {name: serialize(profiles) for name, serialize in PATHS.items()}
+    reference = json.loads(bodies["fastapi_default"])
+    for name, body in bodies.items():
+        assert json.loads(body) == reference, f"{name} liefert anderes JSON"
+    trusted_body = bodies["trusted"]
+
+    timings = {name: _time_ms(lambda serialize=serialize: serialize(profiles), args.repeat) for name, serialize in PATHS.items()}
+    compression = {
+        "gzip": _time_ms(lambda: gzip.compress(trusted_body, compresslevel=6), args.repeat)
+    }
+    sizes = {
+        "raw": len(trusted_body),
+        "gzip": len(gzip.compress(trusted_body, compresslevel=6))
+    }
+    if brotli is not None:
+        compression["br"] = _time_ms(lambda: brotli.compress(trusted_body, quality=4), args.repeat)
+        sizes["br"] = len(brotli.compress(trusted_body, quality=4))
+
+    metrics = {f"serialize.{name}.median_ms": statistics.median(samples) for name, samples in timings.items()}
+    metrics["reports_per_second"] = 1000 / metrics["serialize.trusted.median_ms"]
+    metrics["bytes.raw"] = sizes["raw"]
+    metrics["bytes.gzip"] = sizes["gzip"]
+    metrics["compress.gzip.median_ms"] = statistics.median(compression["gzip"])
+    if "br" in sizes:
+        metrics["bytes.br"] = sizes["br"]
+        metrics["compress.br.median_ms"] = statistics.median(compression["br"])
+
+    report = build_report(
+        "serialization",
+        metrics,
+        params=vars(args),
+        details={
+            "speedup_vs_default": metrics["serialize.fastapi_default.median_ms"] / metrics["serialize.trusted.median_ms"],
+            "bytes_by_path": {name: len(body) for name, body in bodies.items()},
+            "brotli_available": brotli is not None
+        }
+    )
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
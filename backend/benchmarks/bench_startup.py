@@ -0,0 +1,150 @@
+"""
+Kaltstart-Benchmark: Importzeit von main und Zeit bis zum ersten Request.
+
+Jede Messung läuft in einem frischen Python-Prozess:
+  - import:  python -X importtime -c "import main"; Wanduhrzeit des Imports und
+             Eigenzeit aufsummiert nach Top-Level-Paket (torch, pandas, fastapi, ...),
+             dazu ob torch/pandas/numpy beim Import geladen wurden
+  - serve:   uvicorn main:app als Subprozess; Zeit vom Prozessstart bis zur ersten
+             Antwort von GET /health (Liveness) und bis GET /health/ready 200 liefert
+             (Modell geladen; ohne Checkpoint wird das nie erreicht und fehlt im Report)
+
+Verwendet config und Datenbank wie im Betrieb (der Start lädt den Katalog).
+
+    python -m benchmarks.bench_startup --repeat 5
+"""
+import argparse
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from benchmarks.common import build_report, percentiles, write_report
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("torch", "pandas", "numpy")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+_IMPORT_SCRIPT = (
+    "import sys, time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start); "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Eigenzeit (ms) pro Top-Level-Paket aus der Ausgabe von -X importtime."""
+    packages: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            packages[match.group(4).split(".")[0]] += int(match.group(1)) / 1000
+    return dict(packages)
+
+def measure_import() -> Tuple[float, Dict[str, float], List[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    seconds, heavy = result.stdout.strip().splitlines()[-2:]
+    return float(seconds) * 1000, parse_importtime(result.stderr), [name for name in heavy.split(",") if name]
+
+def _free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+def _get_status(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+def measure_serve(host: str, timeout: float, ready_timeout: float) -> Dict[str, Optional[float]]:
+    """Startet uvicorn und misst ab Prozessstart bis /health bzw. /health/ready antworten."""
+    port = _free_port(host)
+    base = f"http://{host}:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result: Dict[str, Optional[float]] = {"first_request_ms": None, "ready_ms": None}
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn beendet mit Exit-Code {process.returncode}")
+            if _get_status(f"{base}/health") == 200:
+                result["first_request_ms"] = (time.perf_counter() - start) * 1000
+                break
+            time.sleep(0.005)
+        else:
+            raise RuntimeError(f"Keine Antwort von {base}/health nach {timeout:.0f}s")
+
+        ready_deadline = time.perf_counter() + ready_timeout
+        while time.perf_counter() < ready_deadline:
+            if _get_status(f"{base}/health/ready") == 200:
+                result["ready_ms"] = (time.perf_counter() - start) * 1000
+                break
+            time.sleep(0.02)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Sekunden bis /health antworten muss")
+    parser.add_argument("--ready-timeout", type=float, default=60.0, help="Sekunden, die nach /health auf /health/ready gewartet wird")
+    parser.add_argument("--top", type=int, default=10, help="Pakete mit der größten Importzeit in den Details")
+    parser.add_argument("--skip-serve", action="store_true")
+    parser.add_argument("--output", help="Report-Datei (JSON), sonst stdout")
+    args = parser.parse_args(argv)
+
+    import_ms, package_ms, heavy_loaded = [], defaultdict(list), set()
+    for _ in range(args.repeat):
+        total, packages, heavy = measure_import()
+        import_ms.append(total)
+        for name, ms in packages.items():
+            package_ms[name].append(ms)
+        heavy_loaded.update(heavy)
+
+    metrics: Dict[str, float] = {}
+    for point, value in percentiles(import_ms).items():
+        metrics[f"import.main.{point}_ms"] = value
+    medians = {name: percentiles(values, (50,))["p50"] for name, values in package_ms.items()}
+    top = sorted(medians.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    details: Dict[str, Any] = {
+        "import": {
+            "heavy_modules_loaded": sorted(heavy_loaded),
+            "top_packages_self_ms_p50": {name: round(ms, 3) for name, ms in top}
+        }
+    }
+
+    if not args.skip_serve:
+        runs = [measure_serve(args.host, args.timeout, args.ready_timeout) for _ in range(args.repeat)]
+        for key in ("first_request_ms", "ready_ms"):
+            samples = [run[key] for run in runs if run[key] is not None]
+            if samples:
+                for point, value in percentiles(samples).items():
+                    metrics[f"serve.{key[:-3]}.{point}_ms"] = value
+        details["serve"] = {"runs": runs}
+
+    report = build_report("startup", metrics, params=vars(args), details=details)
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
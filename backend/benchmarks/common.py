@@ -0,0 +1,226 @@
+"""
+Gemeinsame Hilfsfunktionen für Benchmarks.
+
+Alle Benchmarks schreiben einen Report im selben JSON-Format:
+    {
+        "benchmark": "<name>",
+        "created_at": "...",
+        "environment": {...},
+        "params": {...},
+        "metrics": {"<name>": <zahl>, ...},
+        "details": {...}
+    }
+
+Metriken mit Suffix ``_per_second`` sind Durchsatzwerte (höher ist besser),
+alle anderen Metriken sind Laufzeiten oder Größen (niedriger ist besser).
+"""
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, sessionmaker
+from database.db_setup import Base, build_engine
+from database import models
+from services.auth_service import auth_service
+from services.catalog import bump_catalog_version
+
+def percentiles(samples: Iterable[float], points: Tuple[int, ...] = (50, 95, 99)) -> Dict[str, float]:
+    """Berechnet Perzentile (nearest-rank) einer Messreihe."""
+    values = sorted(samples)
+    if not values:
+        return {f"p{p}": 0.0 for p in points}
+    result = {}
+    for p in points:
+        rank = max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))
+        result[f"p{p}"] = values[rank]
+    return result
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> List[float]:
+    """Verzögerung des Event Loops gegenüber einem festen Takt (ms), bis stop gesetzt ist."""
+    lags = []
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append((loop.time() - start - interval) * 1000)
+    return lags
+
+def higher_is_better(metric: str) -> bool:
+    """Ob ein höherer Wert der Metrik besser ist (Durchsatz, Suffix _per_second)."""
+    return metric.endswith("_per_second")
+
+def environment_info() -> Dict[str, Any]:
+    """Beschreibt die Umgebung, in der ein Benchmark lief."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count()
+    }
+
+def build_report(
+    name: str,
+    metrics: Dict[str, float],
+    params: Optional[Dict[str, Any]] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return {
+        "benchmark": name,
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": environment_info(),
+        "params": params or {},
+        "metrics": metrics,
+        "details": details or {}
+    }
+
+def write_report(report: Dict[str, Any], output: Optional[str] = None) -> None:
+    """Schreibt den Report als JSON in eine Datei oder nach stdout."""
+    text = json.dumps(report, indent=2, default=str)
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
+        print(f"Report gespeichert in '{output}'", file=sys.stderr)
+    else:
+        print(text)
+
+@contextmanager
+def temporary_database() -> Iterator[Tuple[Any, sessionmaker]]:
+    """Legt eine temporäre SQLite-Datenbank mit allen Tabellen an."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        url = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+        engine = build_engine(url)
+        Base.metadata.create_all(bind=engine)
+        try:
+            yield engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        finally:
+            engine.dispose()
+
+def seed_synthetic_catalog(db: Session, n_skills: int = 102, n_problems: int = 3162, seed: int = 0) -> None:
+    """
+    Legt einen synthetischen Skill/Problem-Katalog an.
+
+    Problems werden Skills mit einer schiefen (Zipf-ähnlichen) Verteilung zugeordnet,
+    wie im ASSISTments-Datensatz, wo wenige Skills die meisten Problems haben.
+    """
+    rng = random.Random(seed)
+    db.execute(insert(models.Skill), [
+        {"internal_idx": i, "original_skill_id": f"skill_{i}", "name": f"Skill {i}"}
+        for i in range(n_skills)
+    ])
+    skill_ids = [row.id for row in db.query(models.Skill.id).order_by(models.Skill.internal_idx)]
+    weights = [1.0 / (rank + 1) for rank in range(n_skills)]
+    assigned = rng.choices(skill_ids, weights=weights, k=n_problems)
+    db.execute(insert(models.Problem), [
+        {
+            "internal_idx": i,
+            "original_problem_id": str(100000 + i),
+            "skill_id": assigned[i],
+            "description_placeholder": f"Problem {100000 + i}"
+        }
+        for i in range(n_problems)
+    ])
+    bump_catalog_version(db)
+    db.commit()
+
+def seed_synthetic_school(
+    db: Session,
+    n_teachers: int = 1,
+    classes_per_teacher: int = 1,
+    students_per_class: int = 30,
+    password_hash: Optional[str] = None
+) -> Dict[str, List[int]]:
+    """
+    Legt Lehrkräfte, Klassen und Schüler an.
+
+    Returns:
+        Dict mit teacher_ids, class_ids und student_ids
+    """
+    password_hash = password_hash or auth_service.get_password_hash("benchmark")
+    db.execute(insert(models.Teacher), [
+        {"username": f"teacher_{t}", "hashed_password": password_hash}
+        for t in range(n_teachers)
+    ])
+    teacher_ids = [row.id for row in db.query(models.Teacher.id).order_by(models.Teacher.id)]
+
+    db.execute(insert(models.Class), [
+        {"name": f"Klasse {t}-{c}", "description": "Synthetische Klasse", "teacher_id": teacher_id}
+        for t, teacher_id in enumerate(teacher_ids)
+        for c in range(classes_per_teacher)
+    ])
+    class_ids = [row.id for row in db.query(models.Class.id).order_by(models.Class.id)]
+
+    db.execute(insert(models.Student), [
+        {"first_name": f"Vorname{s}", "last_name": f"Nachname{class_id}-{s}", "class_id": class_id, "is_deleted": False}
+        for class_id in class_ids
+        for s in range(students_per_class)
+    ])
+    student_ids = [row.id for row in db.query(models.Student.id).order_by(models.Student.id)]
+    db.commit()
+
+    return {"teacher_ids": teacher_ids, "class_ids": class_ids, "student_ids": student_ids}
+
+def generate_synthetic_interactions(
+    catalog,
+    student_ids: List[int],
+    median_per_student: int = 60,
+    max_per_student: int = 1000,
+    seed: int = 0,
+    start: datetime = datetime(2024, 9, 2, 8, 0, 0)
+) -> List[Dict[str, Any]]:
+    """
+    Erzeugt Interaktionen mit ASSISTments-ähnlichen Verteilungen.
+
+    - Anzahl pro Schüler log-normalverteilt (viele mit wenigen, einige mit sehr vielen)
+    - Bearbeitung in Skill-Sessions (Skill Builder): 3-15 Problems desselben Skills
+      hintereinander; Skills werden nach Anzahl ihrer Problems gewählt
+    - Korrektheit aus Fähigkeit des Schülers, Schwierigkeit des Problems und einem
+      Lerneffekt pro Versuch im Skill (insgesamt etwa 65 % korrekt)
+    - Antwortabstände log-normal (Median ca. 30 s), eine Session pro Schultag
+
+    Args:
+        catalog: services.catalog.Catalog des Seeds
+
+    Returns:
+        Dicts für crud.create_interactions_bulk, pro Schüler zeitlich sortiert
+    """
+    rng = random.Random(seed)
+    skills = [
+        (int(skill_id), catalog.problems_for_skill(int(skill_id)))
+        for skill_id in catalog.skill_ids
+    ]
+    skills = [(skill_id, problems) for skill_id, problems in skills if problems]
+    skill_weights = [len(problems) for _, problems in skills]
+    difficulty = {int(problem_id): rng.gauss(0, 1) for problem_id in catalog.problem_ids}
+
+    rows = []
+    for student_id in student_ids:
+        n_interactions = min(max_per_student, max(1, int(rng.lognormvariate(math.log(median_per_student), 0.8))))
+        ability = rng.gauss(0.9, 1.0)
+        attempts_per_skill: Dict[int, int] = {}
+        timestamp = start + timedelta(minutes=rng.randint(0, 6 * 60))
+        while n_interactions > 0:
+            skill_id, problems = rng.choices(skills, weights=skill_weights)[0]
+            for _ in range(min(n_interactions, rng.randint(3, 15))):
+                problem = rng.choice(problems)
+                attempts = attempts_per_skill.get(skill_id, 0)
+                logit = ability - difficulty[problem.id] + 0.08 * min(attempts, 20)
+                rows.append({
+                    "student_id": student_id,
+                    "problem_id": problem.id,
+                    "skill_id": skill_id,
+                    "is_correct": rng.random() < 1 / (1 + math.exp(-logit)),
+                    "timestamp": timestamp
+                })
+                attempts_per_skill[skill_id] = attempts + 1
+                timestamp += timedelta(seconds=max(2, int(rng.lognormvariate(math.log(30), 0.9))))
+                n_interactions -= 1
+            timestamp = timestamp.replace(hour=8) + timedelta(days=1, minutes=rng.randint(0, 6 * 60))
+    return rows
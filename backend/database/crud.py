@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
-from typing import List, Optional, Dict, Any 
+from sqlalchemy import desc, func, insert, update
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime 
 from . import models
+from .history import append_to_histories
+from .pagination import interaction_order, interactions_after
+from .search import search_students_statement
+from .stats import format_student_statistics, update_student_stats
 from passlib.context import CryptContext
 import schemas
 from schemas.teacher_schemas import TeacherCreate
@@ -84,6 +88,8 @@ def delete_class(db: Session, class_id: int) -> Optional[models.Class]:
     for student in deleted_students:
         db.delete(student)
     
+    db.query(models.ImportRecord).filter(models.ImportRecord.class_id == class_id).delete(synchronize_session=False)
+    
     db.delete(db_class)
     db.commit()
     return db_class
@@ -92,21 +98,42 @@ def delete_class(db: Session, class_id: int) -> Optional[models.Class]:
 def get_student(db: Session, student_id: int) -> Optional[models.Student]:
     return db.query(models.Student).filter(models.Student.id == student_id).first()
 
-def get_students_by_class(db: Session, class_id: int, skip: int = 0, limit: int = 100) -> List[models.Student]:
+def get_students_by_class(db: Session, class_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Student]:
     query = db.query(models.Student).filter(models.Student.class_id == class_id)
     
     # Wenn is_deleted existiert filtert gelöschte Schüler aus
     if hasattr(models.Student, 'is_deleted'):
         query = query.filter(models.Student.is_deleted == False)
     
-    return query.offset(skip).limit(limit).all()
+    # Keyset: hinter dem Cursor fortsetzen
+    if after_id is not None:
+        query = query.filter(models.Student.id > after_id)
+    
+    return query.order_by(models.Student.id).offset(skip).limit(limit).all()
 
 def search_students_in_class(db: Session, class_id: int, query: str, skip: int = 0, limit: int = 100) -> List[models.Student]:
-    search_query = f"%{query}%"
-    return db.query(models.Student).filter(
-        models.Student.class_id == class_id,
-        (models.Student.first_name.ilike(search_query) | models.Student.last_name.ilike(search_query))
-    ).offset(skip).limit(limit).all()
+    return search_students(db, query, class_ids=[class_id], skip=skip, limit=limit)
+
+def search_students(db: Session, query: str, class_ids: Optional[List[int]] = None, skip: int = 0, limit: int = 100) -> List[models.Student]:
+    """Volltextsuche über Schülernamen, nach Relevanz sortiert (siehe search.py)."""
+    statement = search_students_statement(db.connection(), query, class_ids=class_ids, skip=skip, limit=limit)
+    if statement is None:
+        return []
+    return list(db.scalars(statement))
+
+def get_student_version(db: Session, student_id: int) -> Optional[Any]:
+    """
+    Alles, wovon Antworten zu einem Schüler abhängen, ohne die Historie zu laden:
+    Name, letzte Aktualisierung der Historie und Anzahl Interaktionen (eine Zeile).
+    """
+    return db.query(
+        models.Student.first_name,
+        models.Student.last_name,
+        models.Student.last_interaction_update_timestamp,
+        models.StudentStats.total_interactions
+    ).outerjoin(models.StudentStats, models.StudentStats.student_id == models.Student.id)\
+        .filter(models.Student.id == student_id)\
+        .first()
 
 def create_student_in_class(db: Session, student: schemas.StudentCreate, class_id: int) -> models.Student:
     db_student = models.Student(**student.model_dump(), class_id=class_id, last_interaction_update_timestamp=datetime.utcnow())
@@ -141,6 +168,17 @@ def delete_student(db: Session, student_id: int) -> Optional[models.Student]:
         db.refresh(db_student)
     return db_student
 
+# Katalog (Skills/Problems): jede Änderung zählt die Katalog-Version hoch, damit
+# andere Worker neu laden; der geteilte Katalog dieses Prozesses wird sofort verworfen
+# (Import erst hier: services importiert database)
+def _catalog_changed(db: Session) -> None:
+    from services.catalog import bump_catalog_version
+    bump_catalog_version(db)
+
+def _invalidate_catalog() -> None:
+    from services.catalog import invalidate_catalog as invalidate
+    invalidate()
+
 # CRUD Operationen für Skill
 def get_skill(db: Session, skill_id: int) -> Optional[models.Skill]: 
     return db.query(models.Skill).filter(models.Skill.id == skill_id).first()
@@ -164,8 +202,10 @@ def create_skill(db: Session, skill: schemas.SkillCreate) -> models.Skill:
         name=skill.name
     )
     db.add(db_skill)
+    _catalog_changed(db)
     db.commit()
     db.refresh(db_skill)
+    _invalidate_catalog()
     return db_skill
 
 # CRUD Operationen für Problem
@@ -200,16 +240,20 @@ def create_problem(db: Session, problem: schemas.ProblemCreate) -> models.Proble
         difficulty_mu_q=problem.difficulty_mu_q 
     )
     db.add(db_problem)
+    _catalog_changed(db)
     db.commit()
     db.refresh(db_problem)
+    _invalidate_catalog()
     return db_problem
 
 def update_problem_mu_q(db: Session, problem_internal_idx: int, mu_q: float) -> Optional[models.Problem]:
     db_problem = get_problem_by_internal_idx(db, internal_idx=problem_internal_idx)
     if db_problem:
         db_problem.difficulty_mu_q = mu_q
+        _catalog_changed(db)
         db.commit()
         db.refresh(db_problem)
+        _invalidate_catalog()
     return db_problem
 
 # CRUD Operationen für Interaction
@@ -223,10 +267,13 @@ def get_student_interactions(
     sort_desc: bool = True, 
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    skill_id: Optional[int] = None
+    skill_id: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None
 ) -> List[models.Interaction]:
     """
     Ruft Interaktionen eines Schülers mit Eager Loading für Relationships.
+    
+    Sortiert nach (timestamp, id); after setzt hinter diesem Schlüssel fort (Keyset).
     """
     query = db.query(models.Interaction)\
         .options(
@@ -241,11 +288,10 @@ def get_student_interactions(
         query = query.filter(models.Interaction.timestamp <= end_date)
     if skill_id:
         query = query.filter(models.Interaction.skill_id == skill_id)
+    if after:
+        query = query.filter(interactions_after(after, sort_desc))
     
-    if sort_desc:
-        query = query.order_by(desc(models.Interaction.timestamp))
-    else:
-        query = query.order_by(models.Interaction.timestamp)
+    query = query.order_by(*interaction_order(sort_desc))
     
     if limit:
         query = query.limit(limit)
@@ -268,11 +314,95 @@ def create_interaction(db: Session, interaction: schemas.InteractionCreate, stud
         timestamp=interaction.timestamp
     )
     db.add(db_interaction)
-    db.commit()
+    try:
+        db.flush()
+        appended = append_to_histories(db, [{
+            "student_id": student_id,
+            "problem_id": interaction.problem_db_id,
+            "skill_id": interaction.skill_db_id,
+            "is_correct": interaction.is_correct,
+            "timestamp": interaction.timestamp
+        }])
+        update_student_stats(db, appended)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     db.refresh(db_interaction)
     update_student_last_interaction_timestamp(db, student_id=student_id, timestamp=interaction.timestamp)
     return db_interaction
 
+def get_students_by_ids(db: Session, student_ids: List[int]) -> Dict[int, models.Student]:
+    """Lädt mehrere Schüler in einer Abfrage (ID -> Student)."""
+    if not student_ids:
+        return {}
+    students = db.query(models.Student).filter(models.Student.id.in_(student_ids)).all()
+    return {student.id: student for student in students}
+
+def get_interaction_keys(db: Session, student_ids: List[int]) -> set:
+    """Lädt (student_id, problem_id, timestamp) aller Interaktionen der Schüler für Duplikat-Prüfungen."""
+    if not student_ids:
+        return set()
+    rows = db.query(
+        models.Interaction.student_id,
+        models.Interaction.problem_id,
+        models.Interaction.timestamp
+    ).filter(models.Interaction.student_id.in_(student_ids)).all()
+    return {(row.student_id, row.problem_id, row.timestamp) for row in rows}
+
+def get_student_ids_for_teacher(db: Session, teacher_id: int, student_ids: List[int]) -> set:
+    """Gibt die Teilmenge der (nicht gelöschten) Schüler-IDs zurück, die zu Klassen der Lehrkraft gehören."""
+    if not student_ids:
+        return set()
+    rows = db.query(models.Student.id)\
+        .join(models.Class)\
+        .filter(
+            models.Class.teacher_id == teacher_id,
+            models.Student.id.in_(student_ids),
+            models.Student.is_deleted == False
+        ).all()
+    return {row.id for row in rows}
+
+def create_interactions_bulk(db: Session, interactions: List[Dict[str, Any]]) -> int:
+    """
+    Fügt bereits validierte Interaktionen in einer einzigen Transaktion ein.
+    
+    Der Interaktions-Timestamp jedes betroffenen Schülers wird genau einmal aktualisiert
+    (auf den jüngsten Timestamp im Batch), gepackte Historien und Zähler in derselben Transaktion.
+    
+    Args:
+        interactions: Dicts mit student_id, problem_id, skill_id, is_correct, timestamp
+        
+    Returns:
+        Anzahl eingefügter Interaktionen
+    """
+    if not interactions:
+        return 0
+    
+    latest_timestamps = {}
+    for row in interactions:
+        student_id = row["student_id"]
+        if student_id not in latest_timestamps or row["timestamp"] > latest_timestamps[student_id]:
+            latest_timestamps[student_id] = row["timestamp"]
+    
+    try:
+        db.execute(insert(models.Interaction), interactions)
+        db.execute(
+            update(models.Student),
+            [
+                {"id": student_id, "last_interaction_update_timestamp": timestamp}
+                # Sortiert: Zeilensperren in fester Reihenfolge (siehe append_to_histories)
+                for student_id, timestamp in sorted(latest_timestamps.items())
+            ]
+        )
+        update_student_stats(db, append_to_histories(db, interactions))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    return len(interactions)
+
 def create_interaction_from_csv(db: Session, csv_row: schemas.InteractionCSVRow, student_id: int) -> Optional[models.Interaction]:
     """Helper-Funktion für CSV-Import - konvertiert Original-IDs zu DB-IDs"""
     # Finde Problem
@@ -298,47 +428,61 @@ def create_interaction_from_csv(db: Session, csv_row: schemas.InteractionCSVRow,
     except ValueError:
         return None
 
+# CRUD Operationen für Import Records (idempotenter CSV-Import)
+def get_import_record(db: Session, class_id: int, content_hash: str, student_id: Optional[int] = None) -> Optional[models.ImportRecord]:
+    """Sucht einen abgeschlossenen Import derselben Datei für Klasse und Ziel-Schüler."""
+    query = db.query(models.ImportRecord).filter(
+        models.ImportRecord.class_id == class_id,
+        models.ImportRecord.content_hash == content_hash
+    )
+    if student_id is None:
+        query = query.filter(models.ImportRecord.student_id.is_(None))
+    else:
+        query = query.filter(models.ImportRecord.student_id == student_id)
+    return query.order_by(desc(models.ImportRecord.created_at)).first()
+
+def save_import_record(
+    db: Session,
+    class_id: int,
+    teacher_id: int,
+    content_hash: str,
+    result_json: str,
+    student_id: Optional[int] = None,
+    filename: Optional[str] = None
+) -> models.ImportRecord:
+    """Speichert (oder überschreibt) das Ergebnis eines abgeschlossenen Imports."""
+    db_record = get_import_record(db, class_id, content_hash, student_id)
+    if db_record:
+        db_record.teacher_id = teacher_id
+        db_record.result_json = result_json
+        db_record.filename = filename
+        db_record.created_at = datetime.utcnow()
+    else:
+        db_record = models.ImportRecord(
+            class_id=class_id,
+            student_id=student_id,
+            teacher_id=teacher_id,
+            content_hash=content_hash,
+            filename=filename,
+            result_json=result_json
+        )
+        db.add(db_record)
+    db.commit()
+    db.refresh(db_record)
+    return db_record
+
 def get_student_statistics(db: Session, student_id: int) -> Dict[str, Any]:
     """
-    Berechnet Statistiken für einen Schüler.
+    Liest die Statistiken eines Schülers aus den Zählern in student_stats.
     
     Returns:
         Dict mit total_interactions, correct_interactions, accuracy, skills_practiced, etc.
     """
-    from sqlalchemy import func
-    
     student = get_student(db, student_id)
     if not student:
         return {}  
     
-    total = db.query(func.count(models.Interaction.id))\
-        .filter(models.Interaction.student_id == student_id).scalar() or 0
-    
-    correct = db.query(func.count(models.Interaction.id))\
-        .filter(
-            models.Interaction.student_id == student_id,
-            models.Interaction.is_correct == True
-        ).scalar() or 0
-    
-    skills_practiced = db.query(func.count(func.distinct(models.Interaction.skill_id)))\
-        .filter(models.Interaction.student_id == student_id).scalar() or 0
-    
-    last_activity = db.query(func.max(models.Interaction.timestamp))\
-        .filter(models.Interaction.student_id == student_id).scalar()
-    
-    problems_attempted = db.query(func.count(func.distinct(models.Interaction.problem_id)))\
-        .filter(models.Interaction.student_id == student_id).scalar() or 0
-    
-    return {
-        "total_interactions": total,
-        "correct_interactions": correct,
-        "incorrect_interactions": total - correct,
-        "accuracy": round((correct / total * 100) if total > 0 else 0, 2),
-        "skills_practiced": skills_practiced,
-        "problems_attempted": problems_attempted,
-        "last_activity": last_activity.isoformat() if last_activity else None,
-        "activity_status": "active" if last_activity else "no_activity"
-    }
+    return format_student_statistics(db.get(models.StudentStats, student_id))
 
 def get_classes_for_dashboard(db: Session, teacher_id: int, limit: int = 5) -> List[Dict[str, Any]]:
     """
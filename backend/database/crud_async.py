@@ -0,0 +1,162 @@
+"""
+Lesende CRUD-Operationen für die Async-Session (siehe db_setup.get_async_db).
+
+Die Funktionen entsprechen den gleichnamigen Funktionen in crud.py und liefern
+dieselben Ergebnisse, blockieren aber nicht den Event Loop.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from . import models
+from .pagination import interaction_order, interactions_after
+from .search import search_students_statement
+from .stats import format_student_statistics
+
+# Class
+async def get_class(db: AsyncSession, class_id: int) -> Optional[models.Class]:
+    return await db.get(models.Class, class_id)
+
+async def get_classes_by_teacher(db: AsyncSession, teacher_id: int, skip: int = 0, limit: int = 100) -> List[models.Class]:
+    result = await db.scalars(
+        select(models.Class)
+        .where(models.Class.teacher_id == teacher_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result)
+
+async def get_class_ids_for_teacher(db: AsyncSession, teacher_id: int) -> List[int]:
+    """IDs aller Klassen einer Lehrkraft (über ix_classes_teacher_id)."""
+    return list(await db.scalars(select(models.Class.id).where(models.Class.teacher_id == teacher_id)))
+
+async def get_class_teacher_id(db: AsyncSession, class_id: int) -> Optional[int]:
+    """Lehrkraft einer Klasse (None = Klasse existiert nicht)."""
+    return await db.scalar(select(models.Class.teacher_id).where(models.Class.id == class_id))
+
+async def get_classes_for_dashboard(db: AsyncSession, teacher_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+    """Klassen einer Lehrkraft mit der Anzahl der (nicht gelöschten) Schüler."""
+    student_count_subquery = (
+        select(models.Student.class_id, func.count(models.Student.id).label("student_count"))
+        .where(models.Student.is_deleted == False)
+        .group_by(models.Student.class_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            models.Class.id,
+            models.Class.name,
+            func.coalesce(student_count_subquery.c.student_count, 0).label("student_count")
+        )
+        .outerjoin(student_count_subquery, models.Class.id == student_count_subquery.c.class_id)
+        .where(models.Class.teacher_id == teacher_id)
+        .order_by(desc(models.Class.created_at))
+        .limit(limit)
+    )
+    return [{"id": row.id, "name": row.name, "student_count": row.student_count} for row in result]
+
+async def get_teacher_statistics(db: AsyncSession, teacher_id: int) -> Dict[str, Any]:
+    """Anzahl Klassen, (nicht gelöschte) Schüler, Interaktionen und letzte Aktivität einer Lehrkraft."""
+    class_count = await db.scalar(
+        select(func.count(models.Class.id)).where(models.Class.teacher_id == teacher_id)
+    )
+    student_count = await db.scalar(
+        select(func.count(models.Student.id))
+        .join(models.Class)
+        .where(models.Class.teacher_id == teacher_id, models.Student.is_deleted == False)
+    )
+    # Interaktionen aus den Zählern je Schüler (student_stats), nicht aus interactions
+    interaction_count, last_interaction = (await db.execute(
+        select(func.sum(models.StudentStats.total_interactions), func.max(models.StudentStats.last_activity))
+        .join(models.Student, models.Student.id == models.StudentStats.student_id)
+        .join(models.Class)
+        .where(models.Class.teacher_id == teacher_id)
+    )).one()
+    return {
+        "total_classes": class_count or 0,
+        "total_students": student_count or 0,
+        "total_interactions": interaction_count or 0,
+        "last_activity": last_interaction
+    }
+
+# Student
+async def get_student(db: AsyncSession, student_id: int) -> Optional[models.Student]:
+    return await db.get(models.Student, student_id)
+
+async def get_students_by_class(
+    db: AsyncSession,
+    class_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None
+) -> List[models.Student]:
+    """Schüler einer Klasse nach id; after_id setzt hinter dem Cursor fort (Keyset)."""
+    statement = select(models.Student).where(models.Student.class_id == class_id, models.Student.is_deleted == False)
+    if after_id is not None:
+        statement = statement.where(models.Student.id > after_id)
+    result = await db.scalars(statement.order_by(models.Student.id).offset(skip).limit(limit))
+    return list(result)
+
+async def search_students_in_class(db: AsyncSession, class_id: int, query: str, skip: int = 0, limit: int = 100) -> List[models.Student]:
+    return await search_students(db, query, class_ids=[class_id], skip=skip, limit=limit)
+
+async def search_students(
+    db: AsyncSession,
+    query: str,
+    class_ids: Optional[List[int]] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[models.Student]:
+    """Volltextsuche über Schülernamen, nach Relevanz sortiert (siehe search.py)."""
+    connection = await db.connection()
+    statement = await connection.run_sync(
+        lambda sync_connection: search_students_statement(sync_connection, query, class_ids=class_ids, skip=skip, limit=limit)
+    )
+    if statement is None:
+        return []
+    return list(await db.scalars(statement))
+
+async def get_student_statistics(db: AsyncSession, student_id: int) -> Dict[str, Any]:
+    """Statistiken eines Schülers aus den Zählern in student_stats (eine Zeile per Primärschlüssel)."""
+    return format_student_statistics(await db.get(models.StudentStats, student_id))
+
+# Interaction
+async def get_student_interactions(
+    db: AsyncSession,
+    student_id: int,
+    limit: Optional[int] = None,
+    sort_desc: bool = True,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    skill_id: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None
+) -> List[models.Interaction]:
+    """
+    Interaktionen eines Schülers mit Problem und Skill (Eager Loading).
+
+    Sortiert nach (timestamp, id); after setzt hinter diesem Schlüssel fort (Keyset).
+    """
+    statement = (
+        select(models.Interaction)
+        .options(
+            joinedload(models.Interaction.problem),
+            joinedload(models.Interaction.skill)
+        )
+        .where(models.Interaction.student_id == student_id)
+    )
+    if start_date:
+        statement = statement.where(models.Interaction.timestamp >= start_date)
+    if end_date:
+        statement = statement.where(models.Interaction.timestamp <= end_date)
+    if skill_id:
+        statement = statement.where(models.Interaction.skill_id == skill_id)
+    if after:
+        statement = statement.where(interactions_after(after, sort_desc))
+
+    statement = statement.order_by(*interaction_order(sort_desc))
+
+    if limit:
+        statement = statement.limit(limit)
+
+    return list(await db.scalars(statement))
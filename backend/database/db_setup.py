@@ -1,17 +1,177 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator, Iterator, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from config import settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./empfehlungssystem.db"
+# Datenbank-Konfiguration aus config.settings. Fehlende Einträge fallen auf die
+# Standardwerte zurück, damit bestehende Konfigurationen weiter funktionieren.
+DEFAULT_DATABASE_URL = "sqlite:///./empfehlungssystem.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False} 
-)
+# SQLite (pro Verbindung gesetzt)
+DEFAULT_SQLITE_BUSY_TIMEOUT_MS = 5000
+DEFAULT_SQLITE_CACHE_SIZE_KB = 64 * 1024
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+# Connection Pool für Server-Datenbanken (PostgreSQL)
+DEFAULT_DB_POOL_SIZE = 10
+DEFAULT_DB_MAX_OVERFLOW = 20
+DEFAULT_DB_POOL_TIMEOUT = 30
+DEFAULT_DB_POOL_RECYCLE = 1800
+
+def _setting(name: str, default):
+    value = getattr(settings, name, None)
+    return default if value is None else value
+
+def _is_sqlite_memory(url) -> bool:
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+def _sqlite_pragmas(in_memory: bool) -> list:
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(_setting('sqlite_busy_timeout_ms', DEFAULT_SQLITE_BUSY_TIMEOUT_MS))}",
+        # Negativer Wert = Größe in KiB statt in Seiten
+        f"PRAGMA cache_size = {-int(_setting('sqlite_cache_size_kb', DEFAULT_SQLITE_CACHE_SIZE_KB))}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if not in_memory:
+        pragmas += [
+            # WAL: Leser werden von einem laufenden Import nicht blockiert
+            "PRAGMA journal_mode = WAL",
+            # In WAL sicher gegen Korruption, spart das fsync pro Commit
+            "PRAGMA synchronous = NORMAL",
+            f"PRAGMA mmap_size = {int(_setting('sqlite_mmap_size', DEFAULT_SQLITE_MMAP_SIZE))}",
+        ]
+    return pragmas
+
+# Async-Treiber je Datenbank (für die lesenden Endpunkte)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def _listen_sqlite_pragmas(engine: Engine, in_memory: bool) -> None:
+    pragmas = _sqlite_pragmas(in_memory)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": int(_setting("db_pool_size", DEFAULT_DB_POOL_SIZE)),
+        "max_overflow": int(_setting("db_max_overflow", DEFAULT_DB_MAX_OVERFLOW)),
+        "pool_timeout": int(_setting("db_pool_timeout", DEFAULT_DB_POOL_TIMEOUT)),
+        "pool_recycle": int(_setting("db_pool_recycle", DEFAULT_DB_POOL_RECYCLE)),
+        "pool_pre_ping": True,
+    }
+
+def build_engine(database_url: str = None) -> Engine:
+    """
+    Erstellt die Engine für eine Datenbank-URL (Standard: settings.database_url).
+
+    SQLite bekommt WAL und die Pragmas aus _sqlite_pragmas auf jeder neuen Verbindung,
+    PostgreSQL (und andere Server-Datenbanken) einen dimensionierten Connection Pool.
+    """
+    url = make_url(database_url or _setting("database_url", DEFAULT_DATABASE_URL))
+
+    if url.get_backend_name() == "sqlite":
+        in_memory = _is_sqlite_memory(url)
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            # In-Memory Datenbanken existieren nur pro Verbindung
+            **({"poolclass": StaticPool} if in_memory else {})
+        )
+        _listen_sqlite_pragmas(engine, in_memory)
+        return engine
+
+    return create_engine(url, **_pool_options())
+
+def build_async_engine(database_url: str = None) -> AsyncEngine:
+    """
+    Erstellt die Async-Engine zur selben Datenbank (aiosqlite bzw. asyncpg).
+
+    Pragmas und Pool-Einstellungen entsprechen build_engine. Eine In-Memory SQLite
+    Datenbank ist für die Async-Engine eine eigene, leere Datenbank.
+    """
+    url = make_url(database_url or _setting("database_url", DEFAULT_DATABASE_URL))
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Kein Async-Treiber für Datenbank '{backend}' konfiguriert")
+    async_url = url.set(drivername=ASYNC_DRIVERS[backend])
+
+    if backend == "sqlite":
+        in_memory = _is_sqlite_memory(url)
+        engine = create_async_engine(
+            async_url,
+            **({"poolclass": StaticPool} if in_memory else {})
+        )
+        _listen_sqlite_pragmas(engine.sync_engine, in_memory)
+        return engine
+
+    return create_async_engine(async_url, **_pool_options())
+
+engine = build_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Die Async-Engine wird erst bei der ersten Verwendung erstellt, damit Skripte
+# ohne installierten Async-Treiber weiter funktionieren.
+async_engine: Optional[AsyncEngine] = None
+_database_url = engine.url.render_as_string(hide_password=False)
+
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
 Base = declarative_base()
 
+def get_async_engine() -> AsyncEngine:
+    global async_engine
+    if async_engine is None:
+        async_engine = build_async_engine(_database_url)
+        AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
+
+def configure_engine(database_url: str) -> Engine:
+    """
+    Stellt die Anwendung auf eine andere Datenbank um (z.B. für Benchmarks und Skripte).
+
+    Alle Module, die SessionLocal oder AsyncSessionLocal importiert haben, verwenden
+    danach die neue Datenbank.
+    """
+    global engine, async_engine, _database_url
+    old_engine, old_async_engine = engine, async_engine
+    engine = build_engine(database_url)
+    _database_url = database_url
+    SessionLocal.configure(bind=engine)
+    async_engine = None
+    old_engine.dispose()
+    if old_async_engine is not None:
+        old_async_engine.sync_engine.dispose()
+    return engine
+
+def get_db() -> Iterator[Session]:
+    """Database session dependency."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async database session dependency für lesende Endpunkte."""
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def create_db_and_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    # Legt Tabellen an und ergänzt fehlende Indizes in bestehenden Datenbanken
+    from .migrations import migrate
+    migrate(engine)
@@ -0,0 +1,289 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from . import models
+
+# Format der gepackten Historie (student_histories):
+#   packed:     int32 little-endian, n x (problem_idx, skill_idx, correct)
+#   timestamps: int64 little-endian, n x Mikrosekunden seit Epoch (UTC)
+PACKED_DTYPE = np.dtype("<i4")
+TIMESTAMP_DTYPE = np.dtype("<i8")
+PACKED_FIELDS = 3
+
+# Schüler pro Abfrage beim Neuaufbau
+REBUILD_CHUNK_SIZE = 500
+
+@dataclass(frozen=True)
+class StudentHistory:
+    """
+    Interaktions-Historie eines Schülers als Integer-Arrays (zeitlich sortiert).
+
+    problem_idx und skill_idx sind die internal_idx aus der DB, nicht die DB-IDs.
+    """
+    problem_idx: np.ndarray  # int64
+    skill_idx: np.ndarray  # int64
+    correct: np.ndarray  # int64 (0/1)
+    timestamps: np.ndarray  # datetime64[us], naiv in UTC
+
+    def __len__(self) -> int:
+        return len(self.problem_idx)
+
+    @classmethod
+    def empty(cls) -> "StudentHistory":
+        return cls(
+            problem_idx=np.empty(0, dtype=np.int64),
+            skill_idx=np.empty(0, dtype=np.int64),
+            correct=np.empty(0, dtype=np.int64),
+            timestamps=np.empty(0, dtype="datetime64[us]")
+        )
+
+@dataclass(frozen=True)
+class HistoryAppend:
+    """Ergebnis von append_to_histories für einen Schüler."""
+    history: StudentHistory  # vollständige neue Historie
+    added: StudentHistory  # die angehängten Interaktionen
+    # Gespeicherte Historie vor dem Anhängen; None = aus interactions neu aufgebaut
+    previous: Optional[StudentHistory]
+
+def _to_naive_utc(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def _history_from_rows(rows: List[Tuple]) -> StudentHistory:
+    """Baut eine Historie aus (problem_idx, skill_idx, correct, timestamp) Tupeln."""
+    if not rows:
+        return StudentHistory.empty()
+    problem_idx, skill_idx, correct, timestamps = zip(*rows)
+    return StudentHistory(
+        problem_idx=np.array(problem_idx, dtype=np.int64),
+        skill_idx=np.array(skill_idx, dtype=np.int64),
+        correct=np.array(correct, dtype=np.int64),
+        timestamps=np.array([_to_naive_utc(ts) for ts in timestamps], dtype="datetime64[us]")
+    )
+
+def pack_history(history: StudentHistory) -> Tuple[bytes, bytes]:
+    """Serialisiert eine Historie in (packed, timestamps) Blobs."""
+    packed = np.empty((len(history), PACKED_FIELDS), dtype=PACKED_DTYPE)
+    packed[:, 0] = history.problem_idx
+    packed[:, 1] = history.skill_idx
+    packed[:, 2] = history.correct
+    timestamps = history.timestamps.astype("datetime64[us]").astype(TIMESTAMP_DTYPE)
+    return packed.tobytes(), timestamps.tobytes()
+
+def unpack_history(packed: bytes, timestamps: bytes) -> StudentHistory:
+    """Liest eine Historie aus (packed, timestamps) Blobs."""
+    triples = np.frombuffer(packed, dtype=PACKED_DTYPE).reshape(-1, PACKED_FIELDS).astype(np.int64)
+    return StudentHistory(
+        problem_idx=triples[:, 0],
+        skill_idx=triples[:, 1],
+        correct=triples[:, 2],
+        timestamps=np.frombuffer(timestamps, dtype=TIMESTAMP_DTYPE).astype("datetime64[us]")
+    )
+
+def merge_histories(existing: StudentHistory, new: StudentHistory) -> StudentHistory:
+    """Hängt neue Interaktionen an und hält die zeitliche Sortierung (stabil, Bestand zuerst)."""
+    merged = StudentHistory(
+        problem_idx=np.concatenate([existing.problem_idx, new.problem_idx]),
+        skill_idx=np.concatenate([existing.skill_idx, new.skill_idx]),
+        correct=np.concatenate([existing.correct, new.correct]),
+        timestamps=np.concatenate([existing.timestamps, new.timestamps])
+    )
+    # Im Normalfall (neue Interaktionen sind die jüngsten) ist kein Sortieren nötig
+    if len(merged) < 2 or (np.diff(merged.timestamps.astype(TIMESTAMP_DTYPE)) >= 0).all():
+        return merged
+    order = np.argsort(merged.timestamps, kind="stable")
+    return StudentHistory(
+        problem_idx=merged.problem_idx[order],
+        skill_idx=merged.skill_idx[order],
+        correct=merged.correct[order],
+        timestamps=merged.timestamps[order]
+    )
+
+def query_student_histories(db: Session, student_ids: Optional[Iterable[int]] = None) -> Dict[int, StudentHistory]:
+    """
+    Baut Historien direkt aus der interactions Tabelle.
+
+    Selektiert nur (problem internal_idx, skill internal_idx, is_correct, timestamp),
+    sortiert nach Schüler und Zeit. Die Interaktions-Seite wird vollständig aus dem
+    Index ix_interactions_student_history bedient, Problem/Skill per Primärschlüssel.
+    """
+    statement = (
+        select(
+            models.Interaction.student_id,
+            models.Problem.internal_idx,
+            models.Skill.internal_idx,
+            models.Interaction.is_correct,
+            models.Interaction.timestamp
+        )
+        .select_from(models.Interaction)
+        .join(models.Problem, models.Problem.id == models.Interaction.problem_id)
+        .join(models.Skill, models.Skill.id == models.Interaction.skill_id)
+        .order_by(models.Interaction.student_id, models.Interaction.timestamp)
+    )
+    if student_ids is not None:
+        student_ids = list(student_ids)
+        if not student_ids:
+            return {}
+        statement = statement.where(models.Interaction.student_id.in_(student_ids))
+
+    histories: Dict[int, List[Tuple]] = {}
+    for student_id, problem_idx, skill_idx, is_correct, timestamp in db.execute(statement):
+        histories.setdefault(student_id, []).append((problem_idx, skill_idx, is_correct, timestamp))
+    return {student_id: _history_from_rows(rows) for student_id, rows in histories.items()}
+
+def load_student_history(db: Session, student_id: int) -> StudentHistory:
+    """
+    Lädt die Historie eines Schülers ohne ORM-Objekte.
+
+    Liest die gepackte Historie mit einem einzigen Blob-Read. Existiert (noch) keine,
+    wird sie aus der interactions Tabelle gebaut (siehe manage.py rebuild-histories).
+    """
+    row = db.execute(
+        select(models.PackedHistory.packed, models.PackedHistory.timestamps)
+        .where(models.PackedHistory.student_id == student_id)
+    ).first()
+    if row is not None:
+        return unpack_history(row.packed, row.timestamps)
+
+    return query_student_histories(db, [student_id]).get(student_id, StudentHistory.empty())
+
+def append_to_histories(db: Session, interactions: List[Dict[str, Any]]) -> Dict[int, HistoryAppend]:
+    """
+    Hängt neu eingefügte Interaktionen an die gepackten Historien an.
+
+    Muss in derselben Transaktion wie das Einfügen der Interaktionen aufgerufen werden
+    (nach dem Insert/Flush, vor dem Commit). Schüler ohne gepackte Historie werden
+    vollständig aus der interactions Tabelle aufgebaut.
+
+    Die Schüler-Zeilen werden bis zum Commit gesperrt (SELECT ... FOR UPDATE, nach
+    ID sortiert), damit parallele Inserts für denselben Schüler den Blob nacheinander
+    lesen und zusammenführen statt sich gegenseitig zu überschreiben. SQLite
+    serialisiert Schreib-Transaktionen ohnehin.
+
+    Args:
+        interactions: Dicts mit student_id, problem_id, skill_id, is_correct, timestamp
+
+    Returns:
+        Neue Historie, angehängte und vorherige Interaktionen je betroffenem Schüler
+        (für die Zähler, siehe stats.update_student_stats)
+    """
+    if not interactions:
+        return {}
+
+    student_ids = sorted({row["student_id"] for row in interactions})
+    problem_ids = {row["problem_id"] for row in interactions}
+    skill_ids = {row["skill_id"] for row in interactions}
+
+    problem_idx = dict(db.execute(
+        select(models.Problem.id, models.Problem.internal_idx).where(models.Problem.id.in_(problem_ids))
+    ).all())
+    skill_idx = dict(db.execute(
+        select(models.Skill.id, models.Skill.internal_idx).where(models.Skill.id.in_(skill_ids))
+    ).all())
+
+    db.execute(
+        select(models.Student.id)
+        .where(models.Student.id.in_(student_ids))
+        .order_by(models.Student.id)
+        .with_for_update()
+    )
+    existing = {
+        row.student_id: row
+        for row in db.execute(
+            select(models.PackedHistory.student_id, models.PackedHistory.packed, models.PackedHistory.timestamps)
+            .where(models.PackedHistory.student_id.in_(student_ids))
+        )
+    }
+    missing = [student_id for student_id in student_ids if student_id not in existing]
+    rebuilt = query_student_histories(db, missing) if missing else {}
+
+    new_rows: Dict[int, List[Tuple]] = {}
+    for row in interactions:
+        new_rows.setdefault(row["student_id"], []).append((
+            problem_idx[row["problem_id"]],
+            skill_idx[row["skill_id"]],
+            row["is_correct"],
+            row["timestamp"]
+        ))
+
+    now = datetime.utcnow()
+    appended: Dict[int, HistoryAppend] = {}
+    updates, inserts = [], []
+    for student_id in student_ids:
+        added = _history_from_rows(new_rows[student_id])
+        if student_id in existing:
+            stored = existing[student_id]
+            previous = unpack_history(stored.packed, stored.timestamps)
+            history = merge_histories(previous, added)
+            target = updates
+        else:
+            previous = None
+            history = rebuilt.get(student_id, StudentHistory.empty())
+            target = inserts
+        appended[student_id] = HistoryAppend(history, added, previous)
+        packed, timestamps = pack_history(history)
+        target.append({
+            "student_id": student_id,
+            "length": len(history),
+            "packed": packed,
+            "timestamps": timestamps,
+            "updated_at": now
+        })
+
+    if updates:
+        db.execute(update(models.PackedHistory), updates)
+    if inserts:
+        db.execute(insert(models.PackedHistory), inserts)
+    return appended
+
+def rebuild_histories(db: Session, student_ids: Optional[List[int]] = None) -> int:
+    """
+    Baut die gepackten Historien (und die Zähler in student_stats) aus der
+    interactions Tabelle neu auf.
+
+    Args:
+        student_ids: Nur diese Schüler (Standard: alle)
+
+    Returns:
+        Anzahl neu geschriebener Historien
+    """
+    from .stats import write_student_stats
+
+    if student_ids is None:
+        student_ids = [row.id for row in db.execute(select(models.Student.id).order_by(models.Student.id))]
+
+    now = datetime.utcnow()
+    written = 0
+    try:
+        for offset in range(0, len(student_ids), REBUILD_CHUNK_SIZE):
+            chunk = student_ids[offset:offset + REBUILD_CHUNK_SIZE]
+            histories = query_student_histories(db, chunk)
+            db.query(models.PackedHistory)\
+                .filter(models.PackedHistory.student_id.in_(chunk))\
+                .delete(synchronize_session=False)
+            rows = []
+            chunk_histories = {}
+            for student_id in chunk:
+                history = histories.get(student_id, StudentHistory.empty())
+                chunk_histories[student_id] = history
+                packed, timestamps = pack_history(history)
+                rows.append({
+                    "student_id": student_id,
+                    "length": len(history),
+                    "packed": packed,
+                    "timestamps": timestamps,
+                    "updated_at": now
+                })
+            if rows:
+                db.execute(insert(models.PackedHistory), rows)
+            write_student_stats(db, chunk_histories)
+            written += len(rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
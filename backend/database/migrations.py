@@ -0,0 +1,73 @@
+"""
+Schema-Migrationen für bestehende Datenbanken.
+
+create_all legt nur fehlende Tabellen an; Indizes, die nachträglich zu bestehenden
+Tabellen hinzugekommen sind, werden hier idempotent ergänzt.
+"""
+import logging
+from typing import List
+from sqlalchemy import insert, inspect, select
+from sqlalchemy.engine import Engine
+from .db_setup import Base
+from . import models  # registriert alle Tabellen in Base.metadata
+
+logger = logging.getLogger(__name__)
+
+def ensure_indexes(engine: Engine) -> List[str]:
+    """
+    Legt alle im Modell definierten, aber in der DB fehlenden Indizes an.
+
+    Returns:
+        Namen der neu angelegten Indizes
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                if index.name in existing_indexes:
+                    continue
+                index.create(bind=connection)
+                created.append(index.name)
+                logger.info(f"Index angelegt: {index.name} auf {table.name}")
+
+    return created
+
+def migrate(engine: Engine) -> List[str]:
+    """
+    Legt fehlende Tabellen und Indizes (inkl. Suchindex) an und füllt neu angelegte
+    Zähler-Tabellen.
+
+    Returns:
+        Beschreibung der ausgeführten Schritte (leer = Schema war aktuell)
+    """
+    from .search import ensure_search_index
+    from .stats import backfill_student_stats
+
+    existing_tables = set(inspect(engine).get_table_names())
+    Base.metadata.create_all(bind=engine)
+    steps = [f"Tabelle {table.name} angelegt" for table in Base.metadata.sorted_tables
+             if existing_tables and table.name not in existing_tables]
+
+    # Bestehende Datenbank bekommt student_stats: Zähler einmalig aus interactions berechnen
+    if existing_tables and models.StudentStats.__tablename__ not in existing_tables:
+        with engine.begin() as connection:
+            count = backfill_student_stats(connection)
+        steps.append(f"student_stats für {count} Schüler berechnet")
+        logger.info(steps[-1])
+
+    steps += [f"Index {name} angelegt" for name in ensure_indexes(engine)]
+
+    # Zeile für die Katalog-Version (services/catalog.py), danach nur noch UPDATE
+    with engine.begin() as connection:
+        if connection.execute(select(models.CatalogVersion.id)).first() is None:
+            connection.execute(insert(models.CatalogVersion).values(id=1, version=0))
+
+    with engine.begin() as connection:
+        steps += ensure_search_index(connection)
+    return steps
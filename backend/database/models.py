@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Float, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Float, Text, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func 
 
@@ -19,24 +19,34 @@ class Class(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     description = Column(String, nullable=False) 
-    teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=False)
+    teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     teacher = relationship("Teacher", back_populates="classes")
     students = relationship("Student", back_populates="class_") 
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # Partieller Index: fast alle Abfragen sehen nur nicht gelöschte Schüler
+        Index(
+            "ix_students_class_active", "class_id", "id",
+            sqlite_where=text("is_deleted = 0"),
+            postgresql_where=text("is_deleted = false")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False, index=True)
     last_interaction_update_timestamp = Column(DateTime(timezone=True), nullable=True) 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     class_ = relationship("Class", back_populates="students") 
     interactions = relationship("Interaction", back_populates="student", cascade="all, delete-orphan")
+    packed_history = relationship("PackedHistory", back_populates="student", cascade="all, delete-orphan", uselist=False)
+    stats = relationship("StudentStats", back_populates="student", cascade="all, delete-orphan", uselist=False)
 
 class Skill(Base): 
     __tablename__ = "skills"
@@ -61,8 +71,23 @@ class Problem(Base):
     skill = relationship("Skill", back_populates="problems")
     interactions = relationship("Interaction", back_populates="problem")
 
+class CatalogVersion(Base):
+    __tablename__ = "catalog_version"
+
+    # Eine Zeile; wird bei jeder Änderung an Skills/Problems hochgezählt (services/catalog.py)
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class Interaction(Base):
     __tablename__ = "interactions"
+    __table_args__ = (
+        # Covering Index für das Laden der Historie (database/history.py)
+        # Der Präfix (student_id, timestamp) bedient auch Zeitraum-Filter, Sortierung und Statistiken
+        Index("ix_interactions_student_history", "student_id", "timestamp", "problem_id", "skill_id", "is_correct"),
+        # Filter nach Skill (und Zeitraum) innerhalb eines Schülers, ebenfalls covering
+        Index("ix_interactions_student_skill_timestamp", "student_id", "skill_id", "timestamp", "problem_id", "is_correct"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -73,3 +98,41 @@ class Interaction(Base):
     student = relationship("Student", back_populates="interactions")
     problem = relationship("Problem", back_populates="interactions")
     skill = relationship("Skill", back_populates="interactions")
+
+class ImportRecord(Base):
+    __tablename__ = "import_records"
+    __table_args__ = (
+        Index("ix_import_records_class_hash", "class_id", "content_hash"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
+    student_id = Column(Integer, nullable=True)  # Optionaler Ziel-Schüler aus dem Upload-Formular
+    teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=False)
+    content_hash = Column(String(64), nullable=False)  # SHA-256 der hochgeladenen Datei
+    filename = Column(String, nullable=True)
+    result_json = Column(Text, nullable=False)  # Serialisiertes ImportResult
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PackedHistory(Base):
+    __tablename__ = "student_histories"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    length = Column(Integer, nullable=False, default=0)
+    packed = Column(LargeBinary, nullable=False)  # int32 Tripel (problem_idx, skill_idx, correct), zeitlich sortiert
+    timestamps = Column(LargeBinary, nullable=False)  # int64 Mikrosekunden seit Epoch (UTC)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    student = relationship("Student", back_populates="packed_history")
+
+class StudentStats(Base):
+    __tablename__ = "student_stats"
+
+    # Zähler werden bei jedem Insert mitgeführt (database/stats.py)
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    total_interactions = Column(Integer, nullable=False, default=0)
+    correct_interactions = Column(Integer, nullable=False, default=0)
+    skills_practiced = Column(Integer, nullable=False, default=0)
+    problems_attempted = Column(Integer, nullable=False, default=0)
+    last_activity = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    student = relationship("Student", back_populates="stats")
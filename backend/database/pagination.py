@@ -0,0 +1,76 @@
+"""
+Keyset-Pagination (Cursor) für Listen-Endpunkte.
+
+Statt skip/offset wird der Sortierschlüssel des letzten Eintrags einer Seite als
+opaker Cursor zurückgegeben; die nächste Seite beginnt direkt hinter diesem
+Schlüssel. Die Kosten einer Seite hängen damit nicht von ihrer Position ab.
+
+    Interaktionen: (timestamp, id)
+    Schüler:       (id,)
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Type
+from sqlalchemy import and_, desc, or_
+from sqlalchemy.sql import ColumnElement
+from . import models
+
+def encode_cursor(*values: Any) -> str:
+    """Kodiert einen Sortierschlüssel als URL-sicheren Cursor."""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types: Type) -> Tuple:
+    """
+    Dekodiert einen Cursor in einen Sortierschlüssel mit den angegebenen Typen.
+
+    Raises:
+        ValueError: Wenn der Cursor nicht zu den Typen passt
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(value) if value_type is datetime else value_type(value)
+            for value_type, value in zip(types, values)
+        )
+    except (ValueError, TypeError):
+        raise ValueError("Ungültiger Cursor")
+
+def interaction_cursor(timestamp: datetime, interaction_id: int) -> str:
+    return encode_cursor(timestamp, interaction_id)
+
+def decode_interaction_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    return decode_cursor(cursor, datetime, int) if cursor else None
+
+def student_cursor(student_id: int) -> str:
+    return encode_cursor(student_id)
+
+def decode_student_cursor(cursor: Optional[str]) -> Optional[int]:
+    return decode_cursor(cursor, int)[0] if cursor else None
+
+def interactions_after(after: Tuple[datetime, int], sort_desc: bool = True) -> ColumnElement:
+    """
+    Filter für Interaktionen hinter dem Cursor in Sortierung (timestamp, id).
+
+    Die Bedingung auf timestamp allein begrenzt den Index-Bereich, die zweite
+    entscheidet bei gleichem timestamp über die id.
+    """
+    timestamp, interaction_id = after
+    if sort_desc:
+        return and_(
+            models.Interaction.timestamp <= timestamp,
+            or_(models.Interaction.timestamp < timestamp, models.Interaction.id < interaction_id)
+        )
+    return and_(
+        models.Interaction.timestamp >= timestamp,
+        or_(models.Interaction.timestamp > timestamp, models.Interaction.id > interaction_id)
+    )
+
+def interaction_order(sort_desc: bool = True) -> List[ColumnElement]:
+    if sort_desc:
+        return [desc(models.Interaction.timestamp), desc(models.Interaction.id)]
+    return [models.Interaction.timestamp, models.Interaction.id]
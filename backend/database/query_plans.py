@@ -0,0 +1,292 @@
+"""
+Query-Plan Prüfung für die häufigsten Abfragen auf interactions und students.
+
+Jede Abfrage entspricht einer Abfrage aus crud.py bzw. den Routes. Mit
+EXPLAIN QUERY PLAN (SQLite) wird geprüft, dass die erwarteten Indizes verwendet
+werden und keine vollständigen Tabellen-Scans oder temporären Sortierungen
+auf den großen Tabellen entstehen.
+
+Die Index-Wahl von SQLite hängt von den ANALYZE-Statistiken ab: ohne Statistiken
+sind gleich teure Indizes austauschbar, mit Statistiken einer winzigen Datenbank
+gewinnen Scans. check_reference_query_plans prüft deshalb auf einer temporären
+Datenbank (migrate) mit repräsentativen synthetischen Daten und ANALYZE.
+
+Ausführen: python manage.py check-query-plans
+"""
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Sequence, Set
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+from . import models
+from .db_setup import Base, build_engine
+from .pagination import interaction_order, interactions_after
+from .search import with_fts_match
+
+class PlanCheck(NamedTuple):
+    name: str
+    build: Callable[[], Select]
+    # Jede Menge muss mindestens einen verwendeten Index enthalten
+    expected_indexes: Sequence[Set[str]]
+    allow_temp_sort: bool = False
+
+class PlanResult(NamedTuple):
+    name: str
+    ok: bool
+    plan: List[str]
+    problems: List[str]
+    warnings: List[str]
+
+# Tabellen, auf denen ein vollständiger Scan als Regression gilt
+LARGE_TABLES = ("interactions", "students", "student_stats")
+
+_START = datetime(2024, 1, 1)
+_END = datetime(2024, 12, 31)
+
+def _student_interactions() -> Select:
+    # crud.get_student_interactions (Standard: neueste zuerst, mit Problem/Skill)
+    return (
+        select(models.Interaction, models.Problem, models.Skill)
+        .outerjoin(models.Problem, models.Problem.id == models.Interaction.problem_id)
+        .outerjoin(models.Skill, models.Skill.id == models.Interaction.skill_id)
+        .where(models.Interaction.student_id == 1)
+        .order_by(*interaction_order(sort_desc=True))
+        .limit(50)
+    )
+
+def _student_interactions_page() -> Select:
+    # crud.get_student_interactions mit Cursor (Keyset auf timestamp, id)
+    return (
+        select(models.Interaction)
+        .where(models.Interaction.student_id == 1, interactions_after((_END, 1000), sort_desc=True))
+        .order_by(*interaction_order(sort_desc=True))
+        .limit(50)
+    )
+
+def _student_interactions_by_skill() -> Select:
+    # crud.get_student_interactions mit skill_id, start_date und end_date
+    return (
+        select(models.Interaction)
+        .where(
+            models.Interaction.student_id == 1,
+            models.Interaction.timestamp >= _START,
+            models.Interaction.timestamp <= _END,
+            models.Interaction.skill_id == 1
+        )
+        .order_by(*interaction_order(sort_desc=True))
+    )
+
+def _student_history() -> Select:
+    # history.query_student_histories für einen Schüler
+    return (
+        select(
+            models.Problem.internal_idx,
+            models.Skill.internal_idx,
+            models.Interaction.is_correct,
+            models.Interaction.timestamp
+        )
+        .select_from(models.Interaction)
+        .join(models.Problem, models.Problem.id == models.Interaction.problem_id)
+        .join(models.Skill, models.Skill.id == models.Interaction.skill_id)
+        .where(models.Interaction.student_id == 1)
+        .order_by(models.Interaction.timestamp)
+    )
+
+def _students_in_class() -> Select:
+    # crud.get_students_by_class (mit Cursor)
+    return (
+        select(models.Student)
+        .where(models.Student.class_id == 1, models.Student.is_deleted == False, models.Student.id > 100)
+        .order_by(models.Student.id)
+        .limit(100)
+    )
+
+def _student_search() -> Select:
+    # crud_async.search_students (FTS5) über die Klassen der Lehrkraft
+    statement = select(models.Student).where(models.Student.is_deleted == False, models.Student.class_id.in_([1, 2]))
+    return with_fts_match(statement, ["max", "mü"]).limit(20)
+
+def _teacher_student_count() -> Select:
+    # crud_async.get_teacher_statistics (Schüler)
+    return (
+        select(func.count(models.Student.id))
+        .join(models.Class)
+        .where(models.Class.teacher_id == 1, models.Student.is_deleted == False)
+    )
+
+def _teacher_interaction_count() -> Select:
+    # crud_async.get_teacher_statistics (Interaktionen und letzte Aktivität aus student_stats)
+    return (
+        select(func.sum(models.StudentStats.total_interactions), func.max(models.StudentStats.last_activity))
+        .join(models.Student, models.Student.id == models.StudentStats.student_id)
+        .join(models.Class)
+        .where(models.Class.teacher_id == 1)
+    )
+
+PLAN_CHECKS: List[PlanCheck] = [
+    PlanCheck("student_interactions", _student_interactions, [{"ix_interactions_student_history"}]),
+    PlanCheck("student_interactions_page", _student_interactions_page, [{"ix_interactions_student_history"}]),
+    PlanCheck("student_interactions_by_skill", _student_interactions_by_skill, [{"ix_interactions_student_skill_timestamp"}]),
+    PlanCheck("student_history", _student_history, [{"ix_interactions_student_history"}]),
+    PlanCheck("students_in_class", _students_in_class, [{"ix_students_class_active"}]),
+    # Treffer kommen aus dem FTS5-Index (virtuelle Tabelle), Sortierung nach bm25
+    PlanCheck("student_search", _student_search, [], allow_temp_sort=True),
+    PlanCheck("teacher_student_count", _teacher_student_count, [{"ix_classes_teacher_id"}, {"ix_students_class_active"}]),
+    # Ohne Filter auf is_deleted kommt der partielle Index nicht in Frage
+    PlanCheck("teacher_interaction_count", _teacher_interaction_count, [{"ix_classes_teacher_id"}, {"ix_students_class_id"}]),
+]
+
+# Ohne ANALYZE-Statistiken für die Tabelle wählt SQLite zwischen gleich teuren
+# Indizes beliebig; dann gilt der Ersatz nur als Warnung, nicht als Fehler
+FALLBACK_INDEXES = {"ix_students_class_active": "ix_students_class_id"}
+
+def explain(connection: Connection, statement: Select) -> List[str]:
+    """Gibt die Zeilen von EXPLAIN QUERY PLAN für eine Abfrage zurück (nur SQLite)."""
+    # render_postcompile: IN-Listen als einzelne Platzhalter
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[-1] for row in rows]
+
+def _index_tables() -> Dict[str, str]:
+    return {index.name: table.name for table in Base.metadata.sorted_tables for index in table.indexes}
+
+def analyzed_tables(connection: Connection) -> Set[str]:
+    """Tabellen mit ANALYZE-Statistiken (sqlite_stat1)."""
+    if not connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").first():
+        return set()
+    return {row[0] for row in connection.exec_driver_sql("SELECT DISTINCT tbl FROM sqlite_stat1")}
+
+def _check(connection: Connection, check: PlanCheck, analyzed: Set[str]) -> PlanResult:
+    plan = explain(connection, check.build())
+    used = set(re.findall(r"USING (?:COVERING )?INDEX (\w+)", " ".join(plan)))
+    problems, warnings = [], []
+    index_tables = _index_tables()
+
+    for expected in check.expected_indexes:
+        if used & expected:
+            continue
+        fallbacks = {FALLBACK_INDEXES[name] for name in expected if name in FALLBACK_INDEXES} & used
+        if fallbacks and not {index_tables.get(name) for name in fallbacks} & analyzed:
+            warnings.append(
+                f"verwendet {sorted(fallbacks)} statt {sorted(expected)}: "
+                f"ohne ANALYZE-Statistiken für die Tabelle nicht aussagekräftig"
+            )
+            continue
+        problems.append(f"erwartet einen Index aus {sorted(expected)}, verwendet: {sorted(used) or 'keinen'}")
+    for line in plan:
+        for table in LARGE_TABLES:
+            if re.match(rf"SCAN {table}\b", line.strip()):
+                problems.append(f"vollständiger Scan: {line.strip()}")
+        # "RIGHT PART OF ORDER BY" sortiert nur Zeilen mit gleichem Präfix (z.B. id bei gleichem timestamp)
+        if not check.allow_temp_sort and "USE TEMP B-TREE" in line and "RIGHT PART" not in line:
+            problems.append(f"temporäre Sortierung: {line.strip()}")
+
+    return PlanResult(check.name, not problems, plan, problems, warnings)
+
+def check_query_plans(engine: Engine, analyze: bool = True) -> List[PlanResult]:
+    """
+    Prüft alle PLAN_CHECKS gegen die Datenbank.
+
+    Args:
+        analyze: Vorher ANALYZE ausführen (schreibt sqlite_stat1); nur bei
+            repräsentativen Daten sinnvoll, siehe check_reference_query_plans
+
+    Raises:
+        ValueError: Wenn die Datenbank kein SQLite ist
+    """
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"Query-Plan Prüfung wird nur für SQLite unterstützt (nicht {engine.dialect.name})")
+    # Eine Verbindung: Statistiken werden pro Verbindung geladen
+    with engine.connect() as connection:
+        if analyze:
+            connection.exec_driver_sql("ANALYZE")
+            connection.commit()
+        analyzed = analyzed_tables(connection)
+        return [_check(connection, check, analyzed) for check in PLAN_CHECKS]
+
+# Umfang der Referenzdaten: viele Klassen, ein Teil der Schüler gelöscht,
+# Interaktionen über viele Schüler, Skills und Zeitpunkte verteilt
+REFERENCE_TEACHERS = 10
+REFERENCE_CLASSES_PER_TEACHER = 5
+REFERENCE_STUDENTS_PER_CLASS = 30
+REFERENCE_DELETED_EVERY = 10
+REFERENCE_SKILLS = 20
+REFERENCE_PROBLEMS = 400
+REFERENCE_ACTIVE_STUDENTS = 300
+REFERENCE_INTERACTIONS_PER_STUDENT = 40
+
+def seed_reference_data(connection: Connection) -> None:
+    """Füllt eine leere, migrierte Datenbank mit repräsentativen synthetischen Daten."""
+    connection.execute(insert(models.Teacher), [
+        {"username": f"reference_{t}", "hashed_password": "-"} for t in range(REFERENCE_TEACHERS)
+    ])
+    teacher_ids = list(connection.scalars(select(models.Teacher.id).order_by(models.Teacher.id)))
+    connection.execute(insert(models.Class), [
+        {"name": f"Klasse {teacher_id}-{c}", "description": "Referenz", "teacher_id": teacher_id}
+        for teacher_id in teacher_ids
+        for c in range(REFERENCE_CLASSES_PER_TEACHER)
+    ])
+    class_ids = list(connection.scalars(select(models.Class.id).order_by(models.Class.id)))
+    connection.execute(insert(models.Student), [
+        {
+            "first_name": f"Vorname{s}",
+            "last_name": f"Nachname{class_id}",
+            "class_id": class_id,
+            "is_deleted": s % REFERENCE_DELETED_EVERY == 0
+        }
+        for class_id in class_ids
+        for s in range(REFERENCE_STUDENTS_PER_CLASS)
+    ])
+    student_ids = list(connection.scalars(
+        select(models.Student.id).where(models.Student.is_deleted == False).order_by(models.Student.id)
+    ))[:REFERENCE_ACTIVE_STUDENTS]
+
+    connection.execute(insert(models.Skill), [
+        {"internal_idx": i, "original_skill_id": f"skill_{i}", "name": f"Skill {i}"} for i in range(REFERENCE_SKILLS)
+    ])
+    skill_ids = list(connection.scalars(select(models.Skill.id).order_by(models.Skill.id)))
+    connection.execute(insert(models.Problem), [
+        {"internal_idx": i, "original_problem_id": str(i), "skill_id": skill_ids[i % len(skill_ids)]}
+        for i in range(REFERENCE_PROBLEMS)
+    ])
+    problems = connection.execute(select(models.Problem.id, models.Problem.skill_id).order_by(models.Problem.id)).all()
+
+    rows, stats = [], []
+    for n, student_id in enumerate(student_ids):
+        for i in range(REFERENCE_INTERACTIONS_PER_STUDENT):
+            problem_id, skill_id = problems[(n * 7 + i * 13) % len(problems)]
+            rows.append({
+                "student_id": student_id,
+                "problem_id": problem_id,
+                "skill_id": skill_id,
+                "is_correct": (n + i) % 3 != 0,
+                "timestamp": _START + timedelta(days=(n + i) % 300, minutes=i)
+            })
+        stats.append({
+            "student_id": student_id,
+            "total_interactions": REFERENCE_INTERACTIONS_PER_STUDENT,
+            "correct_interactions": 0,
+            "skills_practiced": 0,
+            "problems_attempted": 0,
+            "last_activity": _END
+        })
+    connection.execute(insert(models.Interaction), rows)
+    connection.execute(insert(models.StudentStats), stats)
+
+def check_reference_query_plans() -> List[PlanResult]:
+    """Prüft alle PLAN_CHECKS auf einer temporären Datenbank mit Referenzdaten (nach ANALYZE)."""
+    from .migrations import migrate
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp_dir, 'query_plans.db')}")
+        try:
+            migrate(engine)
+            with engine.begin() as connection:
+                seed_reference_data(connection)
+            return check_query_plans(engine, analyze=True)
+        finally:
+            engine.dispose()
@@ -0,0 +1,199 @@
+"""
+Volltextsuche über Schülernamen.
+
+SQLite:     FTS5-Tabelle students_fts (external content auf students), per Trigger
+            bei Insert, Update und Soft Delete synchron gehalten. Gelöschte
+            Schüler stehen nicht im Index. Ranking nach bm25, Präfixsuche pro Wort.
+PostgreSQL: pg_trgm GIN-Index auf "first_name last_name" (nur nicht gelöschte),
+            Ranking nach similarity().
+Sonst:      ILIKE auf Vor- und Nachnamen (ohne Index).
+
+Angelegt werden Tabelle, Trigger und Indizes von ensure_search_index (siehe
+migrations.migrate).
+"""
+import logging
+import re
+import weakref
+from typing import List, Optional
+from sqlalchemy import and_, column, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+from . import models
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "students_fts"
+TRGM_INDEX = "ix_students_name_trgm"
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        first_name, last_name,
+        content='students', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    # Nur nicht gelöschte Schüler stehen im Index
+    f"""
+    CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students
+    WHEN coalesce(new.is_deleted, 0) = 0
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name) VALUES (new.id, new.first_name, new.last_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students
+    WHEN coalesce(old.is_deleted, 0) = 0
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name) VALUES ('delete', old.id, old.first_name, old.last_name);
+    END
+    """,
+    # Alten Eintrag entfernen, dann neuen einfügen (in einem Trigger, Reihenfolge zählt)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF first_name, last_name, is_deleted ON students
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name)
+        SELECT 'delete', old.id, old.first_name, old.last_name WHERE coalesce(old.is_deleted, 0) = 0;
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name)
+        SELECT new.id, new.first_name, new.last_name WHERE coalesce(new.is_deleted, 0) = 0;
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON students
+    USING gin ((first_name || ' ' || last_name) gin_trgm_ops)
+    WHERE is_deleted = false
+    """,
+]
+
+# Ob die FTS5-Tabelle existiert, je Engine
+_fts_available: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
+def _sqlite_has_fts(connection: Connection) -> bool:
+    available = _fts_available.get(connection.engine)
+    if available is None:
+        available = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first() is not None
+        _fts_available[connection.engine] = available
+    return available
+
+def ensure_search_index(connection: Connection) -> List[str]:
+    """
+    Legt den Suchindex für den Dialekt der Verbindung an (idempotent).
+
+    Ein neu angelegter FTS5-Index wird aus den bestehenden Schülern befüllt.
+    Ist FTS5 bzw. pg_trgm nicht verfügbar, bleibt die Suche bei ILIKE.
+
+    Returns:
+        Beschreibung der ausgeführten Schritte
+    """
+    dialect = connection.dialect.name
+    steps = []
+    if dialect == "sqlite":
+        _fts_available.pop(connection.engine, None)
+        if _sqlite_has_fts(connection):
+            return steps
+        try:
+            for statement in _SQLITE_DDL:
+                connection.exec_driver_sql(statement)
+        except Exception as e:
+            logger.warning(f"FTS5 nicht verfügbar, Schülersuche ohne Index: {e}")
+            return steps
+        _fts_available[connection.engine] = True
+        count = rebuild_search_index(connection)
+        steps.append(f"Suchindex {FTS_TABLE} angelegt ({count} Schüler)")
+    elif dialect == "postgresql":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM pg_indexes WHERE indexname = %(name)s", {"name": TRGM_INDEX}
+        ).first()
+        if exists:
+            return steps
+        try:
+            for statement in _POSTGRES_DDL:
+                connection.exec_driver_sql(statement)
+        except Exception as e:
+            logger.warning(f"pg_trgm nicht verfügbar, Schülersuche ohne Index: {e}")
+            return steps
+        steps.append(f"Suchindex {TRGM_INDEX} angelegt")
+    for step in steps:
+        logger.info(step)
+    return steps
+
+def rebuild_search_index(connection: Connection) -> int:
+    """
+    Befüllt den FTS5-Index neu aus den nicht gelöschten Schülern (nur SQLite).
+
+    Nicht das FTS5-Kommando 'rebuild' verwenden: es würde auch gelöschte
+    Schüler aus der content-Tabelle indexieren.
+
+    Returns:
+        Anzahl indexierter Schüler
+    """
+    if connection.dialect.name != "sqlite" or not _sqlite_has_fts(connection):
+        raise ValueError("Kein FTS5-Suchindex vorhanden (siehe manage.py migrate)")
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+    return connection.exec_driver_sql(
+        f"INSERT INTO {FTS_TABLE}(rowid, first_name, last_name) "
+        "SELECT id, first_name, last_name FROM students WHERE coalesce(is_deleted, 0) = 0"
+    ).rowcount
+
+def search_terms(query: str) -> List[str]:
+    """Zerlegt eine Suchanfrage in Wörter (Satzzeichen und FTS-Syntax werden ignoriert)."""
+    return re.findall(r"\w+", query)
+
+def _fts_match(terms: List[str]) -> str:
+    # Jedes Wort als Präfix ("max"* "mü"*), alle Wörter müssen vorkommen
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+def with_fts_match(statement: Select, terms: List[str]) -> Select:
+    """Schränkt eine Abfrage auf models.Student auf FTS5-Treffer ein, sortiert nach bm25."""
+    fts = table(FTS_TABLE, column("rowid"), column("rank"))
+    return (
+        statement
+        .join(fts, fts.c.rowid == models.Student.id)
+        .where(text(f"{FTS_TABLE} MATCH :match").bindparams(match=_fts_match(terms)))
+        .order_by(fts.c.rank, models.Student.id)
+    )
+
+def search_students_statement(
+    connection: Connection,
+    query: str,
+    class_ids: Optional[List[int]] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> Optional[Select]:
+    """
+    Abfrage für die Schülersuche (nach Relevanz sortiert, gelöschte Schüler ausgeschlossen).
+
+    Args:
+        class_ids: Nur Schüler dieser Klassen (Standard: alle)
+
+    Returns:
+        Select auf models.Student, oder None wenn die Anfrage keine Wörter enthält
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+
+    dialect = connection.dialect.name
+    statement = select(models.Student).where(models.Student.is_deleted == False)
+    if class_ids is not None:
+        statement = statement.where(models.Student.class_id.in_(class_ids))
+
+    if dialect == "sqlite" and _sqlite_has_fts(connection):
+        statement = with_fts_match(statement, terms)
+    else:
+        # Gleicher Ausdruck wie im GIN-Index, damit PostgreSQL ihn verwendet
+        name = models.Student.first_name.op("||")(literal_column("' '")).op("||")(models.Student.last_name)
+        statement = statement.where(and_(*[name.ilike(f"%{term}%") for term in terms]))
+        if dialect == "postgresql":
+            statement = statement.order_by(func.similarity(name, " ".join(terms)).desc(), models.Student.id)
+        else:
+            statement = statement.order_by(models.Student.id)
+
+    return statement.offset(skip).limit(limit)
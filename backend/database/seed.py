@@ -0,0 +1,157 @@
+import json
+from typing import Dict, Optional
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from . import models, crud
+from services.catalog import bump_catalog_version, invalidate_catalog
+import schemas
+
+# Spaltennamen im Original-Datensatz (ASSISTments 2017) und im bereinigten Format
+PROBLEM_COLUMNS = ("problemId", "problem_id")
+SKILL_COLUMNS = ("skill", "skill_id")
+
+def load_akt_mappings(mappings_path: str) -> Dict[str, Dict[str, int]]:
+    """Lädt skill_to_idx und problem_to_idx aus der AKT Mappings-Datei."""
+    with open(mappings_path, 'r', encoding='utf-8') as f:
+        mappings = json.load(f)
+    return {
+        "skill_to_idx": mappings["skill_to_idx"],
+        "problem_to_idx": mappings["problem_to_idx"]
+    }
+
+def load_problem_skill_map(csv_path: str) -> pd.Series:
+    """
+    Leitet die Problem-Skill Zuordnung aus dem Datensatz ab.
+
+    Liest nur die benötigten Spalten und nimmt pro Problem die erste gefundene
+    Zuordnung (vektorisiert per groupby statt zeilenweiser Iteration).
+
+    Returns:
+        Series mit problem_id (str) als Index und Skill-Name als Wert
+    """
+    wanted_columns = set(PROBLEM_COLUMNS) | set(SKILL_COLUMNS)
+    df = pd.read_csv(
+        csv_path,
+        encoding='latin1',
+        usecols=lambda column: column in wanted_columns,
+        dtype=str
+    )
+
+    problem_column = next((c for c in PROBLEM_COLUMNS if c in df.columns), None)
+    skill_column = next((c for c in SKILL_COLUMNS if c in df.columns), None)
+    if problem_column is None or skill_column is None:
+        raise ValueError(f"CSV enthält keine Problem/Skill Spalten: {list(df.columns)}")
+
+    df = df.rename(columns={problem_column: "problem_id", skill_column: "skill_id"})
+    df = df.dropna(subset=["problem_id", "skill_id"])
+
+    # Erste Zuordnung pro Problem (ein Problem -> ein Skill)
+    return df.groupby("problem_id", sort=False)["skill_id"].first()
+
+def bulk_seed_catalog(
+    db: Session,
+    skill_to_idx: Dict[str, int],
+    problem_to_idx: Dict[str, int],
+    problem_skill_map: pd.Series,
+    replace: bool = False
+) -> Dict[str, int]:
+    """
+    Legt alle Skills und Problems in einer einzigen Transaktion an.
+
+    Training-Indizes starten bei 1, internal_idx in der DB bei 0.
+
+    Args:
+        replace: Vorhandene Skills/Problems vorher löschen. Nur möglich, solange
+            keine Interaktionen gespeichert sind: neue Skill/Problem-IDs und
+            internal_idx würden Interaktionen, gepackte Historien und Zähler
+            ungültig machen.
+
+    Returns:
+        Dict mit skills_created, problems_created, problems_skipped
+
+    Raises:
+        ValueError: Katalog bereits befüllt (ohne replace) oder Interaktionen vorhanden
+    """
+    catalog_exists = db.query(models.Skill.id).first() is not None
+    if catalog_exists and not replace:
+        raise ValueError("Katalog ist bereits befüllt. Mit replace=True neu anlegen.")
+    if catalog_exists and (
+        db.query(models.Interaction.id).first() is not None
+        or db.query(models.PackedHistory.student_id).first() is not None
+    ):
+        raise ValueError(
+            "Katalog kann nicht ersetzt werden: es sind bereits Interaktionen gespeichert, "
+            "die auf die vorhandenen Skills/Problems verweisen."
+        )
+
+    try:
+        if replace:
+            db.query(models.Problem).delete(synchronize_session=False)
+            db.query(models.Skill).delete(synchronize_session=False)
+
+        # Skills
+        skills = pd.DataFrame(list(skill_to_idx.items()), columns=["skill_name", "train_idx"])
+        skills = skills.sort_values("train_idx")
+        skill_rows = [
+            {
+                "internal_idx": int(train_idx) - 1,
+                "original_skill_id": skill_name,
+                "name": skill_name
+            }
+            for skill_name, train_idx in zip(skills["skill_name"], skills["train_idx"])
+        ]
+        if skill_rows:
+            db.execute(insert(models.Skill), skill_rows)
+
+        skill_db_ids = dict(db.query(models.Skill.original_skill_id, models.Skill.id).all())
+
+        # Problems mit Skill-Zuordnung per Join statt Einzel-Lookups
+        problems = pd.DataFrame(list(problem_to_idx.items()), columns=["problem_id", "train_idx"])
+        problems["skill_name"] = problems["problem_id"].map(problem_skill_map)
+        problems["skill_db_id"] = problems["skill_name"].map(skill_db_ids)
+        valid = problems.dropna(subset=["skill_db_id"]).sort_values("train_idx")
+
+        problem_rows = [
+            {
+                "internal_idx": int(train_idx) - 1,
+                "original_problem_id": problem_id,
+                "skill_id": int(skill_db_id),
+                "description_placeholder": f"Problem {problem_id}"
+            }
+            for problem_id, train_idx, skill_db_id in zip(valid["problem_id"], valid["train_idx"], valid["skill_db_id"])
+        ]
+        if problem_rows:
+            db.execute(insert(models.Problem), problem_rows)
+
+        bump_catalog_version(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_catalog()
+
+    return {
+        "skills_created": len(skill_rows),
+        "problems_created": len(problem_rows),
+        "problems_skipped": len(problems) - len(valid)
+    }
+
+def create_demo_data(db: Session, n_students: int = 3) -> Optional[models.Class]:
+    """Legt Demo-Lehrer, Demo-Klasse und Demo-Schüler an (falls noch nicht vorhanden)."""
+    if crud.get_teacher_by_username(db, "demo_teacher"):
+        return None
+
+    db_teacher = crud.create_teacher(db, schemas.TeacherCreate(username="demo_teacher", password="demo123"))
+    db_class = crud.create_class_for_teacher(
+        db,
+        schemas.ClassCreate(name="Demo Klasse", description="Testklasse für AKT System"),
+        db_teacher.id
+    )
+    for i in range(n_students):
+        crud.create_student_in_class(
+            db,
+            schemas.StudentCreate(first_name="Test", last_name=f"Schüler{i+1}"),
+            db_class.id
+        )
+    return db_class
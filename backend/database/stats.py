@@ -0,0 +1,240 @@
+"""
+Zähler pro Schüler (student_stats) für die Statistik-Endpunkte.
+
+Die Zähler werden in derselben Transaktion wie die gepackte Historie geschrieben
+(siehe history.append_to_histories), die Endpunkte lesen nur noch eine Zeile.
+Beim Einfügen werden nur Differenzen addiert (update_student_stats); vollständig
+neu berechnet wird nur beim Neuaufbau, im Backfill und in check_student_stats.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy import bindparam, case, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from . import models
+from .history import HistoryAppend, StudentHistory
+
+class StatsMismatch(NamedTuple):
+    student_id: int
+    stored: Optional[Dict[str, Any]]
+    expected: Dict[str, Any]
+
+COUNTER_FIELDS = ("total_interactions", "correct_interactions", "skills_practiced", "problems_attempted", "last_activity")
+
+def _to_naive_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+    if timestamp is not None and timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def stats_from_history(history: StudentHistory) -> Dict[str, Any]:
+    """Berechnet die Zähler aus einer (vollständigen) Historie."""
+    if not len(history):
+        return {
+            "total_interactions": 0,
+            "correct_interactions": 0,
+            "skills_practiced": 0,
+            "problems_attempted": 0,
+            "last_activity": None
+        }
+    return {
+        "total_interactions": len(history),
+        "correct_interactions": int(history.correct.sum()),
+        "skills_practiced": len(np.unique(history.skill_idx)),
+        "problems_attempted": len(np.unique(history.problem_idx)),
+        "last_activity": history.timestamps.max().astype("datetime64[us]").item()
+    }
+
+def write_student_stats(db: Session, histories: Dict[int, StudentHistory]) -> None:
+    """
+    Schreibt die Zähler für die übergebenen Schüler vollständig neu (ohne Commit).
+
+    Args:
+        histories: Vollständige Historie je Schüler
+    """
+    if not histories:
+        return
+
+    existing = set(db.scalars(
+        select(models.StudentStats.student_id)
+        .where(models.StudentStats.student_id.in_(list(histories)))
+    ))
+    now = datetime.utcnow()
+    updates, inserts = [], []
+    for student_id, history in histories.items():
+        row = {"student_id": student_id, **stats_from_history(history), "updated_at": now}
+        (updates if student_id in existing else inserts).append(row)
+
+    if updates:
+        db.execute(update(models.StudentStats), updates)
+    if inserts:
+        db.execute(insert(models.StudentStats), inserts)
+
+def stats_delta(appended: HistoryAppend) -> Dict[str, Any]:
+    """
+    Differenz der Zähler durch die angehängten Interaktionen.
+
+    Skills und Problems zählen nur, wenn sie in der vorherigen Historie noch nicht
+    vorkommen. Setzt appended.previous voraus.
+    """
+    added, previous = appended.added, appended.previous
+    return {
+        "added_total": len(added),
+        "added_correct": int(added.correct.sum()),
+        "added_skills": len(np.setdiff1d(added.skill_idx, previous.skill_idx)),
+        "added_problems": len(np.setdiff1d(added.problem_idx, previous.problem_idx)),
+        "added_last_activity": added.timestamps.max().astype("datetime64[us]").item()
+    }
+
+def _delta_statement():
+    stats = models.StudentStats.__table__
+    last_activity = bindparam("added_last_activity", type_=stats.c.last_activity.type)
+    return (
+        update(stats)
+        .where(stats.c.student_id == bindparam("stats_student_id"))
+        .values(
+            total_interactions=stats.c.total_interactions + bindparam("added_total"),
+            correct_interactions=stats.c.correct_interactions + bindparam("added_correct"),
+            skills_practiced=stats.c.skills_practiced + bindparam("added_skills"),
+            problems_attempted=stats.c.problems_attempted + bindparam("added_problems"),
+            last_activity=case(
+                (stats.c.last_activity.is_(None), last_activity),
+                (stats.c.last_activity < last_activity, last_activity),
+                else_=stats.c.last_activity
+            ),
+            updated_at=bindparam("stats_updated_at", type_=stats.c.updated_at.type)
+        )
+    )
+
+def update_student_stats(db: Session, appended: Dict[int, HistoryAppend]) -> None:
+    """
+    Aktualisiert die Zähler nach append_to_histories (ohne Commit).
+
+    Vorhandene Zeilen bekommen die Differenzen per UPDATE ... SET x = x + :n, ohne
+    die Zähler vorher zu lesen. Schüler ohne Zeile oder mit neu aufgebauter Historie
+    werden aus der vollständigen Historie berechnet.
+    """
+    appended = {student_id: entry for student_id, entry in appended.items() if len(entry.added)}
+    if not appended:
+        return
+
+    existing = set(db.scalars(
+        select(models.StudentStats.student_id)
+        .where(models.StudentStats.student_id.in_(list(appended)))
+    ))
+    now = datetime.utcnow()
+    deltas = [
+        {"stats_student_id": student_id, **stats_delta(entry), "stats_updated_at": now}
+        for student_id, entry in appended.items()
+        if student_id in existing and entry.previous is not None
+    ]
+    if deltas:
+        db.execute(_delta_statement(), deltas)
+    write_student_stats(db, {
+        student_id: entry.history
+        for student_id, entry in appended.items()
+        if student_id not in existing or entry.previous is None
+    })
+
+def _aggregate_statement():
+    return (
+        select(
+            models.Interaction.student_id,
+            func.count(models.Interaction.id).label("total_interactions"),
+            func.sum(case((models.Interaction.is_correct == True, 1), else_=0)).label("correct_interactions"),
+            func.count(func.distinct(models.Interaction.skill_id)).label("skills_practiced"),
+            func.count(func.distinct(models.Interaction.problem_id)).label("problems_attempted"),
+            func.max(models.Interaction.timestamp).label("last_activity")
+        )
+        .group_by(models.Interaction.student_id)
+    )
+
+def compute_student_stats(db: Session, student_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """Berechnet die Zähler vollständig aus der interactions Tabelle."""
+    statement = _aggregate_statement()
+    if student_ids is not None:
+        statement = statement.where(models.Interaction.student_id.in_(list(student_ids)))
+    return {
+        row.student_id: {
+            "total_interactions": row.total_interactions,
+            "correct_interactions": row.correct_interactions or 0,
+            "skills_practiced": row.skills_practiced,
+            "problems_attempted": row.problems_attempted,
+            "last_activity": _to_naive_utc(row.last_activity)
+        }
+        for row in db.execute(statement)
+    }
+
+def backfill_student_stats(connection: Connection) -> int:
+    """Füllt eine leere student_stats Tabelle per INSERT ... SELECT (für Migrationen)."""
+    aggregate = _aggregate_statement().add_columns(func.current_timestamp())
+    result = connection.execute(
+        insert(models.StudentStats).from_select(["student_id", *COUNTER_FIELDS, "updated_at"], aggregate)
+    )
+    return result.rowcount
+
+def check_student_stats(db: Session, fix: bool = False) -> List[StatsMismatch]:
+    """
+    Vergleicht die gespeicherten Zähler mit einer Neuberechnung aus interactions.
+
+    Args:
+        fix: Abweichende Zähler überschreiben (und committen)
+
+    Returns:
+        Alle Schüler mit abweichenden oder fehlenden Zählern
+    """
+    expected_by_student = compute_student_stats(db)
+    stored_by_student = {
+        row.student_id: {field: getattr(row, field) for field in COUNTER_FIELDS}
+        for row in db.execute(select(models.StudentStats.student_id, *[
+            getattr(models.StudentStats, field) for field in COUNTER_FIELDS
+        ]))
+    }
+    empty = stats_from_history(StudentHistory.empty())
+
+    mismatches = []
+    for student_id in sorted(set(expected_by_student) | set(stored_by_student)):
+        expected = expected_by_student.get(student_id, empty)
+        stored = stored_by_student.get(student_id)
+        if stored is not None:
+            stored = {**stored, "last_activity": _to_naive_utc(stored["last_activity"])}
+        if stored != expected and not (stored is None and expected == empty):
+            mismatches.append(StatsMismatch(student_id, stored, expected))
+
+    if fix and mismatches:
+        try:
+            now = datetime.utcnow()
+            updates = [
+                {"student_id": m.student_id, **m.expected, "updated_at": now}
+                for m in mismatches if m.stored is not None
+            ]
+            inserts = [
+                {"student_id": m.student_id, **m.expected, "updated_at": now}
+                for m in mismatches if m.stored is None
+            ]
+            if updates:
+                db.execute(update(models.StudentStats), updates)
+            if inserts:
+                db.execute(insert(models.StudentStats), inserts)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    return mismatches
+
+def format_student_statistics(stats: Optional[models.StudentStats]) -> Dict[str, Any]:
+    """Antwortformat der Statistik-Endpunkte (ohne Zeile: Schüler ohne Interaktionen)."""
+    total = stats.total_interactions if stats else 0
+    correct = stats.correct_interactions if stats else 0
+    last_activity = stats.last_activity if stats else None
+    return {
+        "total_interactions": total,
+        "correct_interactions": correct,
+        "incorrect_interactions": total - correct,
+        "accuracy": round((correct / total * 100) if total > 0 else 0, 2),
+        "skills_practiced": stats.skills_practiced if stats else 0,
+        "problems_attempted": stats.problems_attempted if stats else 0,
+        "last_activity": last_activity.isoformat() if last_activity else None,
+        "activity_status": "active" if last_activity else "no_activity"
+    }
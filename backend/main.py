@@ -4,8 +4,17 @@ from contextlib import asynccontextmanager
 import logging
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import HTTPException
-from services.akt_model_service import get_akt_service
-from api import import_routes, teacher_class_routes, recommendation_routes, auth_routes, student_routes
+from starlette.concurrency import run_in_threadpool
+from services import akt_model_service
+from services.catalog import get_catalog
+from services import metrics, query_profiler, system_status
+from api.compression import CompressionMiddleware
+from api.metrics import MetricsMiddleware
+from api.query_profiler import QueryProfilerMiddleware
+from api.responses import TimedORJSONResponse
+from api.server_timing import ServerTimingMiddleware
+from api import metrics as metrics_routes
+from api import import_routes, teacher_class_routes, recommendation_routes, auth_routes, student_routes, debug_routes
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,23 +25,38 @@ async def lifespan(app: FastAPI):
     
     logger.info("Starting Knowledge Tracing System API...")
     
+    catalog = None
     try:
-        logger.info("Loading AKT Model Service...")
-        akt_service = get_akt_service()  
-        logger.info("✅ AKT Model Service loaded successfully")
+        logger.info("Loading Skill/Problem Catalog...")
+        catalog = get_catalog()
+        logger.info("✅ Catalog loaded successfully")
     except Exception as e:
-        logger.error(f"❌ Failed to load AKT Model Service: {e}")
-        logger.warning("Recommendation endpoints will not work!")
+        logger.error(f"❌ Failed to load Catalog: {e}")
+    
+    # AKT Modell im Hintergrund laden: die API nimmt sofort Requests an,
+    # Empfehlungen antworten bis dahin mit 503 und Retry-After
+    def verify_catalog(akt_service):
+        if catalog is not None:
+            akt_service.verify_catalog(catalog)
+    
+    akt_model_service.start_background_loading(on_ready=verify_catalog)
+    if not getattr(settings, "akt_model_background_loading", True):
+        # Wie früher: erst nach dem Laden Requests annehmen
+        if not await run_in_threadpool(akt_model_service.wait_until_loaded):
+            logger.warning("Recommendation endpoints will not work!")
     
     yield
     
     logger.info("Shutting down...")
+    # Ein noch laufender Ladevorgang (Daemon-Thread) würde beim Beenden mitten in torch abgebrochen
+    await run_in_threadpool(akt_model_service.wait_until_loaded, 30)
 
 app = FastAPI(
     title="Knowledge Tracing System API",
     description="Backend für AKT-basiertes Empfehlungssystem für Lehrkräfte",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TimedORJSONResponse
 )
 
 # CORS Middleware
@@ -46,6 +70,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Komprimierung (Brotli/Gzip) erst ab compression_min_size Bytes
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=getattr(settings, "compression_min_size", 1024)
+)
+
+# Server-Timing Header und Timing-Logs (außen, misst auch die Komprimierung)
+app.add_middleware(
+    ServerTimingMiddleware,
+    sample_rate=getattr(settings, "server_timing_sample_rate", 1.0),
+    log_min_ms=getattr(settings, "server_timing_log_min_ms", 0.0)
+)
+
+# Prometheus-Metriken (GET /metrics), In-Process ohne externen Dienst
+metrics_enabled = getattr(settings, "metrics_enabled", True)
+if metrics_enabled:
+    metrics.install()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_routes.router, tags=["monitoring"])
+
+# SQL-Profiler mit N+1 Erkennung (opt-in, Auswertung unter /api/debug/sql-profile)
+if getattr(settings, "sql_profiler_enabled", False):
+    app.add_middleware(QueryProfilerMiddleware, profiler=query_profiler.install())
+
 # Root Endpoint
 @app.get("/")
 async def root():
@@ -56,63 +104,33 @@ async def root():
             "docs": "/docs",
             "redoc": "/redoc",
             "health": "/health",
+            "ready": "/health/ready",
+            "metrics": "/metrics",
             "api": "/api/*"
         }
     }
 
-# Health Check
+# Health Checks
 @app.get("/health")
 async def health_check():
-    from database.db_setup import SessionLocal
-    from database import crud
-    
-    try:
-        db = SessionLocal()
-        skills_count = len(crud.get_skills(db, limit=1))
-        
-        # Test Model Service
-        model_status = "not_loaded"
-        try:
-            from services.akt_model_service import get_akt_service
-            akt = get_akt_service()
-            model_status = "ready"
-        except:
-            model_status = "error"
-        
-        db.close()
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "model": model_status,
-            "skills_in_db": skills_count
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    """Liveness: antwortet ohne Datenbank- oder Modellzugriff."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: Modell und Katalog geladen, Datenbank erreichbar (gecachter Status)."""
+    # Im Threadpool: ist der Status abgelaufen, prüft get_readiness synchron per SELECT 1
+    readiness = await run_in_threadpool(system_status.get_readiness)
+    if readiness["status"] != "ready":
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
 
 # API Stats
 @app.get("/api/stats")
 async def get_system_stats():
-    from database.db_setup import SessionLocal
-    from database import crud
-    from sqlalchemy import func
-    
-    db = SessionLocal()
-    
-    stats = {
-        "skills": db.query(func.count(crud.models.Skill.id)).scalar(),
-        "problems": db.query(func.count(crud.models.Problem.id)).scalar(),
-        "students": db.query(func.count(crud.models.Student.id)).scalar(),
-        "teachers": db.query(func.count(crud.models.Teacher.id)).scalar(),
-        "classes": db.query(func.count(crud.models.Class.id)).scalar(),
-        "interactions": db.query(func.count(crud.models.Interaction.id)).scalar(),
-    }
-    
-    db.close()
-    
+    stats = system_status.get_cached_system_stats()
+    if stats is None:
+        stats = await run_in_threadpool(system_status.get_system_stats)
     return stats
 
 # Auth Routes (ungeschützt)
@@ -150,6 +168,13 @@ try:
 except ImportError as e:
     logger.error(f"Could not load import routes: {e}")
 
+# Debug Routes (nur Admins)
+try:
+    app.include_router(debug_routes.router, prefix="/api/debug", tags=["debug"])
+    logger.info("Debug routes loaded successfully")
+except ImportError as e:
+    logger.error(f"Could not load debug routes: {e}")
+
 # Error Handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -160,7 +185,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "status_code": exc.status_code,
             "path": str(request.url.path),
             "method": request.method
-        }
+        },
+        headers=exc.headers
     )
 
 @app.exception_handler(404)
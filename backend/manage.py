@@ -0,0 +1,241 @@
+"""
+Verwaltungs-CLI für das Backend.
+
+Beispiele:
+    python manage.py seed --csv /pfad/zu/assistments2017.csv
+    python manage.py seed --csv daten.csv --replace --demo
+    python manage.py rebuild-histories
+    python manage.py check-stats --fix
+    python manage.py migrate
+    python manage.py check-query-plans
+    python manage.py check-query-plans --live
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+def cmd_seed(args) -> int:
+    """Befüllt Skills und Problems per Bulk-Insert aus Mappings und Datensatz."""
+    from database.db_setup import SessionLocal, create_db_and_tables
+    from database import seed
+
+    timings = {}
+    total_start = time.perf_counter()
+
+    create_db_and_tables()
+
+    start = time.perf_counter()
+    mappings = seed.load_akt_mappings(args.mappings)
+    timings["load_mappings"] = time.perf_counter() - start
+    print(f"Mappings geladen: {len(mappings['skill_to_idx'])} Skills, {len(mappings['problem_to_idx'])} Problems")
+
+    start = time.perf_counter()
+    problem_skill_map = seed.load_problem_skill_map(args.csv)
+    timings["load_problem_skill_map"] = time.perf_counter() - start
+    print(f"Gefunden: {len(problem_skill_map)} Problem-Skill Zuordnungen")
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        try:
+            stats = seed.bulk_seed_catalog(
+                db,
+                mappings["skill_to_idx"],
+                mappings["problem_to_idx"],
+                problem_skill_map,
+                replace=args.replace
+            )
+        except ValueError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+        timings["bulk_insert"] = time.perf_counter() - start
+        print(f"✓ {stats['skills_created']} Skills, {stats['problems_created']} Problems erstellt, "
+              f"{stats['problems_skipped']} übersprungen")
+
+        if args.demo:
+            start = time.perf_counter()
+            demo_class = seed.create_demo_data(db)
+            timings["demo_data"] = time.perf_counter() - start
+            print("✓ Demo-Daten erstellt" if demo_class else "Demo-Daten bereits vorhanden")
+    finally:
+        db.close()
+
+    timings["total"] = time.perf_counter() - total_start
+
+    print("\nLaufzeiten:")
+    for phase, seconds in timings.items():
+        print(f"  {phase:<24} {seconds:8.3f}s")
+
+    if args.stats_file:
+        with open(args.stats_file, "w") as f:
+            json.dump({
+                "initialization_date": str(datetime.now()),
+                **stats,
+                "mappings_file": args.mappings,
+                "csv_file": args.csv,
+                "timings_seconds": {k: round(v, 4) for k, v in timings.items()}
+            }, f, indent=2)
+        print(f"\nStatistiken gespeichert in '{args.stats_file}'")
+
+    return 0
+
+def cmd_rebuild_histories(args) -> int:
+    """Baut die gepackten Schüler-Historien und Zähler aus der interactions Tabelle neu auf."""
+    from database.db_setup import SessionLocal, create_db_and_tables
+    from database import history
+
+    create_db_and_tables()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        written = history.rebuild_histories(db, args.student_id or None)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"✓ {written} Historien neu aufgebaut in {elapsed:.3f}s")
+    return 0
+
+def cmd_migrate(args) -> int:
+    """Legt fehlende Tabellen und Indizes in einer bestehenden Datenbank an."""
+    from database.db_setup import engine
+    from database.migrations import migrate
+
+    steps = migrate(engine)
+    if steps:
+        for step in steps:
+            print(f"✓ {step}")
+    else:
+        print("Schema ist aktuell")
+    return 0
+
+def cmd_rebuild_search_index(args) -> int:
+    """Befüllt den Volltext-Suchindex der Schüler neu (SQLite FTS5)."""
+    from database.db_setup import engine
+    from database.search import rebuild_search_index
+
+    try:
+        with engine.begin() as connection:
+            count = rebuild_search_index(connection)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    print(f"✓ {count} Schüler indexiert")
+    return 0
+
+def cmd_check_query_plans(args) -> int:
+    """
+    Prüft, dass die häufigsten Abfragen die erwarteten Indizes verwenden.
+
+    Standard: temporäre Datenbank mit Referenzdaten und ANALYZE (unabhängig vom
+    Datenbestand). --live prüft die konfigurierte Datenbank mit ihren vorhandenen
+    Statistiken.
+    """
+    from database.query_plans import check_query_plans, check_reference_query_plans
+
+    if args.live:
+        from database.db_setup import engine
+        from database.migrations import migrate
+
+        migrate(engine)
+        try:
+            results = check_query_plans(engine, analyze=False)
+        except ValueError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+    else:
+        results = check_reference_query_plans()
+
+    for result in results:
+        print(f"{'✓' if result.ok else '✗'} {result.name}")
+        if args.verbose or not result.ok:
+            for line in result.plan:
+                print(f"      {line}")
+        for problem in result.problems:
+            print(f"    - {problem}")
+        for warning in result.warnings:
+            print(f"    ! {warning}")
+
+    failed = sum(not result.ok for result in results)
+    print(f"\n{len(results) - failed}/{len(results)} Abfragen verwenden die erwarteten Indizes")
+    warned = sum(bool(result.warnings) for result in results)
+    if warned:
+        print(f"{warned} Abfrage(n) mit Warnungen: ohne Statistiken ist die Index-Wahl nicht aussagekräftig")
+    return 1 if failed else 0
+
+def cmd_check_stats(args) -> int:
+    """Vergleicht die Zähler in student_stats mit einer Neuberechnung aus interactions."""
+    from database.db_setup import SessionLocal, create_db_and_tables
+    from database.stats import check_student_stats
+
+    create_db_and_tables()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        mismatches = check_student_stats(db, fix=args.fix)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+
+    for mismatch in mismatches[:args.show]:
+        print(f"✗ Schüler {mismatch.student_id}: gespeichert {mismatch.stored}, erwartet {mismatch.expected}")
+    if len(mismatches) > args.show:
+        print(f"  ... und {len(mismatches) - args.show} weitere")
+
+    if not mismatches:
+        print(f"✓ Alle Zähler konsistent ({elapsed:.3f}s)")
+        return 0
+    if args.fix:
+        print(f"✓ {len(mismatches)} Zähler korrigiert ({elapsed:.3f}s)")
+        return 0
+    print(f"{len(mismatches)} abweichende Zähler (mit --fix korrigieren)")
+    return 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Verwaltungs-CLI für das Empfehlungssystem-Backend")
+    parser.add_argument("--database-url", help="Andere Datenbank als settings.database_url verwenden, z.B. sqlite:///:memory:")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = subparsers.add_parser("seed", help="Skills und Problems aus AKT Mappings und Datensatz anlegen")
+    seed_parser.add_argument("--csv", required=True, help="Pfad zum ASSISTments 2017 Datensatz (CSV)")
+    seed_parser.add_argument("--mappings", default="ml_models/akt_model_mappings.json", help="Pfad zur AKT Mappings-Datei")
+    seed_parser.add_argument("--replace", action="store_true", help="Vorhandene Skills/Problems ersetzen (nur solange keine Interaktionen gespeichert sind)")
+    seed_parser.add_argument("--demo", action="store_true", help="Demo-Lehrer, -Klasse und -Schüler anlegen")
+    seed_parser.add_argument("--stats-file", default="db_init_stats.json", help="Statistiken als JSON speichern (leer = aus)")
+    seed_parser.set_defaults(func=cmd_seed)
+
+    rebuild_parser = subparsers.add_parser("rebuild-histories", help="Gepackte Schüler-Historien aus den Interaktionen neu aufbauen")
+    rebuild_parser.add_argument("--student-id", type=int, action="append", help="Nur diesen Schüler (mehrfach möglich)")
+    rebuild_parser.set_defaults(func=cmd_rebuild_histories)
+
+    stats_parser = subparsers.add_parser("check-stats", help="Zähler in student_stats gegen interactions prüfen")
+    stats_parser.add_argument("--fix", action="store_true", help="Abweichende Zähler neu schreiben")
+    stats_parser.add_argument("--show", type=int, default=20, help="Maximal so viele Abweichungen ausgeben")
+    stats_parser.set_defaults(func=cmd_check_stats)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Fehlende Tabellen und Indizes anlegen")
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    search_parser = subparsers.add_parser("rebuild-search-index", help="Volltext-Suchindex der Schüler neu aufbauen (SQLite)")
+    search_parser.set_defaults(func=cmd_rebuild_search_index)
+
+    plans_parser = subparsers.add_parser("check-query-plans", help="Index-Nutzung der häufigsten Abfragen prüfen (SQLite)")
+    plans_parser.add_argument("-v", "--verbose", action="store_true", help="Alle Query-Pläne ausgeben")
+    plans_parser.add_argument("--live", action="store_true", help="Konfigurierte Datenbank statt Referenzdaten prüfen (ohne ANALYZE)")
+    plans_parser.set_defaults(func=cmd_check_query_plans)
+
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.database_url:
+        from database.db_setup import configure_engine
+        configure_engine(args.database_url)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -40,7 +40,10 @@ from .interaction_schemas import (
     InteractionBase,
     InteractionCreate,
     InteractionRead,
-    InteractionCSVRow
+    InteractionCSVRow,
+    InteractionBatchItem,
+    InteractionBatchCreate,
+    InteractionBatchResult
 )
 
 # Recommendation Schemas
@@ -64,6 +67,7 @@ __all__ = [
     'ProblemBase', 'ProblemCreate', 'ProblemRead',
     # Interaction
     'InteractionBase', 'InteractionCreate', 'InteractionRead', 'InteractionCSVRow',
+    'InteractionBatchItem', 'InteractionBatchCreate', 'InteractionBatchResult',
     # Recommendation
     'ConceptMasteryData', 'MasteryProfileResponse', 'DifficultyPrognosisData',
     'ConceptPrognosisResponse'
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 from datetime import datetime
 
 class InteractionBase(BaseModel):
@@ -23,4 +24,18 @@ class InteractionCSVRow(BaseModel):
     problem_original_id: str
     skill_original_id: str 
     is_correct: bool
-    timestamp: datetime 
\ No newline at end of file
+    timestamp: datetime
+
+# Batch-Ingestion (z.B. Übungs-Apps im Unterricht)
+class InteractionBatchItem(InteractionBase):
+    student_id: int
+
+class InteractionBatchCreate(BaseModel):
+    interactions: List[InteractionBatchItem] = Field(..., min_length=1, max_length=5000)
+
+class InteractionBatchResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[dict]
+    processing_time_seconds: float
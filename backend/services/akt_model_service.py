@@ -1,11 +1,22 @@
-import torch
 import numpy as np
 import json
-from typing import List, Dict, Tuple
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple
 from pathlib import Path
 import logging
 import sys
 from types import SimpleNamespace
+from services.catalog import MODEL_INDEX_OFFSET
+from database.history import StudentHistory
+from services.etag import file_fingerprint
+from services import metrics, profiling, timing
+
+# torch (mehrere Sekunden Importzeit) wird erst beim Laden des Modells importiert,
+# damit main, Worker und CLIs ohne Inferenz schnell starten
+if TYPE_CHECKING:
+    import torch
 
 class ConfigParams:
     """Dummy Klasse zum Laden des Modells."""
@@ -16,6 +27,22 @@ sys.modules['__main__'].ConfigParams = ConfigParams
 
 logger = logging.getLogger(__name__)
 
+# Parameter des Produktionsmodells (Fallback für fehlende Checkpoint-Parameter)
+DEFAULT_MODEL_PARAMS = {
+    'n_question': 102,
+    'n_pid': 3162,
+    'n_block': 1,
+    'd_model': 256,
+    'dropout': 0.1,
+    'kq_same': True,
+    'l2': 1e-5,
+    'final_fc_dim': 512,
+    'n_head': 8,
+    'd_ff': 1024,
+    'seqlen': 200,
+    'separate_qa': False
+}
+
 class AKTModelService:
     """
     Service für AKT Model Predictions.
@@ -32,6 +59,8 @@ class AKTModelService:
             model_path: Pfad zum trainierten AKT Model (.pth Datei)
             mappings_path: Pfad zur Mappings JSON Datei
         """
+        import torch
+        
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         logger.info(f"Using device: {self.device}")
         
@@ -41,7 +70,10 @@ class AKTModelService:
         # Lade Model
         self._load_model(model_path)
         
-        logger.info("AKT Model Service initialized successfully")
+        # Inhalts-Hash von Modell und Mappings (Bestandteil der ETags der Empfehlungen)
+        self.model_version = file_fingerprint(model_path, mappings_path)
+        
+        logger.info(f"AKT Model Service initialized successfully (version {self.model_version})")
     
     def _load_mappings(self, mappings_path: str):
         """Lädt die Skill/Problem Mappings."""
@@ -63,6 +95,7 @@ class AKTModelService:
         # Custom unpickler für ConfigParams handling
         import pickle
         import io
+        import torch
         
         class CustomUnpickler(pickle.Unpickler):
             def find_class(self, module, name):
@@ -98,40 +131,10 @@ class AKTModelService:
         for attr in required_attrs:
             if not hasattr(self.model_params, attr):
                 logger.warning(f"Missing attribute {attr}, using default value")
-                # Set defaults
-                defaults = {
-                    'n_question': 102,
-                    'n_pid': 3162,
-                    'n_block': 1,
-                    'd_model': 256,
-                    'dropout': 0.1,
-                    'kq_same': True,
-                    'l2': 1e-5,
-                    'final_fc_dim': 512,
-                    'n_head': 8,
-                    'd_ff': 1024,
-                    'seqlen': 200,
-                    'separate_qa': False
-                }
-                setattr(self.model_params, attr, defaults.get(attr, None))
+                setattr(self.model_params, attr, DEFAULT_MODEL_PARAMS.get(attr, None))
         
         # Initialisiere Model
-        from models.akt import AKT
-        
-        self.model = AKT(
-            n_question=self.model_params.n_question,
-            n_pid=self.model_params.n_pid,
-            n_blocks=self.model_params.n_block,
-            d_model=self.model_params.d_model,
-            dropout=self.model_params.dropout,
-            kq_same=self.model_params.kq_same,
-            model_type='akt',
-            l2=self.model_params.l2,
-            final_fc_dim=self.model_params.final_fc_dim,
-            n_heads=self.model_params.n_head,
-            d_ff=self.model_params.d_ff,
-            separate_qa=getattr(self.model_params, 'separate_qa', False)
-        ).to(self.device)
+        self.model = build_akt_model(self.model_params, self.device)
         
         # Lade Model Weights
         self.model.load_state_dict(checkpoint['model_state_dict'])
@@ -140,20 +143,59 @@ class AKTModelService:
         logger.info(f"Model loaded from {model_path}")
         logger.info(f"Model expects: {self.model_params.n_question} skills, {self.model_params.n_pid} problems")
     
+    @classmethod
+    def from_model(cls, model, model_params, model_version: str = "in-memory") -> "AKTModelService":
+        """
+        Service um ein bereits gebautes Modell (ohne Checkpoint und Mappings-Datei).
+        
+        Für Benchmarks mit zufällig initialisiertem Modell, siehe
+        benchmarks/bench_akt_inference.py. Die Mappings sind leer, verify_catalog
+        ist damit nicht aussagekräftig.
+        """
+        service = cls.__new__(cls)
+        service.device = next(model.parameters()).device
+        service.model = model.eval()
+        service.model_params = model_params
+        service.model_version = model_version
+        service.mappings = {}
+        service.skill_to_idx, service.problem_to_idx = {}, {}
+        service.idx_to_skill, service.idx_to_problem = {}, {}
+        return service
+    
+    def verify_catalog(self, catalog) -> int:
+        """
+        Prüft, ob die internal_idx des Katalogs zu den Modell-Mappings passen.
+        
+        Returns:
+            Anzahl der Skills/Problems mit abweichendem Index
+        """
+        mismatches = 0
+        for original_id, internal_idx in zip(catalog.skill_original_ids, catalog.skill_internal_idx):
+            if self.skill_to_idx.get(original_id) != int(internal_idx) + MODEL_INDEX_OFFSET:
+                mismatches += 1
+        for original_id, internal_idx in zip(catalog.problem_original_ids, catalog.problem_internal_idx):
+            if self.problem_to_idx.get(original_id) != int(internal_idx) + MODEL_INDEX_OFFSET:
+                mismatches += 1
+        
+        if mismatches:
+            logger.warning(f"Catalog does not match model mappings: {mismatches} mismatched skills/problems")
+        else:
+            logger.info("Catalog matches model mappings")
+        return mismatches
+    
     def predict_next_correct_probability(
         self, 
-        interaction_history: List[Dict[str, any]], 
-        next_problem_id: str,
-        next_skill_id: str
+        interaction_history: StudentHistory, 
+        next_problem_idx: int,
+        next_skill_idx: int
     ) -> float:
         """
         Vorhersage der Wahrscheinlichkeit, dass die nächste Antwort korrekt ist.
         
         Args:
-            interaction_history: Liste von Interaktionen 
-                [{"problem_id": "123", "skill_id": "addition", "correct": 1}, ...]
-            next_problem_id: Problem ID der nächsten Frage
-            next_skill_id: Skill ID der nächsten Frage
+            interaction_history: Historie als Index-Arrays (database.history.load_student_history)
+            next_problem_idx: internal_idx des Problems der nächsten Frage
+            next_skill_idx: internal_idx des Skills der nächsten Frage
             
         Returns:
             Wahrscheinlichkeit (0-1) für korrekte Antwort
@@ -162,11 +204,13 @@ class AKTModelService:
         # Konvertiere History zu Model Input
         q_seq, qa_seq, pid_seq = self._prepare_sequences(
             interaction_history, 
-            next_problem_id, 
-            next_skill_id
+            next_problem_idx, 
+            next_skill_idx
         )
         
         # Model Inference
+        import torch
+        
         with torch.no_grad():
             output = self._run_inference(q_seq, qa_seq, pid_seq)
         
@@ -208,23 +252,20 @@ class AKTModelService:
     
     def get_skill_mastery(
         self,
-        interaction_history: List[Dict[str, any]],
-        target_skill_id: str
+        interaction_history: StudentHistory,
+        target_skill_idx: int
     ) -> Dict[str, float]:
         """
-        Berechnet Mastery Score für einen spezifischen Skill.
+        Berechnet Mastery Score für einen spezifischen Skill (internal_idx).
         
         Returns:
             Dict mit mastery_score, confidence und details
         """
         
         # Filtere Interaktionen für den Ziel-Skill
-        skill_interactions = [
-            i for i in interaction_history 
-            if i["skill_id"] == target_skill_id
-        ]
+        skill_mask = interaction_history.skill_idx == target_skill_idx
         
-        if not skill_interactions:
+        if not skill_mask.any():
             return {
                 "mastery_score": 0.5,
                 "confidence": "low",
@@ -233,25 +274,25 @@ class AKTModelService:
             }
         
         # Berechne einfache Statistiken
-        correct_count = sum(1 for i in skill_interactions if i["correct"])
-        total_count = len(skill_interactions)
+        correct_count = int(interaction_history.correct[skill_mask].sum())
+        total_count = int(skill_mask.sum())
         simple_accuracy = correct_count / total_count if total_count > 0 else 0.5
         
         # Wenn genug Daten vorhanden, nutze AKT Predictions
         if len(interaction_history) >= 5:
             # Finde ein typisches Problem für diesen Skill
-            skill_problems = [i["problem_id"] for i in skill_interactions]
-            if skill_problems:
-                # Verwende das häufigste Problem
-                from collections import Counter
-                most_common_problem = Counter(skill_problems).most_common(1)[0][0]
+            skill_problems = interaction_history.problem_idx[skill_mask]
+            if len(skill_problems):
+                # Verwende das häufigste Problem (bei Gleichstand das zuerst bearbeitete)
+                problems, first_seen, counts = np.unique(skill_problems, return_index=True, return_counts=True)
+                most_common_problem = int(problems[np.lexsort((first_seen, -counts))[0]])
                 
                 # Vorhersage für dieses Problem
                 try:
                     predicted_prob = self.predict_next_correct_probability(
                         interaction_history,
-                        next_problem_id=most_common_problem,
-                        next_skill_id=target_skill_id
+                        next_problem_idx=most_common_problem,
+                        next_skill_idx=target_skill_idx
                     )
                     
                     mastery_score = predicted_prob 
@@ -266,7 +307,7 @@ class AKTModelService:
                         "prediction_based": True
                     }
                 except Exception as e:
-                    logger.warning(f"Prediction failed for skill {target_skill_id}: {e}")
+                    logger.warning(f"Prediction failed for skill {target_skill_idx}: {e}")
         
         # Fallback auf einfache Statistiken
         return {
@@ -280,9 +321,9 @@ class AKTModelService:
     
     def get_problem_difficulty_for_student(
         self,
-        interaction_history: List[Dict[str, any]],
-        problem_id: str,
-        skill_id: str
+        interaction_history: StudentHistory,
+        problem_idx: int,
+        skill_idx: int
     ) -> Dict[str, any]:
         """
         Schätzt die Schwierigkeit eines Problems für einen spezifischen Schüler.
@@ -297,8 +338,8 @@ class AKTModelService:
         # Vorhersage
         success_prob = self.predict_next_correct_probability(
             interaction_history,
-            next_problem_id=problem_id,
-            next_skill_id=skill_id
+            next_problem_idx=problem_idx,
+            next_skill_idx=skill_idx
         )
         
         # Kategorisierung
@@ -319,76 +360,80 @@ class AKTModelService:
             "confidence": "model_based"
         }
     
+    @timing.timed("prepare")
     def _prepare_sequences(
         self, 
-        interaction_history: List[Dict],
-        next_problem_id: str,
-        next_skill_id: str
+        interaction_history: StudentHistory,
+        next_problem_idx: int,
+        next_skill_idx: int
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Konvertiert Interaction History zu Model Input Sequences.
+        
+        Die internal_idx aus der Historie werden vektorisiert per Offset in
+        Modell-Indizes übersetzt (keine String-Lookups, keine Python-Schleife).
         """
+        n_question = self.model_params.n_question
+        seqlen = self.model_params.seqlen
         
-        # Listen für die Sequenzen
-        q_list = []  # Skill indices
-        qa_list = []  # Skill + correct * n_skills  
-        pid_list = []  # Problem indices
+        # Nur die letzten seqlen Interaktionen können ins Modell
+        q = interaction_history.skill_idx[-seqlen:] + MODEL_INDEX_OFFSET  # Skill indices
+        pid = interaction_history.problem_idx[-seqlen:] + MODEL_INDEX_OFFSET  # Problem indices
+        correct = interaction_history.correct[-seqlen:]
         
-        # Verarbeite History
-        for interaction in interaction_history:
-            skill_idx = self.skill_to_idx.get(interaction["skill_id"])
-            problem_idx = self.problem_to_idx.get(str(interaction["problem_id"]))
-            
-            if skill_idx is None or problem_idx is None:
-                logger.warning(f"Skipping unknown skill/problem: {interaction}")
-                continue
-            
-            q_list.append(skill_idx)
-            # qa encoding: skill_idx + correct * n_skills
-            qa_idx = skill_idx + interaction["correct"] * self.model_params.n_question
-            qa_list.append(qa_idx)
-            pid_list.append(problem_idx)
+        valid = (q >= 1) & (q <= n_question) & (pid >= 1) & (pid <= self.model_params.n_pid)
+        if not valid.all():
+            logger.warning(f"Skipping {int((~valid).sum())} unknown skill/problem entries")
+            # Ungültige Einträge entfernen und mit älterer Historie auffüllen
+            q = interaction_history.skill_idx + MODEL_INDEX_OFFSET
+            pid = interaction_history.problem_idx + MODEL_INDEX_OFFSET
+            valid = (q >= 1) & (q <= n_question) & (pid >= 1) & (pid <= self.model_params.n_pid)
+            q, pid, correct = q[valid][-seqlen:], pid[valid][-seqlen:], interaction_history.correct[valid][-seqlen:]
         
-        # Füge nächste Frage hinzu
-        next_skill_idx = self.skill_to_idx.get(next_skill_id)
-        next_problem_idx = self.problem_to_idx.get(str(next_problem_id))
+        # qa encoding: skill_idx + correct * n_skills
+        qa = q + correct * n_question
         
-        if next_skill_idx is not None and next_problem_idx is not None:
-            q_list.append(next_skill_idx)
-            qa_list.append(next_skill_idx)  # Ohne Antwort (als ob correct=0)
-            pid_list.append(next_problem_idx)
+        # Füge nächste Frage hinzu
+        next_q = self._to_model_skill_idx(next_skill_idx)
+        next_pid = self._to_model_problem_idx(next_problem_idx)
+        
+        if next_q is not None and next_pid is not None:
+            # Ohne Antwort (als ob correct=0)
+            q = np.append(q, next_q)
+            qa = np.append(qa, next_q)
+            pid = np.append(pid, next_pid)
         else:
-            logger.warning(f"Next skill/problem not found: skill={next_skill_id}, problem={next_problem_id}")
+            logger.warning(f"Next skill/problem not found: skill={next_skill_idx}, problem={next_problem_idx}")
             # Wenn die nächste Frage nicht gefunden wird, verwende Dummy-Werte
-            if not q_list:  # Wenn auch keine History, füge mindestens einen Eintrag hinzu
-                q_list.append(1)
-                qa_list.append(1)
-                pid_list.append(1)
-        
-        # Handle sequence length
-        seqlen = self.model_params.seqlen
-        
-        if len(q_list) > seqlen:
-            # Nimm die letzten seqlen Interaktionen
-            q_list = q_list[-seqlen:]
-            qa_list = qa_list[-seqlen:]
-            pid_list = pid_list[-seqlen:]
-        elif len(q_list) < seqlen:
-            # Padding vorne (nicht hinten!)
-            pad_len = seqlen - len(q_list)
-            q_list = [0] * pad_len + q_list
-            qa_list = [0] * pad_len + qa_list
-            pid_list = [0] * pad_len + pid_list
-        
-        # Konvertiere zu numpy arrays
-        q_seq = np.array([q_list], dtype=np.int64)
-        qa_seq = np.array([qa_list], dtype=np.int64)
-        pid_seq = np.array([pid_list], dtype=np.int64)
+            if len(q) == 0:  # Wenn auch keine History, füge mindestens einen Eintrag hinzu
+                q = qa = pid = np.ones(1, dtype=np.int64)
+        
+        # Nimm die letzten seqlen Positionen, Padding vorne (nicht hinten!)
+        q_seq = np.zeros((1, seqlen), dtype=np.int64)
+        qa_seq = np.zeros((1, seqlen), dtype=np.int64)
+        pid_seq = np.zeros((1, seqlen), dtype=np.int64)
+        length = min(len(q), seqlen)
+        if length:
+            q_seq[0, -length:] = q[-length:]
+            qa_seq[0, -length:] = qa[-length:]
+            pid_seq[0, -length:] = pid[-length:]
         
         return q_seq, qa_seq, pid_seq
     
-    def _run_inference(self, q_seq, qa_seq, pid_seq) -> torch.Tensor:
+    def _to_model_skill_idx(self, skill_internal_idx: int):
+        """Katalog internal_idx -> Modell-Index (None wenn außerhalb des Modells)."""
+        model_idx = int(skill_internal_idx) + MODEL_INDEX_OFFSET
+        return model_idx if 1 <= model_idx <= self.model_params.n_question else None
+    
+    def _to_model_problem_idx(self, problem_internal_idx: int):
+        """Katalog internal_idx -> Modell-Index (None wenn außerhalb des Modells)."""
+        model_idx = int(problem_internal_idx) + MODEL_INDEX_OFFSET
+        return model_idx if 1 <= model_idx <= self.model_params.n_pid else None
+    
+    @timing.timed("forward")
+    def _run_inference(self, q_seq, qa_seq, pid_seq) -> "torch.Tensor":
         """Führt Model Inference aus."""
+        import torch
         
         # Konvertiere zu Tensors
         q_tensor = torch.from_numpy(q_seq).long().to(self.device)
@@ -398,8 +443,11 @@ class AKTModelService:
         # Target tensor (wird nicht wirklich für Inference gebraucht)
         target_tensor = torch.ones_like(q_tensor, dtype=torch.float)
         
-        # Model Forward Pass
-        _, predictions, _ = self.model(q_tensor, qa_tensor, target_tensor, pid_tensor)
+        metrics.record_forward(q_seq)
+        
+        # Model Forward Pass (auf Anforderung mit Torch-Profiler, siehe services/profiling.py)
+        with profiling.inference_profile(q_seq.shape[0]):
+            _, predictions, _ = self.model(q_tensor, qa_tensor, target_tensor, pid_tensor)
         
         # predictions shape: (batch_size * seqlen,)
         # Reshape zu (seqlen,) da batch_size=1
@@ -416,20 +464,163 @@ class AKTModelService:
         else:
             return "low"
 
+def build_akt_model(model_params, device=None):
+    """
+    Baut ein AKT-Modell mit der Architektur aus den Checkpoint-Parametern
+    (n_question, n_pid, n_block, d_model, ...). Die Gewichte sind zufällig initialisiert.
+    """
+    from models.akt import AKT
+    
+    model = AKT(
+        n_question=model_params.n_question,
+        n_pid=model_params.n_pid,
+        n_blocks=model_params.n_block,
+        d_model=model_params.d_model,
+        dropout=model_params.dropout,
+        kq_same=model_params.kq_same,
+        model_type='akt',
+        l2=model_params.l2,
+        final_fc_dim=model_params.final_fc_dim,
+        n_heads=model_params.n_head,
+        d_ff=model_params.d_ff,
+        separate_qa=getattr(model_params, 'separate_qa', False)
+    )
+    return model.to(device) if device is not None else model
+
 # Singleton Instance
+#
+# Das Modell wird im Hintergrund geladen (start_background_loading), damit die
+# API sofort Requests annimmt. Zustände: not_started -> loading -> ready | failed.
+# Ein fehlgeschlagenes Laden wird frühestens nach akt_model_retry_seconds
+# erneut versucht, nicht bei jedem Request.
 _akt_service_instance = None
 
-def get_akt_service() -> AKTModelService:
-    """
-    Factory Function für AKT Service (Singleton Pattern).
-    """
+MODEL_NOT_STARTED = "not_started"
+MODEL_LOADING = "loading"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
+
+# Retry-After (Sekunden) für Requests während des Ladens
+DEFAULT_LOADING_RETRY_AFTER_SECONDS = 5
+# Frühester erneuter Ladeversuch nach einem Fehler
+DEFAULT_RETRY_SECONDS = 60.0
+
+_load_lock = threading.Lock()
+# Gesetzt, sobald der laufende Ladevorgang beendet ist (erfolgreich oder nicht)
+_load_finished = threading.Event()
+_load_state = {"state": MODEL_NOT_STARTED, "error": None, "started_at": None, "finished_at": None}
+
+class ModelNotReadyError(Exception):
+    """Das Modell ist (noch) nicht geladen; retry_after in Sekunden."""
+
+    def __init__(self, state: str, retry_after: int, error: Optional[str] = None):
+        self.state = state
+        self.retry_after = retry_after
+        self.error = error
+        super().__init__(f"AKT Model ist nicht bereit ({state})" + (f": {error}" if error else ""))
+
+def _retry_seconds() -> float:
+    from config import settings
+    return float(getattr(settings, "akt_model_retry_seconds", None) or DEFAULT_RETRY_SECONDS)
+
+def _load(on_ready: Optional[Callable[["AKTModelService"], None]]) -> None:
     global _akt_service_instance
-    
-    if _akt_service_instance is None:
-        from config import settings
-        _akt_service_instance = AKTModelService(
+    from config import settings
+    try:
+        service = AKTModelService(
             model_path=settings.akt_model_path,
             mappings_path=settings.akt_mappings_path
         )
-    
-    return _akt_service_instance
+    except Exception as e:
+        logger.error(f"❌ Failed to load AKT Model Service: {e}")
+        with _load_lock:
+            _load_state.update(state=MODEL_FAILED, error=str(e), finished_at=time.monotonic())
+        _load_finished.set()
+        return
+
+    with _load_lock:
+        _akt_service_instance = service
+        _load_state.update(state=MODEL_READY, error=None, finished_at=time.monotonic())
+    _load_finished.set()
+    logger.info(f"✅ AKT Model Service loaded in {_load_state['finished_at'] - _load_state['started_at']:.1f}s")
+
+    if on_ready is not None:
+        try:
+            on_ready(service)
+        except Exception as e:
+            logger.error(f"AKT Model geladen, Nachbereitung fehlgeschlagen: {e}")
+
+def start_background_loading(on_ready: Optional[Callable[["AKTModelService"], None]] = None) -> bool:
+    """
+    Startet das Laden in einem Daemon-Thread, falls es nicht schon läuft oder fertig ist.
+
+    Nach einem Fehler wird erst nach akt_model_retry_seconds neu gestartet.
+    on_ready wird nach erfolgreichem Laden im Lade-Thread aufgerufen.
+
+    Returns:
+        True, wenn ein Ladevorgang gestartet wurde
+    """
+    with _load_lock:
+        state = _load_state["state"]
+        if _akt_service_instance is not None or state == MODEL_LOADING:
+            return False
+        if state == MODEL_FAILED and time.monotonic() - _load_state["finished_at"] < _retry_seconds():
+            return False
+        _load_state.update(state=MODEL_LOADING, error=None, started_at=time.monotonic(), finished_at=None)
+        _load_finished.clear()
+
+    logger.info("Loading AKT Model Service in background...")
+    threading.Thread(target=_load, args=(on_ready,), name="akt-model-loader", daemon=True).start()
+    return True
+
+def wait_until_loaded(timeout: Optional[float] = None) -> bool:
+    """
+    Wartet auf das Ende des laufenden Ladevorgangs (für Skripte und synchronen Start).
+
+    Returns:
+        Ob das Modell geladen ist
+    """
+    if _akt_service_instance is None and get_model_status()["state"] == MODEL_LOADING:
+        _load_finished.wait(timeout)
+    return _akt_service_instance is not None
+
+def get_akt_service() -> AKTModelService:
+    """
+    Gibt den geladenen AKT Service zurück (Singleton).
+
+    Blockiert nie: ist das Modell noch nicht geladen, wird das Laden im
+    Hintergrund angestoßen (bzw. nach einem Fehler erneut versucht) und
+    ModelNotReadyError ausgelöst.
+
+    Raises:
+        ModelNotReadyError: Modell lädt noch oder konnte nicht geladen werden
+    """
+    instance = _akt_service_instance
+    if instance is not None:
+        return instance
+
+    start_background_loading()
+    with _load_lock:
+        state, error, finished_at = _load_state["state"], _load_state["error"], _load_state["finished_at"]
+    if state == MODEL_FAILED:
+        retry_after = _retry_seconds() - (time.monotonic() - finished_at)
+        raise ModelNotReadyError(state, max(1, math.ceil(retry_after)), error)
+    from config import settings
+    retry_after = int(getattr(settings, "akt_model_loading_retry_after", None) or DEFAULT_LOADING_RETRY_AFTER_SECONDS)
+    raise ModelNotReadyError(state, retry_after)
+
+def get_model_status() -> Dict[str, Optional[str]]:
+    """Zustand des Modells (not_started, loading, ready, failed) und ggf. Fehler."""
+    if _akt_service_instance is not None:
+        return {"state": MODEL_READY, "error": None}
+    with _load_lock:
+        return {"state": _load_state["state"], "error": _load_state["error"]}
+
+def get_loaded_model_version() -> Optional[str]:
+    """Version des geladenen Modells oder None, falls es noch nicht geladen ist."""
+    instance = _akt_service_instance
+    return instance.model_version if instance is not None else None
+
+def is_akt_service_loaded() -> bool:
+    """Ob das Modell bereits geladen ist (ohne es zu laden)."""
+    return _akt_service_instance is not None
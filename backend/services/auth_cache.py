@@ -0,0 +1,87 @@
+"""
+Caches für den Authentifizierungs-Pfad (siehe api/auth_dependencies.py).
+
+- Tokens: dekodierter Payload je Token, gültig bis zum exp des Tokens
+- Teachers: Snapshot der Teacher-Zeile, höchstens auth_cache_ttl_seconds alt
+- Klassen-Besitz: (teacher_id, class_id) Paare, die bereits geprüft wurden
+
+Alle Einträge laufen spätestens mit dem Token ab, über den sie geprüft wurden.
+Abgelehnte Tokens und fehlgeschlagene Prüfungen werden nicht gecacht.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+from config import settings
+from database import models
+from services.auth_service import auth_service
+from services.cache import TTLCache
+
+# Einträge je Cache
+DEFAULT_AUTH_CACHE_SIZE = 4096
+# Höchstalter eines Teacher-Snapshots bzw. einer Besitz-Prüfung
+DEFAULT_AUTH_CACHE_TTL_SECONDS = 300.0
+
+_cache_size = int(getattr(settings, "auth_cache_size", None) or DEFAULT_AUTH_CACHE_SIZE)
+_cache_ttl = float(getattr(settings, "auth_cache_ttl_seconds", None) or DEFAULT_AUTH_CACHE_TTL_SECONDS)
+
+class TeacherSnapshot(NamedTuple):
+    id: int
+    username: str
+    hashed_password: str
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_teacher(cls, teacher: models.Teacher) -> "TeacherSnapshot":
+        return cls(teacher.id, teacher.username, teacher.hashed_password, teacher.created_at)
+
+    def to_teacher(self) -> models.Teacher:
+        """Neues, an keine Session gebundenes Teacher-Objekt (nur Spalten, keine Relationen)."""
+        return models.Teacher(**self._asdict())
+
+_tokens: TTLCache[dict] = TTLCache(maxsize=_cache_size, ttl_seconds=_cache_ttl, name="auth_tokens")
+_teachers: TTLCache[TeacherSnapshot] = TTLCache(maxsize=_cache_size, ttl_seconds=_cache_ttl, name="auth_teachers")
+_class_owners: TTLCache[bool] = TTLCache(maxsize=_cache_size, ttl_seconds=_cache_ttl, name="auth_class_owners")
+
+def verify_token(token: str) -> Optional[dict]:
+    """Wie auth_service.verify_token, aber gültige Tokens werden bis zu ihrem exp gecacht."""
+    payload = _tokens.get(token)
+    if payload is not None:
+        return payload
+    payload = auth_service.verify_token(token)
+    if payload is not None and payload.get("exp") is not None:
+        _tokens.set(token, payload, expires_at=float(payload["exp"]))
+    return payload
+
+def get_teacher(teacher_id: int) -> Optional[TeacherSnapshot]:
+    return _teachers.get(teacher_id)
+
+def remember_teacher(teacher: models.Teacher, expires_at: Optional[float] = None) -> TeacherSnapshot:
+    snapshot = TeacherSnapshot.from_teacher(teacher)
+    _teachers.set(teacher.id, snapshot, expires_at=expires_at)
+    return snapshot
+
+def is_class_owner(teacher_id: int, class_id: int) -> bool:
+    return _class_owners.get((teacher_id, class_id), False)
+
+def remember_class_owner(teacher_id: int, class_id: int, expires_at: Optional[float] = None) -> None:
+    _class_owners.set((teacher_id, class_id), True, expires_at=expires_at)
+
+def forget_teacher(teacher_id: int) -> None:
+    """Verwirft Snapshot und Besitz-Prüfungen eines Teachers (z.B. nach Passwortänderung)."""
+    _teachers.pop(teacher_id)
+    _class_owners.discard_where(lambda key: key[0] == teacher_id)
+
+def forget_class(class_id: int) -> None:
+    """Verwirft die Besitz-Prüfungen einer Klasse (z.B. nach dem Löschen)."""
+    _class_owners.discard_where(lambda key: key[1] == class_id)
+
+def clear() -> None:
+    _tokens.clear()
+    _teachers.clear()
+    _class_owners.clear()
+
+def info() -> dict:
+    return {
+        "tokens": _tokens.info(),
+        "teachers": _teachers.info(),
+        "class_owners": _class_owners.info()
+    }
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 from config import settings
 import logging
 
@@ -74,5 +75,15 @@ class AuthService:
         """Erstellt einen Passwort Hash."""
         return pwd_context.hash(password)
 
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Wie verify_password, aber bcrypt läuft im Thread Pool statt im Event Loop."""
+        return await run_in_threadpool(pwd_context.verify, plain_password, hashed_password)
+
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Wie get_password_hash, aber bcrypt läuft im Thread Pool statt im Event Loop."""
+        return await run_in_threadpool(pwd_context.hash, password)
+
 # Singleton Instance
 auth_service = AuthService()
\ No newline at end of file
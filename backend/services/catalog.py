@@ -0,0 +1,288 @@
+import threading
+import time
+import logging
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import models
+
+logger = logging.getLogger(__name__)
+
+# Modell-Indizes aus dem Training starten bei 1, internal_idx in der DB bei 0
+# (siehe database/seed.py)
+MODEL_INDEX_OFFSET = 1
+
+# Wie oft (Sekunden) geprüft wird, ob sich der Seed in der DB geändert hat
+CHECK_INTERVAL_SECONDS = 30.0
+
+class SkillEntry(NamedTuple):
+    id: int
+    internal_idx: int
+    original_skill_id: str
+    name: str
+
+class ProblemEntry(NamedTuple):
+    id: int
+    internal_idx: int
+    original_problem_id: str
+    skill_id: int
+    description_placeholder: Optional[str]
+    difficulty_mu_q: Optional[float]
+
+def _dense_index(keys: np.ndarray) -> np.ndarray:
+    """Baut ein dichtes Array key -> Position (-1 = unbekannt) für kleine Integer-Keys."""
+    size = int(keys.max()) + 1 if len(keys) else 0
+    index = np.full(size, -1, dtype=np.int64)
+    # Bei doppelten Keys gewinnt das erste Vorkommen
+    index[keys[::-1]] = np.arange(len(keys) - 1, -1, -1, dtype=np.int64)
+    return index
+
+def _lookup(index: np.ndarray, key: int) -> int:
+    if 0 <= key < len(index):
+        return int(index[key])
+    return -1
+
+def _lookup_many(index: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    keys = np.asarray(keys, dtype=np.int64)
+    positions = np.full(keys.shape, -1, dtype=np.int64)
+    in_range = (keys >= 0) & (keys < len(index))
+    positions[in_range] = index[keys[in_range]]
+    return positions
+
+class Catalog:
+    """
+    Unveränderlicher In-Memory Katalog aller Skills und Problems.
+
+    Hält array-basierte Zuordnungen id <-> original_id <-> internal_idx <-> skill,
+    damit Routes und Model Service keine Einzelabfragen pro Problem/Skill brauchen.
+    """
+
+    def __init__(self, skill_rows: Sequence[Tuple], problem_rows: Sequence[Tuple], fingerprint: Tuple):
+        """
+        Args:
+            skill_rows: (id, internal_idx, original_skill_id, name), sortiert nach id
+            problem_rows: (id, internal_idx, original_problem_id, skill_id,
+                description_placeholder, difficulty_mu_q), sortiert nach id
+            fingerprint: Kennung des Seeds, aus dem der Katalog geladen wurde
+        """
+        self.fingerprint = fingerprint
+
+        # Skills
+        self.skill_ids = np.array([r[0] for r in skill_rows], dtype=np.int64)
+        self.skill_internal_idx = np.array([r[1] for r in skill_rows], dtype=np.int64)
+        self.skill_original_ids = tuple(r[2] for r in skill_rows)
+        self.skill_names = tuple(r[3] for r in skill_rows)
+
+        # Problems
+        self.problem_ids = np.array([r[0] for r in problem_rows], dtype=np.int64)
+        self.problem_internal_idx = np.array([r[1] for r in problem_rows], dtype=np.int64)
+        self.problem_original_ids = tuple(r[2] for r in problem_rows)
+        self.problem_skill_ids = np.array([r[3] for r in problem_rows], dtype=np.int64)
+        self.problem_descriptions = tuple(r[4] for r in problem_rows)
+        self.problem_mu_q = tuple(r[5] for r in problem_rows)
+
+        # Lookups
+        self._skill_pos_by_id = _dense_index(self.skill_ids)
+        self._skill_pos_by_internal_idx = _dense_index(self.skill_internal_idx)
+        self._problem_pos_by_id = _dense_index(self.problem_ids)
+        self._problem_pos_by_internal_idx = _dense_index(self.problem_internal_idx)
+        self._skill_pos_by_original: Dict[str, int] = {}
+        for pos, original_id in enumerate(self.skill_original_ids):
+            self._skill_pos_by_original.setdefault(original_id, pos)
+        self._problem_pos_by_original = {original_id: pos for pos, original_id in enumerate(self.problem_original_ids)}
+
+        # Skill-Position und Skill internal_idx jedes Problems
+        self.problem_skill_pos = _lookup_many(self._skill_pos_by_id, self.problem_skill_ids)
+        self.problem_skill_internal_idx = np.where(
+            self.problem_skill_pos >= 0,
+            self.skill_internal_idx[np.clip(self.problem_skill_pos, 0, None)] if len(self.skill_ids) else -1,
+            -1
+        )
+
+        # Problems pro Skill (CSR: Reihenfolge + Offsets, innerhalb eines Skills nach id sortiert)
+        known = self.problem_skill_pos >= 0
+        self._problems_by_skill = np.nonzero(known)[0][np.argsort(self.problem_skill_pos[known], kind="stable")]
+        counts = np.bincount(self.problem_skill_pos[known], minlength=len(self.skill_ids))
+        self._problems_by_skill_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        for array in (
+            self.skill_ids, self.skill_internal_idx, self.problem_ids, self.problem_internal_idx,
+            self.problem_skill_ids, self.problem_skill_pos, self.problem_skill_internal_idx,
+            self._skill_pos_by_id, self._skill_pos_by_internal_idx, self._problem_pos_by_id,
+            self._problem_pos_by_internal_idx, self._problems_by_skill, self._problems_by_skill_offsets
+        ):
+            array.setflags(write=False)
+
+    @property
+    def skill_count(self) -> int:
+        return len(self.skill_ids)
+
+    @property
+    def problem_count(self) -> int:
+        return len(self.problem_ids)
+
+    # Einzel-Lookups
+    def _skill_entry(self, pos: int) -> Optional[SkillEntry]:
+        if pos < 0:
+            return None
+        return SkillEntry(
+            int(self.skill_ids[pos]),
+            int(self.skill_internal_idx[pos]),
+            self.skill_original_ids[pos],
+            self.skill_names[pos]
+        )
+
+    def _problem_entry(self, pos: int) -> Optional[ProblemEntry]:
+        if pos < 0:
+            return None
+        return ProblemEntry(
+            int(self.problem_ids[pos]),
+            int(self.problem_internal_idx[pos]),
+            self.problem_original_ids[pos],
+            int(self.problem_skill_ids[pos]),
+            self.problem_descriptions[pos],
+            self.problem_mu_q[pos]
+        )
+
+    def skill(self, skill_id: int) -> Optional[SkillEntry]:
+        return self._skill_entry(_lookup(self._skill_pos_by_id, skill_id))
+
+    def skill_by_internal_idx(self, internal_idx: int) -> Optional[SkillEntry]:
+        return self._skill_entry(_lookup(self._skill_pos_by_internal_idx, internal_idx))
+
+    def skill_by_original_id(self, original_skill_id: str) -> Optional[SkillEntry]:
+        return self._skill_entry(self._skill_pos_by_original.get(original_skill_id, -1))
+
+    def problem(self, problem_id: int) -> Optional[ProblemEntry]:
+        return self._problem_entry(_lookup(self._problem_pos_by_id, problem_id))
+
+    def problem_by_internal_idx(self, internal_idx: int) -> Optional[ProblemEntry]:
+        return self._problem_entry(_lookup(self._problem_pos_by_internal_idx, internal_idx))
+
+    def problem_by_original_id(self, original_problem_id: str) -> Optional[ProblemEntry]:
+        return self._problem_entry(self._problem_pos_by_original.get(original_problem_id, -1))
+
+    def problems_for_skill(self, skill_id: int, limit: Optional[int] = None) -> List[ProblemEntry]:
+        """Alle Problems eines Skills (nach id sortiert, wie crud.get_problems_by_skill_id)."""
+        pos = _lookup(self._skill_pos_by_id, skill_id)
+        if pos < 0:
+            return []
+        start, end = self._problems_by_skill_offsets[pos], self._problems_by_skill_offsets[pos + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._problem_entry(int(p)) for p in self._problems_by_skill[start:end]]
+
+    # Vektorisierte Lookups
+    def problem_internal_idx_for_ids(self, problem_ids: np.ndarray) -> np.ndarray:
+        """Problem DB-IDs -> internal_idx (-1 = unbekannt)."""
+        positions = _lookup_many(self._problem_pos_by_id, problem_ids)
+        return np.where(positions >= 0, self.problem_internal_idx[np.clip(positions, 0, None)], -1) \
+            if self.problem_count else np.full(positions.shape, -1, dtype=np.int64)
+
+    def skill_internal_idx_for_ids(self, skill_ids: np.ndarray) -> np.ndarray:
+        """Skill DB-IDs -> internal_idx (-1 = unbekannt)."""
+        positions = _lookup_many(self._skill_pos_by_id, skill_ids)
+        return np.where(positions >= 0, self.skill_internal_idx[np.clip(positions, 0, None)], -1) \
+            if self.skill_count else np.full(positions.shape, -1, dtype=np.int64)
+
+def get_catalog_fingerprint(db: Session) -> Tuple:
+    """
+    Günstige Kennung des aktuellen Katalogs.
+
+    Ändert sich bei jedem neuen Seed, bei geänderten Schwierigkeiten (mu_q) und über
+    die Katalog-Version bei jeder Änderung per bump_catalog_version (auch
+    Umbenennungen von original_id oder Beschreibungen, die Aggregate nicht sehen).
+    """
+    skills = db.query(func.count(models.Skill.id), func.max(models.Skill.id)).one()
+    problems = db.query(
+        func.count(models.Problem.id),
+        func.max(models.Problem.id),
+        func.sum(models.Problem.skill_id * (models.Problem.internal_idx + 1)),
+        func.sum(models.Problem.difficulty_mu_q)
+    ).one()
+    version = db.query(models.CatalogVersion.version).filter(models.CatalogVersion.id == 1).scalar()
+    return tuple(skills) + tuple(problems) + (version or 0,)
+
+def bump_catalog_version(db: Session) -> None:
+    """
+    Zählt die Katalog-Version hoch (ohne Commit, Teil der Transaktion des Aufrufers).
+
+    Muss bei jeder Änderung an Skills/Problems aufgerufen werden, damit andere
+    Worker den Katalog nach spätestens CHECK_INTERVAL_SECONDS neu laden.
+    """
+    updated = db.query(models.CatalogVersion).filter(models.CatalogVersion.id == 1).update(
+        {models.CatalogVersion.version: models.CatalogVersion.version + 1},
+        synchronize_session=False
+    )
+    if not updated:
+        db.add(models.CatalogVersion(id=1, version=1))
+
+def load_catalog(db: Session) -> Catalog:
+    """Lädt alle Skills und Problems in zwei Abfragen."""
+    fingerprint = get_catalog_fingerprint(db)
+    skill_rows = db.query(
+        models.Skill.id,
+        models.Skill.internal_idx,
+        models.Skill.original_skill_id,
+        models.Skill.name
+    ).order_by(models.Skill.id).all()
+    problem_rows = db.query(
+        models.Problem.id,
+        models.Problem.internal_idx,
+        models.Problem.original_problem_id,
+        models.Problem.skill_id,
+        models.Problem.description_placeholder,
+        models.Problem.difficulty_mu_q
+    ).order_by(models.Problem.id).all()
+
+    catalog = Catalog(skill_rows, problem_rows, fingerprint)
+    logger.info(f"Catalog loaded: {catalog.skill_count} skills, {catalog.problem_count} problems")
+    return catalog
+
+# Geteilte Instanz
+_catalog: Optional[Catalog] = None
+_catalog_checked_at = 0.0
+_catalog_lock = threading.Lock()
+
+def get_catalog(db: Optional[Session] = None) -> Catalog:
+    """
+    Gibt den geteilten Katalog zurück.
+
+    Lädt ihn beim ersten Aufruf und prüft höchstens alle CHECK_INTERVAL_SECONDS
+    per Fingerprint, ob sich der Seed geändert hat; dann wird neu geladen.
+    """
+    global _catalog, _catalog_checked_at
+
+    now = time.monotonic()
+    catalog = _catalog
+    if catalog is not None and now - _catalog_checked_at < CHECK_INTERVAL_SECONDS:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is not None and time.monotonic() - _catalog_checked_at < CHECK_INTERVAL_SECONDS:
+            return _catalog
+
+        own_session = db is None
+        if own_session:
+            from database.db_setup import SessionLocal
+            db = SessionLocal()
+        try:
+            if _catalog is None or get_catalog_fingerprint(db) != _catalog.fingerprint:
+                _catalog = load_catalog(db)
+            _catalog_checked_at = time.monotonic()
+        finally:
+            if own_session:
+                db.close()
+        return _catalog
+
+def is_catalog_loaded() -> bool:
+    """Ob der geteilte Katalog bereits geladen ist (ohne Datenbankzugriff)."""
+    return _catalog is not None
+
+def invalidate_catalog() -> None:
+    """Verwirft den geteilten Katalog (z.B. nach einem neuen Seed)."""
+    global _catalog, _catalog_checked_at
+    with _catalog_lock:
+        _catalog = None
+        _catalog_checked_at = 0.0
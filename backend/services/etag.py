@@ -0,0 +1,40 @@
+"""
+ETags für bedingte GET-Requests (If-None-Match -> 304).
+
+Die ETags der Empfehlungs-Endpunkte werden aus der Version der Schüler-Historie,
+der Modell-Version, dem Katalog und den Query-Parametern gebildet - also aus
+allem, wovon die Antwort abhängt - und lassen sich ohne Historie und Inferenz
+berechnen.
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+def compute_etag(*parts: Any) -> str:
+    """Starkes ETag (in Anführungszeichen) aus JSON-serialisierbaren Bestandteilen."""
+    raw = json.dumps(parts, default=str, separators=(",", ":"), sort_keys=True)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Prüft einen If-None-Match Header gegen ein ETag (schwacher Vergleich, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def file_fingerprint(*paths: str) -> str:
+    """Kurzer Hash über den Inhalt mehrerer Dateien (z.B. Modell und Mappings)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
@@ -0,0 +1,242 @@
+"""
+In-Process Metriken im Prometheus-Textformat (ohne externe Abhängigkeit).
+
+Counter, Gauges und Histogramme mit Labels, thread-sicher und mit geringem
+Overhead (ein Lock und eine Bisektion pro Beobachtung). GET /metrics
+(api/metrics.py) rendert alle Metriken im Exposition-Format 0.0.4.
+
+Erfasst werden:
+  - http_request_duration_seconds{method,route,status}, http_requests_in_progress
+  - app_phase_duration_seconds{phase}: Phasen aus services/timing.py pro Aufruf
+    (etag, db, history, prepare, forward, serialize)
+  - akt_forward_batch_size, akt_sequence_length, akt_inference_queue_depth
+  - cache_hits_total / cache_misses_total / cache_entries{cache} (benannte TTLCaches)
+  - db_query_duration_seconds{operation} (SQLAlchemy Events, alle Engines)
+  - import_rows_total / import_duration_seconds / import_rows_per_second{source}
+"""
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from services import timing
+from services.cache import named_caches
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+SEQUENCE_LENGTH_BUCKETS = (1, 5, 10, 25, 50, 100, 150, 200)
+ROWS_PER_SECOND_BUCKETS = (10, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} erwartet Labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+class _ValueMetric(_Metric):
+    """Ein Wert pro Label-Tupel; mit callback wird er erst beim Rendern abgefragt."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def inc(self, amount: float = 1, *labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            values = [(self._key(key), value) for key, value in self._callback()]
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}" for key, value in values
+        ]
+
+class Counter(_ValueMetric):
+    type_name = "counter"
+
+class Gauge(_ValueMetric):
+    type_name = "gauge"
+
+    def set(self, value: float, *labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, *labels) -> None:
+        self.inc(-amount, *labels)
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Pro Label-Tupel: Zähler je Bucket (nicht kumuliert, letzter = +Inf), Summe
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = self._header()
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_number(bound)))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+_registry: List[_Metric] = []
+
+def register(metric: _Metric) -> _Metric:
+    _registry.append(metric)
+    return metric
+
+def render() -> str:
+    """Alle Metriken im Prometheus-Textformat."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# HTTP
+HTTP_REQUEST_DURATION = register(Histogram(
+    "http_request_duration_seconds", "Dauer der HTTP-Requests nach Route", ("method", "route", "status")
+))
+HTTP_REQUESTS_IN_PROGRESS = register(Gauge("http_requests_in_progress", "Laufende HTTP-Requests"))
+
+# Phasen (services/timing.py)
+PHASE_DURATION = register(Histogram(
+    "app_phase_duration_seconds", "Dauer einzelner Phasen pro Aufruf (etag, db, history, prepare, forward, serialize)", ("phase",)
+))
+
+# AKT
+AKT_FORWARD_BATCH_SIZE = register(Histogram(
+    "akt_forward_batch_size", "Sequenzen pro Forward-Pass", buckets=BATCH_SIZE_BUCKETS
+))
+AKT_SEQUENCE_LENGTH = register(Histogram(
+    "akt_sequence_length", "Länge der Eingabesequenzen ohne Padding", buckets=SEQUENCE_LENGTH_BUCKETS
+))
+AKT_INFERENCE_QUEUE_DEPTH = register(Gauge(
+    "akt_inference_queue_depth", "Empfehlungs-Requests in Bearbeitung (warten auf das Modell oder nutzen es)"
+))
+
+# Caches
+def _collect_caches(value: Callable):
+    def collect():
+        return [((name,), value(cache)) for name, cache in sorted(named_caches().items())]
+    return collect
+
+register(Counter("cache_hits_total", "Treffer benannter Caches", ("cache",), callback=_collect_caches(lambda c: c.hits)))
+register(Counter("cache_misses_total", "Fehlgriffe benannter Caches", ("cache",), callback=_collect_caches(lambda c: c.misses)))
+register(Gauge("cache_entries", "Einträge benannter Caches", ("cache",), callback=_collect_caches(len)))
+
+# Datenbank
+DB_QUERY_DURATION = register(Histogram(
+    "db_query_duration_seconds", "Dauer der SQL-Statements nach Art", ("operation",), buckets=DB_BUCKETS
+))
+
+# Import
+IMPORT_ROWS = register(Counter("import_rows_total", "Importierte Interaktionen", ("source",)))
+IMPORT_DURATION = register(Histogram("import_duration_seconds", "Dauer eines Imports", ("source",)))
+IMPORT_ROWS_PER_SECOND = register(Histogram(
+    "import_rows_per_second", "Durchsatz pro Import", ("source",), buckets=ROWS_PER_SECOND_BUCKETS
+))
+
+def record_import(source: str, rows: int, seconds: float) -> None:
+    """Erfasst einen abgeschlossenen Import (source: csv oder batch)."""
+    IMPORT_ROWS.inc(rows, source)
+    IMPORT_DURATION.observe(seconds, source)
+    if rows and seconds > 0:
+        IMPORT_ROWS_PER_SECOND.observe(rows / seconds, source)
+
+def record_forward(q_seq) -> None:
+    """Batchgröße und Sequenzlängen eines Forward-Passes (q_seq: vorne gepaddet, 0 = Padding)."""
+    AKT_FORWARD_BATCH_SIZE.observe(q_seq.shape[0])
+    for length in (q_seq != 0).sum(axis=1):
+        AKT_SEQUENCE_LENGTH.observe(int(length))
+
+def _observe_phase(name: str, duration_ms: float) -> None:
+    PHASE_DURATION.observe(duration_ms / 1000, name)
+
+_OPERATIONS = {"SELECT": "select", "INSERT": "insert", "UPDATE": "update", "DELETE": "delete", "WITH": "select"}
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    keyword = statement.lstrip()[:6].upper().rstrip()
+    DB_QUERY_DURATION.observe(duration, _OPERATIONS.get(keyword, "other"))
+
+_installed = False
+
+def install() -> None:
+    """Aktiviert die Erfassung von Phasen und SQL-Statements (idempotent)."""
+    global _installed
+    if _installed:
+        return
+    timing.add_observer(_observe_phase)
+    # Auf der Engine-Klasse: gilt auch für später gebaute Engines (configure_engine, async)
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
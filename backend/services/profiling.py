@@ -0,0 +1,265 @@
+"""
+Diagnose zur Laufzeit ohne Neustart: Torch-Profiler für Inferenzaufrufe und
+Speicher-Snapshots (RSS, tracemalloc) nach Subsystem.
+
+Torch-Profiler: arm_torch_profiler(n) profiliert die nächsten n Aufrufe von
+AKTModelService._run_inference. Pro Aufruf wird ein Chrome-Trace
+(chrome://tracing bzw. https://ui.perfetto.dev) in settings.torch_profile_dir
+gespeichert und die teuersten Operatoren werden festgehalten. Solange nichts
+scharfgeschaltet ist, kostet ein Aufruf nur eine Attributabfrage.
+
+Speicher: memory_report() liefert RSS, Größe des Modells, Einträge der Caches
+und offene ORM-Sessions. Nach start_tracemalloc() kommen die Allokationen seit
+dem Start nach Subsystem (model, caches, orm, api, other) und die größten
+Zuwächse nach Quellzeile dazu. tracemalloc verlangsamt Python-Code deutlich und
+ist nur zur Diagnose gedacht.
+
+Endpoints: api/debug_routes.py (nur Admins).
+"""
+import gc
+import os
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "akt-profiles")
+# Höchstzahl auf einmal profilierter Aufrufe (jeder Trace hat einige MB)
+MAX_PROFILED_CALLS = 50
+# Anzahl Operatoren in der Zusammenfassung pro Aufruf
+TOP_OPERATORS = 15
+
+TRACE_NAME = re.compile(r"^akt_[0-9_]+\.json$")
+
+def profile_dir() -> Path:
+    # Import erst hier: der Inferenz-Service (und die Benchmarks) laufen auch ohne config
+    from config import settings
+    return Path(getattr(settings, "torch_profile_dir", None) or DEFAULT_PROFILE_DIR)
+
+class TorchProfilerState:
+    """Scharfgeschaltete Aufrufe und Ergebnisse der bisherigen Profile."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.remaining = 0
+        self.options: Dict[str, bool] = {}
+        self.results: List[Dict[str, Any]] = []
+
+    def arm(self, calls: int, record_shapes: bool = True, profile_memory: bool = True, with_stack: bool = False) -> None:
+        with self._lock:
+            self.remaining = min(calls, MAX_PROFILED_CALLS)
+            self.options = {"record_shapes": record_shapes, "profile_memory": profile_memory, "with_stack": with_stack}
+            self.results = []
+
+    def disarm(self) -> None:
+        with self._lock:
+            self.remaining = 0
+
+    def take(self) -> Optional[Dict[str, bool]]:
+        """Reserviert einen Aufruf; None, wenn nichts (mehr) scharfgeschaltet ist."""
+        if not self.remaining:
+            return None
+        with self._lock:
+            if not self.remaining:
+                return None
+            self.remaining -= 1
+            return dict(self.options)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "remaining_calls": self.remaining,
+                "options": dict(self.options),
+                "profile_dir": str(profile_dir()),
+                "results": list(self.results)
+            }
+
+_torch_profiler = TorchProfilerState()
+
+def arm_torch_profiler(calls: int, **options) -> Dict[str, Any]:
+    _torch_profiler.arm(calls, **options)
+    return _torch_profiler.status()
+
+def disarm_torch_profiler() -> Dict[str, Any]:
+    _torch_profiler.disarm()
+    return _torch_profiler.status()
+
+def torch_profiler_status() -> Dict[str, Any]:
+    return _torch_profiler.status()
+
+def _operator_table(prof, with_stack: bool) -> List[Dict[str, Any]]:
+    averages = prof.key_averages(group_by_stack_n=5) if with_stack else prof.key_averages()
+    events = sorted(averages, key=lambda event: event.self_cpu_time_total, reverse=True)[:TOP_OPERATORS]
+    table = []
+    for event in events:
+        row = {
+            "name": event.key,
+            "calls": event.count,
+            "self_cpu_ms": round(event.self_cpu_time_total / 1000, 3),
+            "cpu_total_ms": round(event.cpu_time_total / 1000, 3)
+        }
+        if event.input_shapes:
+            row["input_shapes"] = str(event.input_shapes)
+        if getattr(event, "self_cpu_memory_usage", 0):
+            row["self_cpu_memory_bytes"] = event.self_cpu_memory_usage
+        if with_stack and event.stack:
+            row["stack"] = list(event.stack)
+        table.append(row)
+    return table
+
+@contextmanager
+def inference_profile(batch_size: int) -> Iterator[None]:
+    """Profiliert den umschlossenen Forward-Pass, falls scharfgeschaltet."""
+    options = _torch_profiler.take()
+    if options is None:
+        yield
+        return
+
+    import torch
+    from torch.profiler import ProfilerActivity, profile
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+
+    start_time = time.perf_counter()
+    with profile(activities=activities, **options) as prof:
+        yield
+    duration_ms = (time.perf_counter() - start_time) * 1000
+
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    trace = directory / f"akt_{time.strftime('%Y%m%d_%H%M%S')}_{time.perf_counter_ns() % 1_000_000:06d}.json"
+    prof.export_chrome_trace(str(trace))
+    result = {
+        "trace": trace.name,
+        "batch_size": batch_size,
+        "duration_ms": round(duration_ms, 3),
+        "top_operators": _operator_table(prof, options.get("with_stack", False))
+    }
+    with _torch_profiler._lock:
+        _torch_profiler.results.append(result)
+
+def trace_path(name: str) -> Optional[Path]:
+    """Pfad eines gespeicherten Traces (nur Namen aus inference_profile, kein Pfad)."""
+    if not TRACE_NAME.match(name):
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+# Speicher
+
+# Quelldateien -> Subsystem, erster Treffer im Traceback (innerste Frames zuerst) gewinnt
+_SUBSYSTEMS = (
+    ("model", ("/torch/", "/models/akt.py", "/services/akt_model_service.py")),
+    ("caches", ("/services/cache.py", "/services/auth_cache.py", "/services/catalog.py", "/services/system_status.py")),
+    ("orm", ("/sqlalchemy/", "/database/")),
+    ("api", ("/api/", "/fastapi/", "/starlette/", "/pydantic", "/orjson")),
+)
+
+def _subsystem(traceback: tracemalloc.Traceback) -> str:
+    for frame in reversed(traceback):
+        filename = frame.filename.replace("\\", "/")
+        for name, markers in _SUBSYSTEMS:
+            if any(marker in filename for marker in markers):
+                return name
+    return "other"
+
+def current_rss_bytes() -> Optional[int]:
+    """Aktueller RSS aus /proc (Linux), sonst None."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+_baseline: Optional[Dict[str, Any]] = None
+
+def start_tracemalloc(nframes: int = 25) -> Dict[str, Any]:
+    """Startet tracemalloc; Zuwächse beziehen sich ab jetzt auf diesen Zeitpunkt."""
+    global _baseline
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    tracemalloc.start(nframes)
+    _baseline = {"started_at": time.time(), "rss_bytes": current_rss_bytes()}
+    return memory_report()
+
+def stop_tracemalloc() -> None:
+    global _baseline
+    tracemalloc.stop()
+    _baseline = None
+
+def _model_report() -> Optional[Dict[str, Any]]:
+    from services import akt_model_service
+    service = akt_model_service._akt_service_instance
+    if service is None:
+        return None
+    tensors = list(service.model.parameters()) + list(service.model.buffers())
+    return {
+        "version": service.model_version,
+        "device": str(service.device),
+        "parameters": sum(tensor.numel() for tensor in tensors),
+        "bytes": sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+    }
+
+def _orm_report() -> Dict[str, Any]:
+    from sqlalchemy.orm import Session
+    sessions = [obj for obj in gc.get_objects() if isinstance(obj, Session)]
+    return {
+        "open_sessions": len(sessions),
+        "identity_map_objects": sum(len(session.identity_map) for session in sessions)
+    }
+
+def _caches_report() -> Dict[str, Any]:
+    from services.cache import named_caches
+    return {name: cache.info() for name, cache in sorted(named_caches().items())}
+
+def memory_report(top: int = 20) -> Dict[str, Any]:
+    """RSS, Subsysteme und - bei laufendem tracemalloc - Allokationen seit start_tracemalloc."""
+    rss = current_rss_bytes()
+    report: Dict[str, Any] = {
+        "rss_bytes": rss,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "model": _model_report(),
+        "caches": _caches_report(),
+        "orm": _orm_report(),
+        "gc_objects": len(gc.get_objects()),
+        "tracemalloc": None
+    }
+    if not tracemalloc.is_tracing():
+        return report
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    subsystems: Dict[str, Dict[str, int]] = {}
+    for stat in snapshot.statistics("traceback"):
+        entry = subsystems.setdefault(_subsystem(stat.traceback), {"bytes": 0, "blocks": 0})
+        entry["bytes"] += stat.size
+        entry["blocks"] += stat.count
+    current, peak = tracemalloc.get_traced_memory()
+    baseline_rss = (_baseline or {}).get("rss_bytes")
+    report["tracemalloc"] = {
+        "started_at": (_baseline or {}).get("started_at"),
+        "traced_bytes": current,
+        "traced_peak_bytes": peak,
+        "rss_growth_bytes": rss - baseline_rss if rss is not None and baseline_rss is not None else None,
+        "subsystems": dict(sorted(subsystems.items(), key=lambda item: item[1]["bytes"], reverse=True)),
+        "top_lines": [
+            {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size, "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[:top]
+        ]
+    }
+    return report
@@ -0,0 +1,216 @@
+"""
+SQL-Profiler pro Request mit Erkennung von N+1 Mustern (opt-in).
+
+Die Middleware api/query_profiler.py startet pro Request eine Aufzeichnung;
+SQLAlchemy-Events (before/after_cursor_execute auf allen Engines) zählen darin
+jedes Statement mit Dauer und "Form" (Statement mit vereinheitlichten
+Platzhaltern und IN-Listen). Wird dieselbe Form in einem Request oft
+ausgeführt, ist das typischerweise ein Lazy Load oder ein crud-Aufruf in einer
+Schleife (N+1).
+
+Requests über den Schwellwerten werden als Warnung geloggt. Die schlimmsten
+Requests und eine Zusammenfassung pro Route liefert worst_offenders()
+(GET /api/debug/sql-profile).
+
+Aktivieren mit settings.sql_profiler_enabled = True.
+"""
+import heapq
+import itertools
+import re
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import settings
+
+# Schwellwerte pro Request, ab denen gewarnt wird
+DEFAULT_MAX_QUERIES = 25
+DEFAULT_MAX_DB_MS = 200.0
+# Ab so vielen Ausführungen derselben Form gilt ein Statement als N+1 verdächtig
+DEFAULT_MAX_REPEATS = 5
+# Anzahl aufbewahrter schlimmster Requests
+DEFAULT_KEEP = 50
+
+_STATEMENT_PREVIEW = 300
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+def statement_shape(statement: str) -> str:
+    """Vereinheitlicht ein Statement: Literale und IN-Listen werden zu ?, Whitespace zu einem Leerzeichen."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(?...)", shape)
+
+class RequestQueries:
+    """Statements eines Requests: Anzahl und Dauer (ms) pro Form."""
+
+    __slots__ = ("count", "total_ms", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Dict[str, List[float]] = {}
+
+    def add(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        shape = statement_shape(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = [1, duration_ms]
+        else:
+            entry[0] += 1
+            entry[1] += duration_ms
+
+    def repeated(self, min_count: int) -> List[Dict[str, Any]]:
+        """Formen mit mindestens min_count Ausführungen, häufigste zuerst."""
+        shapes = [
+            {"statement": shape[:_STATEMENT_PREVIEW], "count": int(count), "total_ms": round(ms, 3)}
+            for shape, (count, ms) in self.shapes.items()
+            if count >= min_count
+        ]
+        return sorted(shapes, key=lambda entry: entry["count"], reverse=True)
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+def start() -> Token:
+    return _current.set(RequestQueries())
+
+def stop(token: Token) -> None:
+    _current.reset(token)
+
+def current() -> Optional[RequestQueries]:
+    return _current.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    starts = conn.info.get("profiler_query_start")
+    if queries is None or not starts:
+        return
+    queries.add(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+class QueryProfiler:
+    """Sammelt die Ergebnisse abgeschlossener Requests und prüft die Schwellwerte."""
+
+    def __init__(
+        self,
+        max_queries: int = DEFAULT_MAX_QUERIES,
+        max_db_ms: float = DEFAULT_MAX_DB_MS,
+        max_repeats: int = DEFAULT_MAX_REPEATS,
+        keep: int = DEFAULT_KEEP
+    ):
+        self.max_queries = max_queries
+        self.max_db_ms = max_db_ms
+        self.max_repeats = max_repeats
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        # Min-Heap nach (Anzahl Statements, DB-Zeit): die Wurzel fliegt zuerst raus
+        self._worst: List[tuple] = []
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self.requests = 0
+
+    def problems(self, queries: RequestQueries) -> List[str]:
+        """Überschrittene Schwellwerte eines Requests (leer = unauffällig)."""
+        problems = []
+        if queries.count > self.max_queries:
+            problems.append(f"{queries.count} Statements (Grenze {self.max_queries})")
+        if queries.total_ms > self.max_db_ms:
+            problems.append(f"{queries.total_ms:.1f} ms DB-Zeit (Grenze {self.max_db_ms:.0f} ms)")
+        repeated = queries.repeated(self.max_repeats)
+        if repeated:
+            problems.append(f"N+1 Verdacht: {len(repeated)} Statement(s) mindestens {self.max_repeats}x ausgeführt")
+        return problems
+
+    def record(self, method: str, route: str, path: str, queries: RequestQueries) -> Dict[str, Any]:
+        """Übernimmt einen abgeschlossenen Request und gibt seinen Bericht zurück."""
+        report = {
+            "method": method,
+            "route": route,
+            "path": path,
+            "queries": queries.count,
+            "db_ms": round(queries.total_ms, 3),
+            "repeated": queries.repeated(self.max_repeats),
+            "problems": self.problems(queries),
+            "recorded_at": time.time()
+        }
+        key = (queries.count, queries.total_ms, next(self._sequence))
+        with self._lock:
+            self.requests += 1
+            stats = self._routes.setdefault(f"{method} {route}", {
+                "requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0, "flagged": 0
+            })
+            stats["requests"] += 1
+            stats["queries"] += queries.count
+            stats["db_ms"] += queries.total_ms
+            stats["max_queries"] = max(stats["max_queries"], queries.count)
+            stats["flagged"] += bool(report["problems"])
+            if len(self._worst) < self.keep:
+                heapq.heappush(self._worst, (key, report))
+            elif key > self._worst[0][0]:
+                heapq.heapreplace(self._worst, (key, report))
+        return report
+
+    def worst_offenders(self, limit: int = 20) -> Dict[str, Any]:
+        """Schlimmste Requests (nach Anzahl Statements) und Routen (nach Statements pro Request)."""
+        with self._lock:
+            worst = [report for _, report in heapq.nlargest(limit, self._worst, key=lambda item: item[0])]
+            routes = [
+                {
+                    "route": route,
+                    "requests": int(stats["requests"]),
+                    "avg_queries": round(stats["queries"] / stats["requests"], 2),
+                    "max_queries": int(stats["max_queries"]),
+                    "avg_db_ms": round(stats["db_ms"] / stats["requests"], 3),
+                    "flagged": int(stats["flagged"])
+                }
+                for route, stats in self._routes.items()
+            ]
+            requests = self.requests
+        routes.sort(key=lambda entry: (entry["avg_queries"], entry["avg_db_ms"]), reverse=True)
+        return {
+            "requests_profiled": requests,
+            "thresholds": {
+                "max_queries": self.max_queries,
+                "max_db_ms": self.max_db_ms,
+                "max_repeats": self.max_repeats
+            },
+            "routes": routes[:limit],
+            "requests": worst
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._worst.clear()
+            self._routes.clear()
+            self.requests = 0
+
+_profiler: Optional[QueryProfiler] = None
+
+def get_profiler() -> Optional[QueryProfiler]:
+    """Der aktive Profiler oder None (nicht aktiviert)."""
+    return _profiler
+
+def install() -> QueryProfiler:
+    """Aktiviert den Profiler mit den Schwellwerten aus settings (idempotent)."""
+    global _profiler
+    if _profiler is None:
+        _profiler = QueryProfiler(
+            max_queries=int(getattr(settings, "sql_profiler_max_queries", None) or DEFAULT_MAX_QUERIES),
+            max_db_ms=float(getattr(settings, "sql_profiler_max_db_ms", None) or DEFAULT_MAX_DB_MS),
+            max_repeats=int(getattr(settings, "sql_profiler_max_repeats", None) or DEFAULT_MAX_REPEATS),
+            keep=int(getattr(settings, "sql_profiler_keep", None) or DEFAULT_KEEP)
+        )
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    return _profiler
@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import func, select, text
+from config import settings
+from database import models
+from database.db_setup import SessionLocal
+from services.akt_model_service import get_model_status, is_akt_service_loaded
+from services.cache import TTLCache
+from services.catalog import get_catalog, is_catalog_loaded
+
+logger = logging.getLogger(__name__)
+
+# Sekunden, die /api/stats aus dem Cache beantwortet wird
+DEFAULT_STATS_CACHE_TTL_SECONDS = 30.0
+# Sekunden, die das Ergebnis des Datenbank-Pings für /health/ready gilt
+DEFAULT_DB_CHECK_INTERVAL_SECONDS = 5.0
+
+_stats_cache: TTLCache[Dict[str, int]] = TTLCache(
+    maxsize=1,
+    ttl_seconds=float(getattr(settings, "stats_cache_ttl_seconds", None) or DEFAULT_STATS_CACHE_TTL_SECONDS),
+    name="system_stats"
+)
+
+def compute_system_stats() -> Dict[str, int]:
+    """
+    Zählt die Einträge aller Tabellen.
+
+    Skills und Problems kommen aus dem Katalog, Interaktionen aus den Zählern in
+    student_stats; nur die kleinen Tabellen werden per COUNT gezählt (eine Abfrage).
+    """
+    db = SessionLocal()
+    try:
+        catalog = get_catalog(db)
+        row = db.execute(select(
+            select(func.count(models.Student.id)).scalar_subquery().label("students"),
+            select(func.count(models.Teacher.id)).scalar_subquery().label("teachers"),
+            select(func.count(models.Class.id)).scalar_subquery().label("classes"),
+            select(func.coalesce(func.sum(models.StudentStats.total_interactions), 0)).scalar_subquery().label("interactions")
+        )).one()
+    finally:
+        db.close()
+
+    return {
+        "skills": catalog.skill_count,
+        "problems": catalog.problem_count,
+        "students": row.students,
+        "teachers": row.teachers,
+        "classes": row.classes,
+        "interactions": row.interactions,
+    }
+
+def get_system_stats() -> Dict[str, int]:
+    """Systemstatistiken, höchstens alle stats_cache_ttl_seconds neu berechnet."""
+    return _stats_cache.get_or_set("system", compute_system_stats)
+
+def get_cached_system_stats() -> Optional[Dict[str, int]]:
+    """Systemstatistiken aus dem Cache oder None (ohne Datenbankzugriff)."""
+    return _stats_cache.get("system")
+
+# Zuletzt bekannter Datenbank-Status: (geprüft um, erreichbar, Fehler)
+_db_status: Tuple[float, bool, Optional[str]] = (0.0, False, None)
+_db_status_lock = threading.Lock()
+
+def _check_database() -> Tuple[bool, Optional[str]]:
+    global _db_status
+
+    interval = float(getattr(settings, "health_db_check_interval_seconds", None) or DEFAULT_DB_CHECK_INTERVAL_SECONDS)
+    checked_at, ok, error = _db_status
+    if time.monotonic() - checked_at < interval:
+        return ok, error
+
+    # Nur ein Request pingt, alle anderen verwenden den letzten Status
+    if not _db_status_lock.acquire(blocking=False):
+        return ok, error
+    try:
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+            ok, error = True, None
+        except Exception as e:
+            logger.warning(f"Readiness: Datenbank nicht erreichbar: {e}")
+            ok, error = False, str(e)
+        finally:
+            db.close()
+        _db_status = (time.monotonic(), ok, error)
+        return ok, error
+    finally:
+        _db_status_lock.release()
+
+def get_readiness() -> Dict[str, Any]:
+    """
+    Bereitschaft für Traffic: Modell und Katalog geladen, Datenbank erreichbar.
+
+    Lädt nichts nach; der Datenbank-Status wird höchstens alle
+    health_db_check_interval_seconds per SELECT 1 aktualisiert.
+    """
+    db_ok, db_error = _check_database()
+    model = get_model_status()
+    checks = {
+        "database": "connected" if db_ok else "unavailable",
+        "catalog": "loaded" if is_catalog_loaded() else "not_loaded",
+        "model": model["state"],
+    }
+    ready = db_ok and is_catalog_loaded() and is_akt_service_loaded()
+    result = {"status": "ready" if ready else "not_ready", "checks": checks}
+    if db_error:
+        result["error"] = db_error
+    if model["error"]:
+        result["model_error"] = model["error"]
+    return result
@@ -0,0 +1,118 @@
+"""
+Zeitmessung pro Request nach Phasen (Server-Timing).
+
+Die Middleware api/server_timing.py startet für (gesampelte) Requests eine
+Messung; Code innerhalb des Requests misst Phasen mit
+
+    with timing.phase("history"):
+        ...
+
+oder als Dekorator (@timing.timed("forward")). Mehrfache Aufrufe einer Phase
+werden summiert und gezählt. Ohne laufende Messung (nicht gesampelt, Skripte,
+Benchmarks) und ohne Beobachter kostet eine Phase nur einen ContextVar-Zugriff.
+
+Beobachter (add_observer, z.B. services/metrics.py) erhalten jede gemessene
+Phase einzeln als (name, duration_ms), auch außerhalb gesampelter Requests.
+
+Phasen sollten sich nicht überlappen: die Differenz zur Gesamtzeit wird als
+"other" ausgewiesen.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Callable, Dict, Iterator, List, Optional
+
+class RequestTimings:
+    """Summierte Dauer (ms) und Anzahl pro Phase eines Requests."""
+
+    __slots__ = ("started", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, name: str, duration_ms: float) -> None:
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [duration_ms, 1]
+        else:
+            entry[0] += duration_ms
+            entry[1] += 1
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self, total_ms: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Phasen inklusive "other" (nicht zugeordnete Zeit) und "total"."""
+        total_ms = self.elapsed_ms() if total_ms is None else total_ms
+        result = {name: {"ms": round(ms, 3), "count": int(count)} for name, (ms, count) in self.phases.items()}
+        other = total_ms - sum(ms for ms, _ in self.phases.values())
+        result["other"] = {"ms": round(max(other, 0.0), 3), "count": 1}
+        result["total"] = {"ms": round(total_ms, 3), "count": 1}
+        return result
+
+    def header_value(self, total_ms: Optional[float] = None) -> str:
+        """Wert für den Server-Timing Header, z.B. 'history;dur=2.1, forward;dur=40.3;desc="12x", total;dur=45.0'."""
+        parts = []
+        for name, entry in self.summary(total_ms).items():
+            part = f"{name};dur={entry['ms']:.1f}"
+            if entry["count"] > 1:
+                part += f';desc="{entry["count"]}x"'
+            parts.append(part)
+        return ", ".join(parts)
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+_observers: List[Callable[[str, float], None]] = []
+
+def add_observer(observer: Callable[[str, float], None]) -> None:
+    """Registriert einen Beobachter, der jede Phase als (name, duration_ms) erhält."""
+    if observer not in _observers:
+        _observers.append(observer)
+
+def _record(timings: Optional[RequestTimings], name: str, duration_ms: float) -> None:
+    if timings is not None:
+        timings.add(name, duration_ms)
+    for observer in _observers:
+        observer(name, duration_ms)
+
+def start() -> Token:
+    """Startet die Messung für den aktuellen Kontext (Request)."""
+    return _current.set(RequestTimings())
+
+def stop(token: Token) -> None:
+    _current.reset(token)
+
+def current() -> Optional[RequestTimings]:
+    """Die laufende Messung oder None."""
+    return _current.get()
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Misst einen Abschnitt als Phase name (ohne Messung und Beobachter: nichts)."""
+    timings = _current.get()
+    if timings is None and not _observers:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(timings, name, (time.perf_counter() - start_time) * 1000)
+
+def timed(name: str):
+    """Dekorator: misst jeden Aufruf der Funktion als Phase name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None and not _observers:
+                return func(*args, **kwargs)
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(timings, name, (time.perf_counter() - start_time) * 1000)
+        return wrapper
+    return decorator
@@ -0,0 +1,45 @@
+"""
+Gemeinsame Fixtures: jede Test-Datenbank wird wie im Betrieb per migrate() angelegt.
+
+Standard ist eine temporäre SQLite-Datei. Mit TEST_DATABASE_URL (z.B.
+postgresql://user:pw@localhost/test) laufen die Tests gegen diese Datenbank;
+ihre Tabellen werden nach jedem Test gelöscht.
+
+    cd backend && python -m pytest -q tests
+"""
+import os
+import pytest
+from sqlalchemy.orm import sessionmaker
+from benchmarks.common import seed_synthetic_catalog, seed_synthetic_school
+from database.db_setup import Base, build_engine
+from database.migrations import migrate
+
+@pytest.fixture
+def engine(tmp_path):
+    url = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tmp_path / 'test.db'}"
+    engine = build_engine(url)
+    migrate(engine)
+    try:
+        yield engine
+    finally:
+        if engine.dialect.name != "sqlite":
+            Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def school(db):
+    """Katalog mit 10 Skills und 200 Problems, eine Lehrkraft mit einer Klasse aus 3 Schülern."""
+    seed_synthetic_catalog(db, n_skills=10, n_problems=200)
+    return seed_synthetic_school(db, students_per_class=3, password_hash="x")
@@ -0,0 +1,53 @@
+import threading
+from datetime import datetime, timedelta
+from database import crud, models
+from database.history import load_student_history, query_student_histories
+
+INSERTS_PER_SESSION = 20
+
+def _interaction_rows(db, student_id, count):
+    problems = db.query(models.Problem.id, models.Problem.skill_id).order_by(models.Problem.id).limit(count).all()
+    start = datetime(2024, 1, 1, 8, 0)
+    return [
+        {
+            "student_id": student_id,
+            "problem_id": problem_id,
+            "skill_id": skill_id,
+            "is_correct": i % 2 == 0,
+            "timestamp": start + timedelta(minutes=i)
+        }
+        for i, (problem_id, skill_id) in enumerate(problems)
+    ]
+
+def test_concurrent_inserts_for_same_student_keep_all_rows(db, session_factory, school):
+    student_id = school["student_ids"][0]
+    rows = _interaction_rows(db, student_id, 2 * INSERTS_PER_SESSION)
+    # Abwechselnd verteilt, damit sich die Zeitbereiche beider Sessions überlappen
+    batches = [rows[0::2], rows[1::2]]
+    barrier = threading.Barrier(len(batches))
+    errors = []
+
+    def insert_from_own_session(batch):
+        session = session_factory()
+        try:
+            barrier.wait()
+            for row in batch:
+                crud.create_interactions_bulk(session, [row])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=insert_from_own_session, args=(batch,)) for batch in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+    db.expire_all()
+    packed = load_student_history(db, student_id)
+    rebuilt = query_student_histories(db, [student_id])[student_id]
+    assert len(packed) == len(rows)
+    assert packed.problem_idx.tolist() == rebuilt.problem_idx.tolist()
+    assert packed.timestamps.tolist() == rebuilt.timestamps.tolist()
@@ -0,0 +1,39 @@
+import re
+import pytest
+from database.query_plans import PLAN_CHECKS, check_query_plans, check_reference_query_plans
+
+# Index, den jede Abfrage aus query_plans.PLAN_CHECKS verwenden muss
+EXPECTED_INDEXES = {
+    "student_interactions": "ix_interactions_student_history",
+    "student_interactions_page": "ix_interactions_student_history",
+    "student_interactions_by_skill": "ix_interactions_student_skill_timestamp",
+    "student_history": "ix_interactions_student_history",
+    "students_in_class": "ix_students_class_active",
+    "teacher_student_count": "ix_students_class_active",
+}
+
+@pytest.fixture
+def sqlite_engine(engine):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("Query-Plan Prüfung nur für SQLite")
+    return engine
+
+def _used_indexes(plan):
+    return set(re.findall(r"USING (?:COVERING )?INDEX (\w+)", " ".join(plan)))
+
+def test_all_plans_ok_on_migrated_database(sqlite_engine):
+    results = check_query_plans(sqlite_engine)
+    assert [result.name for result in results] == [check.name for check in PLAN_CHECKS]
+    assert [(result.name, result.problems) for result in results if not result.ok] == []
+    # Leere Tabellen: Ersatz-Index höchstens als Warnung
+    for result in results:
+        if result.warnings:
+            assert "ix_students_class_id" in _used_indexes(result.plan)
+
+def test_reference_plans_use_expected_indexes():
+    # Wie manage.py check-query-plans: Referenzdaten und ANALYZE, kein Ersatz-Index erlaubt
+    results = {result.name: result for result in check_reference_query_plans()}
+    assert all(result.ok for result in results.values()), {name: r.problems for name, r in results.items() if not r.ok}
+    assert {name: r.warnings for name, r in results.items() if r.warnings} == {}
+    for name, index in EXPECTED_INDEXES.items():
+        assert index in _used_indexes(results[name].plan), (name, results[name].plan)
@@ -0,0 +1,52 @@
+import pytest
+from database import crud, models
+import schemas
+
+@pytest.fixture
+def class_id(engine, db, school):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("FTS5 nur für SQLite")
+    return school["class_ids"][0]
+
+def _add_students(db, class_id, names):
+    students = [models.Student(first_name=first, last_name=last, class_id=class_id, is_deleted=False) for first, last in names]
+    db.add_all(students)
+    db.commit()
+    return [student.id for student in students]
+
+def _names(db, query, **kwargs):
+    return [f"{s.first_name} {s.last_name}" for s in crud.search_students(db, query, **kwargs)]
+
+def test_prefix_search_ranks_better_matches_first(db, class_id):
+    _add_students(db, class_id, [("Max", "Müller"), ("Maxi", "Maximilian"), ("Anna", "Schmidt"), ("Moritz", "Müllerschön")])
+
+    assert _names(db, "ma mü") == ["Max Müller"]
+    # Beide Namen beginnen mit "max": höherer bm25-Rang
+    assert _names(db, "max") == ["Maxi Maximilian", "Max Müller"]
+    # Umlaute werden beim Indexieren entfernt, gesucht wird nur nach Wortanfängen
+    assert set(_names(db, "mull")) == {"Max Müller", "Moritz Müllerschön"}
+    assert _names(db, "ller") == []
+
+def test_search_filters_by_class(db, class_id, school):
+    other_class = models.Class(name="Andere", description="Test", teacher_id=school["teacher_ids"][0])
+    db.add(other_class)
+    db.commit()
+    _add_students(db, class_id, [("Max", "Müller")])
+    _add_students(db, other_class.id, [("Max", "Meier")])
+
+    assert _names(db, "max", class_ids=[other_class.id]) == ["Max Meier"]
+    assert _names(db, "max", class_ids=[]) == []
+
+def test_triggers_follow_soft_delete_and_renames(db, class_id):
+    student_id, _ = _add_students(db, class_id, [("Max", "Müller"), ("Maxi", "Meier")])
+
+    crud.delete_student(db, student_id)
+    assert _names(db, "max") == ["Maxi Meier"]
+
+    # Wiederhergestellt und umbenannt: neuer Name gefunden, alter nicht
+    student = db.get(models.Student, student_id)
+    student.is_deleted = False
+    db.commit()
+    crud.update_student(db, student_id, schemas.StudentCreate(first_name="Lena", last_name="Müller"))
+    assert _names(db, "max") == ["Maxi Meier"]
+    assert _names(db, "lena mü") == ["Lena Müller"]
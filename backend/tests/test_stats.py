@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+from database import crud, models
+from database.stats import check_student_stats
+
+def _rows(db, student_id, problem_offsets, start):
+    problems = db.query(models.Problem.id, models.Problem.skill_id).order_by(models.Problem.id).all()
+    return [
+        {
+            "student_id": student_id,
+            "problem_id": problems[offset][0],
+            "skill_id": problems[offset][1],
+            "is_correct": i % 3 != 0,
+            "timestamp": start + timedelta(minutes=i)
+        }
+        for i, offset in enumerate(problem_offsets)
+    ]
+
+def _stats(db, student_id):
+    db.expire_all()
+    return db.get(models.StudentStats, student_id)
+
+def test_incremental_stats_match_full_recompute(db, school):
+    first, second = school["student_ids"][:2]
+    start = datetime(2024, 3, 1, 8, 0)
+
+    crud.create_interactions_bulk(db, _rows(db, first, [0, 1, 2, 3], start))
+    # Wiederholte Problems zählen nicht erneut, ein älterer Batch ändert last_activity nicht
+    crud.create_interactions_bulk(db, _rows(db, first, [2, 3, 4], start + timedelta(days=1)))
+    crud.create_interactions_bulk(db, _rows(db, first, [0, 5], start - timedelta(days=1)) + _rows(db, second, [7], start))
+
+    stats = _stats(db, first)
+    assert stats.total_interactions == 9
+    assert stats.problems_attempted == 6
+    assert stats.last_activity.replace(tzinfo=None) == start + timedelta(days=1, minutes=2)
+    assert check_student_stats(db) == []
+
+def test_stats_without_packed_history_are_recomputed(db, school):
+    student_id = school["student_ids"][0]
+    start = datetime(2024, 3, 1, 8, 0)
+    crud.create_interactions_bulk(db, _rows(db, student_id, [0, 1], start))
+    db.query(models.PackedHistory).delete()
+    db.commit()
+
+    crud.create_interactions_bulk(db, _rows(db, student_id, [1, 2], start + timedelta(hours=1)))
+
+    assert _stats(db, student_id).total_interactions == 4
+    assert check_student_stats(db) == []
@@ -40,6 +40,7 @@ interface ImportResult {
   }>;
   warnings: string[];
   processing_time_seconds: number;
+  from_cache?: boolean;
 }
 
 export default function ImportPage() {
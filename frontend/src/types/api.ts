@@ -166,4 +166,5 @@ export interface ImportResult {
   }>;
   warnings: string[];
   processing_time_seconds: number;
+  from_cache?: boolean;
 }
\ No newline at end of file